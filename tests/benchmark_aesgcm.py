@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# See the LICENSE file for legal information regarding use of this file.
+
+"""
+Measure the throughput of AES-GCM implementations.
+
+Usage: PYTHONPATH=.. python benchmark_aesgcm.py [record size] [repetitions]
+"""
+
+from __future__ import print_function
+import sys
+import timeit
+
+from tlslite.utils import python_aesgcm
+from tlslite.utils.cryptomath import m2cryptoLoaded, pycryptoLoaded
+
+if m2cryptoLoaded:
+    from tlslite.utils import openssl_aesgcm
+if pycryptoLoaded:
+    from tlslite.utils import pycrypto_aesgcm
+
+
+def benchmark(name, cipher, size, repeat):
+    """Print the bytes per second of seal(), open(), CTR and GHASH steps"""
+    nonce = bytearray(12)
+    plaintext = bytearray(size)
+    data = bytearray(13)
+    ciphertext = cipher.seal(nonce, plaintext, data)
+
+    sealTime = min(timeit.repeat(lambda: cipher.seal(nonce, plaintext, data),
+                                 number=1, repeat=repeat))
+    openTime = min(timeit.repeat(lambda: cipher.open(nonce, ciphertext, data),
+                                 number=1, repeat=repeat))
+    ctrTime = min(timeit.repeat(
+        lambda: cipher._rawAesCtrEncrypt(bytearray(16), plaintext),
+        number=1, repeat=repeat))
+    ghashTime = min(timeit.repeat(lambda: cipher._update(0, plaintext),
+                                  number=1, repeat=repeat))
+
+    print("{0:<28} seal: {1:>10.0f} B/s  open: {2:>10.0f} B/s  "
+          "CTR: {3:>10.0f} B/s  GHASH: {4:>10.0f} B/s"
+          .format(name, size / sealTime, size / openTime, size / ctrTime,
+                  size / ghashTime))
+
+
+def main(argv):
+    size = int(argv[1]) if len(argv) > 1 else 2**14
+    repeat = int(argv[2]) if len(argv) > 2 else 5
+    key = bytearray(range(16))
+
+    print("AES-128-GCM, {0} byte records".format(size))
+    implementations = [("python", python_aesgcm)]
+    if m2cryptoLoaded:
+        implementations.append(("openssl", openssl_aesgcm))
+    if pycryptoLoaded:
+        implementations.append(("pycrypto", pycrypto_aesgcm))
+    for implName, module in implementations:
+        for tableBits in (4, 8):
+            benchmark("{0}, {1}-bit GHASH tables".format(implName, tableBits),
+                      module.new(key, tableBits), size, repeat)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# See the LICENSE file for legal information regarding use of this file.
+
+"""
+Measure the speed and timing variance of the CBC padding and MAC check.
+
+Usage:
+    PYTHONPATH=.. python benchmark_constanttime.py benchmark [size] [repeat]
+    PYTHONPATH=.. python benchmark_constanttime.py timing [size] [samples]
+
+benchmark prints the number of records checked per second for the
+supported HMAC hashes.
+
+timing checks records of the same size with different padding lengths
+(0, 15, 127 and 255 bytes) in random order, and compares the timings of
+each padding length with the timings for zero length padding using
+Welch's t-test. Returns non-zero exit code if any |t| exceeds 4.5, that is,
+when the check time depends on the padding length.
+"""
+
+from __future__ import print_function, division
+import sys
+import hmac
+import math
+import random
+import timeit
+
+from tlslite.recordlayer import RecordLayer
+from tlslite.utils import tlshashlib as hashlib
+from tlslite.utils.constanttime import ct_check_cbc_mac_and_pad
+
+VERSION = (3, 3)
+SEQNUM = bytearray(8)
+CONTENT_TYPE = 23
+KEY = bytes(bytearray(32))
+
+# largest |t| value still considered as no leak, as used by dudect
+T_THRESHOLD = 4.5
+
+
+def createMAC(digestmod):
+    """Return keyed HMAC context"""
+    mac = hmac.new(KEY, digestmod=digestmod)
+    mac.block_size = digestmod().block_size
+    return mac
+
+
+def createRecord(size, padLength, digestmod):
+    """Return decrypted record of given size with valid MAC and padding"""
+    recordLayer = RecordLayer(None)
+    recordLayer.version = VERSION
+    dataLength = size - padLength - 1 - digestmod().digest_size
+    assert dataLength >= 0
+    data = bytearray(b'\x01' * dataLength)
+    data += recordLayer.calculateMAC(createMAC(digestmod), SEQNUM,
+                                     CONTENT_TYPE, data)
+    data += bytearray([padLength] * (padLength + 1))
+    assert len(data) == size
+    return data
+
+
+def check(record, mac):
+    """Check the record, make sure it's valid"""
+    assert ct_check_cbc_mac_and_pad(record, mac, SEQNUM, CONTENT_TYPE,
+                                    VERSION)
+
+
+def benchmark(size, repeat):
+    """Print records checked per second"""
+    print("ct_check_cbc_mac_and_pad(), {0} byte records".format(size))
+    for name, digestmod in (("sha1", hashlib.sha1),
+                            ("sha256", hashlib.sha256),
+                            ("sha384", hashlib.sha384)):
+        mac = createMAC(digestmod)
+        record = createRecord(size, 15, digestmod)
+        duration = min(timeit.repeat(lambda: check(record, mac),
+                                     number=10, repeat=repeat)) / 10
+        print("{0:<8} {1:>10.1f} records/s".format(name, 1 / duration))
+
+
+def trimmedStats(samples):
+    """Return mean, variance and count of samples without the slowest 10%"""
+    samples = sorted(samples)[:int(len(samples) * 0.9)]
+    mean = sum(samples) / len(samples)
+    variance = sum((i - mean) ** 2 for i in samples) / (len(samples) - 1)
+    return mean, variance, len(samples)
+
+
+def welch(statsA, statsB):
+    """Return the Welch's t statistic for two sets of samples"""
+    meanA, varA, countA = statsA
+    meanB, varB, countB = statsB
+    return (meanA - meanB) / math.sqrt(varA / countA + varB / countB)
+
+
+def timing(size, samples):
+    """Test if time of record check depends on padding length"""
+    padLengths = (0, 15, 127, 255)
+    mac = createMAC(hashlib.sha1)
+    records = dict((i, createRecord(size, i, hashlib.sha1))
+                   for i in padLengths)
+    timer = timeit.default_timer
+
+    times = dict((i, []) for i in padLengths)
+    order = list(padLengths) * samples
+    random.shuffle(order)
+    for padLength in order:
+        record = records[padLength]
+        start = timer()
+        check(record, mac)
+        times[padLength].append(timer() - start)
+
+    print("ct_check_cbc_mac_and_pad(), {0} byte records, {1} samples"
+          .format(size, samples))
+    base = trimmedStats(times[0])
+    leak = False
+    for padLength in padLengths:
+        stats = trimmedStats(times[padLength])
+        tValue = welch(stats, base)
+        leak = leak or abs(tValue) > T_THRESHOLD
+        print("padding {0:>3}: mean {1:>9.2f} us, stdev {2:>7.2f} us, "
+              "t = {3:>6.2f}".format(padLength, stats[0] * 1e6,
+                                     math.sqrt(stats[1]) * 1e6, tValue))
+    print("timing difference detected" if leak else
+          "no timing difference detected")
+    return 1 if leak else 0
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] not in ("benchmark", "timing"):
+        print(__doc__)
+        return 2
+    size = int(argv[2]) if len(argv) > 2 else 1024
+    if argv[1] == "benchmark":
+        benchmark(size, int(argv[3]) if len(argv) > 3 else 5)
+        return 0
+    return timing(size, int(argv[3]) if len(argv) > 3 else 2000)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -25,6 +25,7 @@ except ImportError:
 
 from tlslite import TLSConnection, Fault, HandshakeSettings, \
     X509, X509CertChain, IMAP4_TLS, VerifierDB, Session, SessionCache, \
+    TicketKeyManager, \
     parsePEMKey, constants, \
     AlertDescription, HTTPTLSConnection, TLSSocketServerMixIn, \
     POP3_TLS, m2cryptoLoaded, pycryptoLoaded, gmpyLoaded, tackpyLoaded, \
@@ -638,6 +639,27 @@ def clientTestCmd(argv):
 
     test_no += 1
 
+    print("Test {0} - resumption with session ticket".format(test_no))
+    synchro.recv(1)
+    connection = connect()
+    connection.handshakeClientCert(serverName=address[0])
+    testConnClient(connection)
+    assert(not connection.resumed)
+    assert(connection.session.ticket)
+    connection.close()
+    session = connection.session
+
+    # resume
+    synchro.recv(1)
+    connection = connect()
+    connection.handshakeClientCert(serverName=address[0], session=session)
+    testConnClient(connection)
+    assert(connection.resumed)
+    assert(connection.session.serverName == address[0])
+    connection.close()
+
+    test_no += 1
+
     print('Test {0} - good standard XMLRPC https client'.format(test_no))
     address = address[0], address[1]+1
     synchro.recv(1)
@@ -1234,6 +1256,26 @@ def serverTestCmd(argv):
 
     test_no += 1
 
+    print("Test {0} - resumption with session ticket".format(test_no))
+    synchro.send(b'R')
+    ticketKeyManager = TicketKeyManager()
+    connection = connect()
+    connection.handshakeServer(certChain=x509Chain, privateKey=x509Key,
+                               ticketKeyManager=ticketKeyManager)
+    testConnServer(connection)
+    connection.close()
+
+    # resume
+    synchro.send(b'R')
+    connection = connect()
+    connection.handshakeServer(certChain=x509Chain, privateKey=x509Key,
+                               ticketKeyManager=ticketKeyManager)
+    assert(connection.resumed)
+    testConnServer(connection)
+    connection.close()
+
+    test_no += 1
+
     print("Tests {0}-{1} - XMLRPXC server".format(test_no, test_no + 2))
     test_no += 2
 
@@ -5,9 +5,14 @@ __version__ = "0.6.0-alpha5"
 from .constants import AlertLevel, AlertDescription, Fault
 from .errors import *
 from .checker import Checker
+from .ephemeralkeypool import EphemeralKeyPool
 from .handshakesettings import HandshakeSettings
 from .session import Session
 from .sessioncache import SessionCache
+from .sessionstore import SessionStore
+from .sharedsessioncache import SharedSessionCache
+from .sqlitesessionstore import SqliteSessionStore
+from .ticketkeymanager import TicketKeyManager
 from .tlsconnection import TLSConnection
 from .verifierdb import VerifierDB
 from .x509 import X509
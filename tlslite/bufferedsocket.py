@@ -40,6 +40,18 @@ class BufferedSocket(object):
             return None
         return self.socket.sendall(data)
 
+    def sendmsg(self, buffers):
+        """Send data from multiple buffers to the socket"""
+        if self.buffer_writes:
+            self._write_queue.extend(buffers)
+            return sum(len(i) for i in buffers)
+        if hasattr(self.socket, "sendmsg"):
+            return self.socket.sendmsg(buffers)
+        buf = bytearray()
+        for i in buffers:
+            buf += i
+        return self.socket.send(buf)
+
     def flush(self):
         """Send all buffered data"""
         buf = bytearray()
@@ -53,6 +65,14 @@ class BufferedSocket(object):
         """Receive data from socket (socket emulation)"""
         return self.socket.recv(bufsize)
 
+    def recv_into(self, buffer):
+        """Receive data from socket into buffer (socket emulation)"""
+        if hasattr(self.socket, "recv_into"):
+            return self.socket.recv_into(buffer)
+        data = self.socket.recv(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
     def getsockname(self):
         """Return the socket's own address (socket emulation)."""
         return self.socket.getsockname()
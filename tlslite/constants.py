@@ -85,6 +85,7 @@ class HandshakeType(TLSEnum):
     hello_request = 0
     client_hello = 1
     server_hello = 2
+    new_session_ticket = 4
     certificate = 11
     server_key_exchange = 12
     certificate_request = 13
@@ -121,6 +122,7 @@ class ExtensionType:    # RFC 6066 / 4366
     client_hello_padding = 21 # RFC 7685
     encrypt_then_mac = 22 # RFC 7366
     extended_master_secret = 23 # RFC 7627
+    session_ticket = 35 # RFC 5077
     tack = 0xF300
     supports_npn = 13172
     renegotiation_info = 0xff01
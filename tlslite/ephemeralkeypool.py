@@ -0,0 +1,246 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""Pool of pre-generated ephemeral key shares for the server."""
+
+import collections
+import os
+import threading
+
+import ecdsa
+
+from .constants import GroupName
+from .utils.cryptomath import bytesToNumber, getRandomBytes, fixedBasePowMod
+from .utils.ecc import getCurveByName, encodeX962Point
+
+# serialises the reinitialisation of pools in a forked child
+_forkLock = threading.Lock()
+
+
+def generateECDHKey(groupID):
+    """
+    Generate a new ECDH key share
+
+    @type groupID: int
+    @param groupID: L{GroupName} identifier of the curve
+
+    @rtype: tuple
+    @return: private key (int) and encoded public key (bytearray)
+    """
+    generator = getCurveByName(GroupName.toRepr(groupID)).generator
+    private = ecdsa.util.randrange(generator.order())
+    return private, encodeX962Point(generator * private)
+
+
+def generateDHKey(group, privateBits):
+    """
+    Generate a new finite field DH key share
+
+    @type group: tuple
+    @param group: generator and prime of the group
+
+    @type privateBits: int
+    @param privateBits: size of the private exponent
+
+    @rtype: tuple
+    @return: private key and public key, both as int
+    """
+    dh_g, dh_p = group
+    private = bytesToNumber(getRandomBytes(privateBits // 8))
+    return private, fixedBasePowMod(dh_g, private, dh_p)
+
+
+class EphemeralKeyPool(object):
+    """
+    Pool of fresh ephemeral ECDHE and DHE key shares
+
+    A background thread keeps up to poolSize key shares ready for every
+    configured curve and DH group, so that a server handshake can take a
+    ready share instead of generating it. Every share is returned by the
+    pool only once, shares are never reused. When the pool for the
+    requested group is empty, the handshake generates the share itself.
+
+    To use it, create the pool once and pass it to
+    L{tlslite.tlsconnection.TLSConnection.handshakeServer} of every
+    connection. Call L{close} to stop the background thread.
+
+    This class is thread-safe. After a fork the child process drops the
+    key shares inherited from the parent and, if the parent ran one,
+    starts its own background thread, so that the parent and child
+    never use the same share.
+
+    @type curves: list of int
+    @ivar curves: L{GroupName} identifiers of pooled curves
+
+    @type dhGroups: list of tuple
+    @ivar dhGroups: (generator, prime) pairs of pooled DH groups
+
+    @type dhPrivateBits: int
+    @ivar dhPrivateBits: size of private exponents for DH groups
+
+    @type poolSize: int
+    @ivar poolSize: number of key shares kept ready for every group
+    """
+
+    def __init__(self, curves=None, dhGroups=None, poolSize=16,
+                 dhPrivateBits=320, start=True):
+        """
+        Create the pool
+
+        @type curves: list of int
+        @param curves: L{GroupName} identifiers of the curves to keep key
+        shares for, secp256r1 by default
+
+        @type dhGroups: list of tuple
+        @param dhGroups: (generator, prime) pairs of the DH groups to keep
+        key shares for, none by default
+
+        @type poolSize: int
+        @param poolSize: number of key shares kept ready for every group
+
+        @type dhPrivateBits: int
+        @param dhPrivateBits: size of the private DH exponents, must be at
+        least twice the security level of the group
+
+        @type start: bool
+        @param start: whether to start the background thread, if False,
+        the pool can still be filled with L{fill}
+        """
+        if curves is None:
+            curves = [GroupName.secp256r1]
+        if dhGroups is None:
+            dhGroups = []
+        self.curves = list(curves)
+        self.dhGroups = [tuple(group) for group in dhGroups]
+        self.poolSize = poolSize
+        self.dhPrivateBits = dhPrivateBits
+
+        self._pools = {}
+        for groupID in self.curves:
+            self._pools[('ecdh', groupID)] = collections.deque()
+        for group in self.dhGroups:
+            self._pools[('dh', group)] = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+        # process in which the pooled key shares were generated
+        self._pid = os.getpid()
+        if start:
+            self._startThread()
+
+    def getECDHKey(self, groupID):
+        """
+        Return a new key share for the curve
+
+        @type groupID: int
+        @param groupID: L{GroupName} identifier of the curve
+
+        @rtype: tuple
+        @return: private key and encoded public key, None if no ready
+        share is available
+        """
+        return self._pop(('ecdh', groupID))
+
+    def getDHKey(self, dh_g, dh_p):
+        """
+        Return a new key share for the DH group
+
+        @rtype: tuple
+        @return: private key and public key, None if no ready share is
+        available
+        """
+        return self._pop(('dh', (dh_g, dh_p)))
+
+    def fill(self):
+        """Generate key shares in the calling thread until pool is full"""
+        while True:
+            key = self._emptiest()
+            if key is None:
+                return
+            self._add(key)
+
+    def close(self):
+        """Stop the background thread and drop all key shares"""
+        self._checkFork(restart=False)
+        with self._condition:
+            self._closed = True
+            for pool in self._pools.values():
+                pool.clear()
+            self._condition.notify_all()
+        if self._thread is not None and \
+                self._thread is not threading.current_thread():
+            self._thread.join()
+            self._thread = None
+
+    def _startThread(self):
+        """Start the background refill thread"""
+        self._thread = threading.Thread(target=self._refillLoop,
+                                        name="EphemeralKeyPool")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _checkFork(self, restart=True):
+        """Drop key shares and restart refill when running in a child"""
+        if self._pid == os.getpid():
+            return
+        # in the parent the pid never changes, so this lock is never
+        # held there when the process forks
+        with _forkLock:
+            if self._pid == os.getpid():
+                return
+            # the condition may have been held by a thread that doesn't
+            # exist in this process
+            self._condition = threading.Condition()
+            for pool in self._pools.values():
+                pool.clear()
+            wasRunning = self._thread is not None
+            self._thread = None
+            self._pid = os.getpid()
+            if restart and wasRunning and not self._closed:
+                self._startThread()
+
+    def _pop(self, key):
+        """Remove and return oldest key share from pool, wake up refill"""
+        pool = self._pools.get(key)
+        if pool is None:
+            return None
+        self._checkFork()
+        with self._condition:
+            if not pool:
+                share = None
+            else:
+                share = pool.popleft()
+            self._condition.notify()
+        return share
+
+    def _emptiest(self):
+        """Return pool key of the pool with fewest shares, None if all full"""
+        self._checkFork()
+        with self._condition:
+            if self._closed or not self._pools:
+                return None
+            key = min(self._pools, key=lambda i: len(self._pools[i]))
+            if len(self._pools[key]) >= self.poolSize:
+                return None
+            return key
+
+    def _add(self, key):
+        """Generate a key share for the pool"""
+        pid = os.getpid()
+        if key[0] == 'ecdh':
+            share = generateECDHKey(key[1])
+        else:
+            share = generateDHKey(key[1], self.dhPrivateBits)
+        with self._condition:
+            # don't keep a share made before a fork
+            if not self._closed and pid == self._pid:
+                self._pools[key].append(share)
+
+    def _refillLoop(self):
+        """Keep pools full until closed"""
+        while True:
+            with self._condition:
+                while not self._closed and self._emptiest() is None:
+                    self._condition.wait()
+                if self._closed:
+                    return
+            self.fill()
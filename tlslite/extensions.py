@@ -1108,6 +1108,59 @@ class PaddingExtension(TLSExtension):
         self.paddingData = p.getFixBytes(p.getRemainingLength())
         return self
 
+class SessionTicketExtension(TLSExtension):
+    """
+    Session ticket of the client or ticket support of the server.
+
+    Empty extension sent by client signals support for session tickets,
+    non empty one carries the ticket to resume. Server sends only the empty
+    extension, to signal that it will send a NewSessionTicket message.
+
+    See RFC5077.
+
+    @type ticket: bytearray
+    @ivar ticket: opaque ticket issued by the server
+    """
+
+    def __init__(self):
+        """Create instance of class."""
+        extType = ExtensionType.session_ticket
+        super(SessionTicketExtension, self).__init__(extType=extType)
+        self.ticket = bytearray(0)
+
+    @property
+    def extData(self):
+        """
+        Return raw encoding of the extension.
+
+        @rtype: bytearray
+        """
+        return self.ticket
+
+    def create(self, ticket=None):
+        """
+        Set the ticket sent in the extension.
+
+        @type ticket: bytearray
+        @param ticket: ticket to send, empty if not specified
+        """
+        if ticket is None:
+            ticket = bytearray(0)
+        self.ticket = ticket
+        return self
+
+    def parse(self, p):
+        """
+        Deserialise extension from on the wire data.
+
+        @type p: L{tlslite.util.codec.Parser}
+        @param p:  data to be parsed
+
+        @rtype: L{TLSExtension}
+        """
+        self.ticket = p.getFixBytes(p.getRemainingLength())
+        return self
+
 TLSExtension._universalExtensions = \
     {
         ExtensionType.server_name: SNIExtension,
@@ -1117,7 +1170,8 @@ TLSExtension._universalExtensions = \
         ExtensionType.srp: SRPExtension,
         ExtensionType.signature_algorithms: SignatureAlgorithmsExtension,
         ExtensionType.supports_npn: NPNExtension,
-        ExtensionType.client_hello_padding: PaddingExtension}
+        ExtensionType.client_hello_padding: PaddingExtension,
+        ExtensionType.session_ticket: SessionTicketExtension}
 
 TLSExtension._serverExtensions = \
     {
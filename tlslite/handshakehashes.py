@@ -14,16 +14,26 @@ class HandshakeHashes(object):
 
     Calculates message digests of messages exchanged in handshake protocol
     of SSLv3 and TLS.
+
+    The transcript is buffered and hashes are created only when their
+    digest is requested for the first time (by hashing the whole buffered
+    transcript), so only the hashes actually used by the negotiated
+    protocol version, PRF and signature algorithms are calculated. Once
+    the connection knows which hashes it needs, L{selectHashes} creates
+    them and the buffered transcript is released.
     """
 
+    _hashFuncs = {'md5': hashlib.md5,
+                  'sha1': hashlib.sha1,
+                  'sha224': hashlib.sha224,
+                  'sha256': hashlib.sha256,
+                  'sha384': hashlib.sha384,
+                  'sha512': hashlib.sha512}
+
     def __init__(self):
         """Create instance"""
-        self._handshakeMD5 = hashlib.md5()
-        self._handshakeSHA = hashlib.sha1()
-        self._handshakeSHA224 = hashlib.sha224()
-        self._handshakeSHA256 = hashlib.sha256()
-        self._handshakeSHA384 = hashlib.sha384()
-        self._handshakeSHA512 = hashlib.sha512()
+        self._transcript = bytearray()
+        self._hashes = {}
 
     def update(self, data):
         """
@@ -32,13 +42,41 @@ class HandshakeHashes(object):
         @type data: bytearray
         @param data: serialized TLS handshake message
         """
-        text = compat26Str(data)
-        self._handshakeMD5.update(text)
-        self._handshakeSHA.update(text)
-        self._handshakeSHA224.update(text)
-        self._handshakeSHA256.update(text)
-        self._handshakeSHA384.update(text)
-        self._handshakeSHA512.update(text)
+        if self._transcript is not None:
+            self._transcript += data
+        if self._hashes:
+            text = compat26Str(data)
+            for hashObj in self._hashes.values():
+                hashObj.update(text)
+
+    def _getHash(self, name):
+        """Return hash object for name, create it if necessary"""
+        try:
+            return self._hashes[name]
+        except KeyError:
+            pass
+        if self._transcript is None:
+            raise ValueError("Digest {0} was not selected".format(name))
+        try:
+            hashObj = self._hashFuncs[name]()
+        except KeyError:
+            raise ValueError("Unknown digest name")
+        hashObj.update(compatHMAC(self._transcript))
+        self._hashes[name] = hashObj
+        return hashObj
+
+    def selectHashes(self, names):
+        """
+        Create the listed hashes and stop buffering the transcript
+
+        Digests of other hashes can't be requested afterwards.
+
+        @type names: iterable of str
+        @param names: names of all the digests that will be requested
+        """
+        for name in names:
+            self._getHash(name)
+        self._transcript = None
 
     def digest(self, digest=None):
         """
@@ -50,21 +88,9 @@ class HandshakeHashes(object):
         @param digest: name of digest to return
         """
         if digest is None:
-            return self._handshakeMD5.digest() + self._handshakeSHA.digest()
-        elif digest == 'md5':
-            return self._handshakeMD5.digest()
-        elif digest == 'sha1':
-            return self._handshakeSHA.digest()
-        elif digest == 'sha224':
-            return self._handshakeSHA224.digest()
-        elif digest == 'sha256':
-            return self._handshakeSHA256.digest()
-        elif digest == 'sha384':
-            return self._handshakeSHA384.digest()
-        elif digest == 'sha512':
-            return self._handshakeSHA512.digest()
-        else:
-            raise ValueError("Unknown digest name")
+            return self._getHash('md5').digest() + \
+                    self._getHash('sha1').digest()
+        return self._getHash(digest).digest()
 
     def digestSSL(self, masterSecret, label):
         """
@@ -78,8 +104,8 @@ class HandshakeHashes(object):
         @param label: label to include in the calculation
         """
         #pylint: disable=maybe-no-member
-        imacMD5 = self._handshakeMD5.copy()
-        imacSHA = self._handshakeSHA.copy()
+        imacMD5 = self._getHash('md5').copy()
+        imacSHA = self._getHash('sha1').copy()
         #pylint: enable=maybe-no-member
 
         # the below difference in input for MD5 and SHA-1 is why we can't reuse
@@ -105,10 +131,10 @@ class HandshakeHashes(object):
         @rtype: HandshakeHashes
         """
         other = HandshakeHashes()
-        other._handshakeMD5 = self._handshakeMD5.copy()
-        other._handshakeSHA = self._handshakeSHA.copy()
-        other._handshakeSHA224 = self._handshakeSHA224.copy()
-        other._handshakeSHA256 = self._handshakeSHA256.copy()
-        other._handshakeSHA384 = self._handshakeSHA384.copy()
-        other._handshakeSHA512 = self._handshakeSHA512.copy()
+        if self._transcript is not None:
+            other._transcript = self._transcript[:]
+        else:
+            other._transcript = None
+        other._hashes = dict((name, hashObj.copy())
+                             for name, hashObj in self._hashes.items())
         return other
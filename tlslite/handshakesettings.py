@@ -137,6 +137,10 @@ class HandshakeSettings(object):
     @ivar requireExtendedMasterSecret: whether to require negotiation of
     extended master secret calculation for successful connection. Requires
     useExtendedMasterSecret to be set to true. False by default.
+
+    @type useSessionTickets: bool
+    @ivar useSessionTickets: whether the client should ask for and resume
+    sessions with session tickets from RFC 5077. True by default.
     """
     def __init__(self):
         self.minKeySize = 1023
@@ -156,6 +160,7 @@ class HandshakeSettings(object):
         self.usePaddingExtension = True
         self.useExtendedMasterSecret = True
         self.requireExtendedMasterSecret = False
+        self.useSessionTickets = True
 
     @staticmethod
     def _sanityCheckKeySizes(other):
@@ -240,6 +245,9 @@ class HandshakeSettings(object):
         if other.usePaddingExtension not in (True, False):
             raise ValueError("usePaddingExtension must be True or False")
 
+        if other.useSessionTickets not in (True, False):
+            raise ValueError("useSessionTickets must be True or False")
+
     def validate(self):
         """
         Validate the settings, filter out unsupported ciphersuites and return
@@ -266,6 +274,7 @@ class HandshakeSettings(object):
         other.eccCurves = self.eccCurves
         other.useExtendedMasterSecret = self.useExtendedMasterSecret
         other.requireExtendedMasterSecret = self.requireExtendedMasterSecret
+        other.useSessionTickets = self.useSessionTickets
 
         if not cipherfactory.tripleDESPresent:
             other.cipherNames = [i for i in self.cipherNames if i != "3des"]
@@ -3,6 +3,8 @@
 
 """Classes for integrating TLS Lite with other packages."""
 
+import sys
+
 __all__ = ["asyncstatemachine",
            "httptlsconnection",
            "pop3_tls",
@@ -11,3 +13,7 @@ __all__ = ["asyncstatemachine",
            "xmlrpctransport",
            "tlssocketservermixin",
            "tlsasyncdispatchermixin"]
+
+# asyncio is available only in Python 3.4 and later
+if sys.version_info >= (3, 4):
+    __all__.append("tlsasyncioprotocol")
@@ -125,23 +125,43 @@ class ClientHelper(object):
         return True
 
     def _handshake(self, tlsConnection):
+        for _ in self._handshakeAsync(tlsConnection):
+            pass
+
+    def _handshakeAsync(self, tlsConnection):
+        """
+        Perform the handshake with stored parameters in a non-blocking way
+
+        @rtype: iterable
+        @return: A generator; see the
+        L{tlslite.tlsconnection.TLSConnection.handshakeClientCert}
+        documentation for details on its use.
+        """
         if self.username and self.password:
-            tlsConnection.handshakeClientSRP(username=self.username,
-                                             password=self.password,
-                                             checker=self.checker,
-                                             settings=self.settings,
-                                             session=self.tlsSession,
-                                             serverName=self.serverName)
+            handshaker = tlsConnection.handshakeClientSRP(
+                username=self.username,
+                password=self.password,
+                checker=self.checker,
+                settings=self.settings,
+                session=self.tlsSession,
+                serverName=self.serverName,
+                async=True)
         elif self.anon:
-            tlsConnection.handshakeClientAnonymous(session=self.tlsSession,
-                                                   settings=self.settings,
-                                                   checker=self.checker,
-                                                   serverName=self.serverName)
+            handshaker = tlsConnection.handshakeClientAnonymous(
+                session=self.tlsSession,
+                settings=self.settings,
+                checker=self.checker,
+                serverName=self.serverName,
+                async=True)
         else:
-            tlsConnection.handshakeClientCert(certChain=self.certChain,
-                                              privateKey=self.privateKey,
-                                              checker=self.checker,
-                                              settings=self.settings,
-                                              session=self.tlsSession,
-                                              serverName=self.serverName)
+            handshaker = tlsConnection.handshakeClientCert(
+                certChain=self.certChain,
+                privateKey=self.privateKey,
+                checker=self.checker,
+                settings=self.settings,
+                session=self.tlsSession,
+                serverName=self.serverName,
+                async=True)
+        for result in handshaker:
+            yield result
         self.tlsSession = tlsConnection.session
@@ -0,0 +1,412 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""TLS Lite + asyncio."""
+
+import asyncio
+
+from tlslite.tlsconnection import TLSConnection
+from .clienthelper import ClientHelper
+
+_DEFAULT_LIMIT = 2 ** 16
+
+
+class _TLSTransport(asyncio.Transport):
+    """
+    Application side transport of a L{TLSAsyncioProtocol}
+
+    Data written to it is encrypted and sent to the peer, data received
+    from the peer is decrypted and passed to the application protocol.
+    """
+
+    def __init__(self, tlsProtocol):
+        """Create transport bound to the TLS protocol instance"""
+        super(_TLSTransport, self).__init__()
+        self._tlsProtocol = tlsProtocol
+
+    def get_extra_info(self, name, default=None):
+        """
+        Return information about the connection
+
+        Besides the information provided by the underlying transport,
+        'tlsConnection' returns the L{TLSConnection} instance and
+        'session' the negotiated L{tlslite.session.Session}.
+        """
+        return self._tlsProtocol._getExtraInfo(name, default)
+
+    def is_closing(self):
+        """Return True if the transport is closing or closed"""
+        return self._tlsProtocol._closing
+
+    def close(self):
+        """Send close_notify alert and close the underlying transport"""
+        self._tlsProtocol._startShutdown()
+
+    def pause_reading(self):
+        """Stop delivering data to the application protocol"""
+        self._tlsProtocol._pauseReading()
+
+    def resume_reading(self):
+        """Resume delivering data to the application protocol"""
+        self._tlsProtocol._resumeReading()
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        """Set flow control limits of the underlying transport"""
+        self._tlsProtocol._transport.set_write_buffer_limits(high, low)
+
+    def get_write_buffer_size(self):
+        """Return size of the output buffer of the underlying transport"""
+        return self._tlsProtocol._transport.get_write_buffer_size()
+
+    def write(self, data):
+        """Encrypt and send data"""
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError("data: expecting a bytes-like instance, got {0}"
+                            .format(type(data).__name__))
+        if data:
+            self._tlsProtocol._write(data)
+
+    def can_write_eof(self):
+        """Half-closed connections are not supported by TLS"""
+        return False
+
+    def abort(self):
+        """Close the underlying transport without sending close_notify"""
+        self._tlsProtocol._abort()
+
+
+class TLSAsyncioProtocol(asyncio.Protocol):
+    """
+    asyncio protocol that adds TLS to a connection
+
+    The protocol is connected to a transport carrying the raw TLS records
+    and drives the handshake, read and close generators of a
+    L{TLSConnection} created without a socket from the event loop
+    callbacks. After the handshake
+    completes, the application protocol is connected to a transport
+    which encrypts and decrypts the data exchanged with the peer.
+
+    To use it with a server, create it with a handshaker that starts the
+    server side of the handshake::
+
+        def handshaker(tlsConnection):
+            return tlsConnection.handshakeServerAsync(certChain=certChain,
+                                                      privateKey=privateKey)
+
+        loop.create_server(
+            lambda: TLSAsyncioProtocol(EchoProtocol(), handshaker),
+            host, port)
+
+    Usually it is easier to use L{open_tls_connection} and
+    L{start_tls_server} which provide the streams API.
+
+    @type tlsConnection: L{TLSConnection}
+    @ivar tlsConnection: the connection driven by the protocol, available
+    after the underlying transport was connected
+    """
+
+    def __init__(self, appProtocol, handshaker, waiter=None, loop=None):
+        """
+        Create the protocol
+
+        @type appProtocol: asyncio.Protocol
+        @param appProtocol: protocol that will receive the decrypted data
+        after the handshake finishes
+
+        @type handshaker: callable
+        @param handshaker: function that takes a L{TLSConnection} instance
+        and returns a handshake generator (e.g. the one returned by
+        L{TLSConnection.handshakeServerAsync})
+
+        @type waiter: asyncio.Future
+        @param waiter: optional future that will be set once the handshake
+        finishes, with exception raised by the handshake in case it failed
+
+        @type loop: asyncio.AbstractEventLoop
+        @param loop: event loop used, the default one if not specified
+        """
+        self._appProtocol = appProtocol
+        self._handshakerFactory = handshaker
+        self._waiter = waiter
+        self._loop = loop if loop is not None else asyncio.get_event_loop()
+        self._transport = None
+        self._handshaker = None
+        self._reader = None
+        self._appTransport = None
+        self._readPaused = False
+        self._closing = False
+        self._error = None
+        self.tlsConnection = None
+
+    def connection_made(self, transport):
+        """Start the handshake on newly connected transport"""
+        self._transport = transport
+        self.tlsConnection = TLSConnection()
+        try:
+            self._handshaker = self._handshakerFactory(self.tlsConnection)
+        except Exception as exc:
+            self._fatalError(exc)
+            return
+        self._process()
+
+    def data_received(self, data):
+        """Process records received from peer"""
+        self.tlsConnection.feed(data)
+        self._process()
+
+    def eof_received(self):
+        """Process end of stream from peer"""
+        self.tlsConnection.feed(b'')
+        self._process()
+        # let the transport close itself
+        return False
+
+    def connection_lost(self, exc):
+        """Notify the waiter or the application about closed connection"""
+        if self._error is not None:
+            exc = self._error
+        self._closing = True
+        if self._waiter is not None and not self._waiter.done():
+            if exc is None:
+                exc = ConnectionResetError("Connection lost during "
+                                           "handshake")
+            self._waiter.set_exception(exc)
+        if self._appTransport is not None:
+            self._loop.call_soon(self._appProtocol.connection_lost, exc)
+            self._appTransport = None
+        self._transport = None
+
+    def pause_writing(self):
+        """Forward flow control to application protocol"""
+        if self._appTransport is not None:
+            self._appProtocol.pause_writing()
+
+    def resume_writing(self):
+        """Forward flow control to application protocol"""
+        if self._appTransport is not None:
+            self._appProtocol.resume_writing()
+
+    def _getExtraInfo(self, name, default=None):
+        """Return TLS specific or transport information"""
+        if name == 'tlsConnection':
+            return self.tlsConnection
+        if name == 'session':
+            return self.tlsConnection.session
+        if self._transport is None:
+            return default
+        return self._transport.get_extra_info(name, default)
+
+    def _process(self):
+        """Advance the handshake and read operations with new data"""
+        if self._closing:
+            return
+        try:
+            if self._handshaker is not None:
+                if not self._doHandshake():
+                    return
+            self._doRead()
+        except Exception as exc:
+            self._fatalError(exc)
+        else:
+            self._flush()
+
+    def _doHandshake(self):
+        """Advance the handshake, return True if it completed"""
+        for result in self._handshaker:
+            if result == 0:
+                self._flush()
+                return False
+        self._handshaker = None
+        self._flush()
+        self._appTransport = _TLSTransport(self)
+        self._appProtocol.connection_made(self._appTransport)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        return True
+
+    def _doRead(self):
+        """Pass all the application data available to application"""
+        while not self._readPaused and not self._closing:
+            if self._reader is None:
+                if self.tlsConnection.closed:
+                    return
+                self._reader = self.tlsConnection.readAsync()
+            for result in self._reader:
+                if result == 0:
+                    return
+                elif result != 1:
+                    break
+            self._reader = None
+            if not result:
+                # close_notify from peer, TLS connections can't be
+                # half-closed so close the transport irrespective of
+                # what the application protocol wants
+                self._appProtocol.eof_received()
+                self._closeTransport()
+                return
+            self._appProtocol.data_received(bytes(result))
+
+    def _write(self, data):
+        """Encrypt and send the data"""
+        if self._closing:
+            return
+        try:
+            # writes never block, connection buffers the data
+            for _ in self.tlsConnection.writeAsync(data):
+                pass
+        except Exception as exc:
+            self._fatalError(exc)
+        else:
+            self._flush()
+
+    def _pauseReading(self):
+        """Stop reading data from transport"""
+        if not self._readPaused:
+            self._readPaused = True
+            self._transport.pause_reading()
+
+    def _resumeReading(self):
+        """Resume reading data from transport"""
+        if self._readPaused:
+            self._readPaused = False
+            self._transport.resume_reading()
+            self._loop.call_soon(self._process)
+
+    def _startShutdown(self):
+        """Send close_notify and close the transport"""
+        if self._closing:
+            return
+        try:
+            for _ in self.tlsConnection.closeAsync():
+                pass
+        except Exception as exc:
+            self._fatalError(exc)
+        else:
+            self._closeTransport()
+
+    def _abort(self):
+        """Close the transport without notifying peer"""
+        self._closing = True
+        if self._transport is not None:
+            self._transport.abort()
+
+    def _flush(self):
+        """Write data produced by the TLS connection to transport"""
+        data = self.tlsConnection.data_to_send()
+        if data and self._transport is not None:
+            self._transport.write(data)
+
+    def _closeTransport(self):
+        """Write outstanding data and close the transport"""
+        self._closing = True
+        self._flush()
+        if self._transport is not None:
+            self._transport.close()
+
+    def _fatalError(self, exc):
+        """Send outstanding alerts and close the connection"""
+        self._error = exc
+        self._closeTransport()
+
+
+def open_tls_connection(host=None, port=None, loop=None,
+                        limit=_DEFAULT_LIMIT,
+                        username=None, password=None,
+                        certChain=None, privateKey=None,
+                        checker=None, settings=None, anon=False,
+                        **kwds):
+    """
+    Open a TLS connection and return a reader/writer pair
+
+    The TLS related parameters have the same meaning as in
+    L{tlslite.integration.clienthelper.ClientHelper}, other keyword
+    arguments are passed to loop.create_connection().
+
+    @rtype: asyncio.Future
+    @return: future that will be set to (StreamReader, StreamWriter)
+    tuple once the TLS handshake finishes
+    """
+    if loop is None:
+        loop = asyncio.get_event_loop()
+    helper = ClientHelper(username, password, certChain, privateKey,
+                          checker, settings, anon, host)
+    result = asyncio.Future(loop=loop)
+    handshakeDone = asyncio.Future(loop=loop)
+    reader = asyncio.StreamReader(limit=limit, loop=loop)
+    streamProtocol = asyncio.StreamReaderProtocol(reader, loop=loop)
+
+    def factory():
+        return TLSAsyncioProtocol(streamProtocol, helper._handshakeAsync,
+                                  handshakeDone, loop)
+
+    def connected(future):
+        if future.cancelled():
+            result.cancel()
+            return
+        if future.exception() is not None:
+            result.set_exception(future.exception())
+            return
+        transport, tlsProtocol = future.result()
+
+        def handshakeFinished(future):
+            if result.cancelled():
+                transport.close()
+            elif future.exception() is not None:
+                result.set_exception(future.exception())
+            else:
+                writer = asyncio.StreamWriter(tlsProtocol._appTransport,
+                                              streamProtocol, reader, loop)
+                result.set_result((reader, writer))
+
+        handshakeDone.add_done_callback(handshakeFinished)
+
+    connect = asyncio.ensure_future(
+        loop.create_connection(factory, host, port, **kwds), loop=loop)
+    connect.add_done_callback(connected)
+    return result
+
+
+def start_tls_server(client_connected_cb, host=None, port=None, loop=None,
+                     limit=_DEFAULT_LIMIT,
+                     verifierDB=None, certChain=None, privateKey=None,
+                     reqCert=False, sessionCache=None, settings=None,
+                     checker=None, reqCAs=None, tacks=None,
+                     activationFlags=0, nextProtos=None, anon=False,
+                     keyPool=None, ticketKeyManager=None, **kwds):
+    """
+    Start a TLS server, call back for each client connected
+
+    client_connected_cb is called with a StreamReader and StreamWriter
+    pair after the TLS handshake with the client finishes, if it returns
+    a coroutine, it is scheduled as a Task. Clients that fail the
+    handshake are disconnected without calling it.
+
+    The TLS related parameters have the same meaning as in
+    L{TLSConnection.handshakeServer}, other keyword arguments are passed
+    to loop.create_server().
+
+    @rtype: asyncio.Future
+    @return: future with the Server object, as returned by
+    loop.create_server()
+    """
+    if loop is None:
+        loop = asyncio.get_event_loop()
+
+    def handshaker(tlsConnection):
+        return tlsConnection.handshakeServerAsync(
+            verifierDB=verifierDB, certChain=certChain,
+            privateKey=privateKey, reqCert=reqCert,
+            sessionCache=sessionCache, settings=settings, checker=checker,
+            reqCAs=reqCAs, tacks=tacks, activationFlags=activationFlags,
+            nextProtos=nextProtos, anon=anon, keyPool=keyPool,
+            ticketKeyManager=ticketKeyManager)
+
+    def factory():
+        reader = asyncio.StreamReader(limit=limit, loop=loop)
+        streamProtocol = asyncio.StreamReaderProtocol(reader,
+                                                      client_connected_cb,
+                                                      loop=loop)
+        return TLSAsyncioProtocol(streamProtocol, handshaker, loop=loop)
+
+    return asyncio.ensure_future(loop.create_server(factory, host, port,
+                                                    **kwds),
+                                 loop=loop)
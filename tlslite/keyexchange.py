@@ -14,8 +14,9 @@ from .constants import SignatureAlgorithm, HashAlgorithm, CipherSuite, \
 from .utils.ecc import decodeX962Point, encodeX962Point, getCurveByName, \
         getPointByteSize
 from .utils.rsakey import RSAKey
+from .ephemeralkeypool import generateECDHKey, generateDHKey
 from .utils.cryptomath import bytesToNumber, getRandomBytes, powMod, \
-        numBits, numberToByteArray
+        numBits, numberToByteArray, fixedBasePowMod
 import ecdsa
 
 class KeyExchange(object):
@@ -232,12 +233,14 @@ class DHE_RSAKeyExchange(KeyExchange):
     NOT stable API, do NOT use
     """
 
-    def __init__(self, cipherSuite, clientHello, serverHello, privateKey):
+    def __init__(self, cipherSuite, clientHello, serverHello, privateKey,
+                 keyPool=None):
         super(DHE_RSAKeyExchange, self).__init__(cipherSuite, clientHello,
                                                  serverHello, privateKey)
 #pylint: enable = invalid-name
         self.dh_Xs = None
         self.dh_Yc = None
+        self.keyPool = keyPool
 
     # 2048-bit MODP Group (RFC 3526, Section 3)
     dh_g, dh_p = goodGroupParameters[2]
@@ -247,10 +250,14 @@ class DHE_RSAKeyExchange(KeyExchange):
 
     def makeServerKeyExchange(self, sigHash=None):
         """Prepare server side of key exchange with selected parameters"""
-        # Per RFC 3526, Section 1, the exponent should have double the entropy
-        # of the strength of the curve.
-        self.dh_Xs = bytesToNumber(getRandomBytes(self.strength * 2 // 8))
-        dh_Ys = powMod(self.dh_g, self.dh_Xs, self.dh_p)
+        share = None
+        if self.keyPool is not None:
+            share = self.keyPool.getDHKey(self.dh_g, self.dh_p)
+        if share is None:
+            # Per RFC 3526, Section 1, the exponent should have double the
+            # entropy of the strength of the curve.
+            share = generateDHKey((self.dh_g, self.dh_p), self.strength * 2)
+        self.dh_Xs, dh_Ys = share
 
         version = self.serverHello.server_version
         serverKeyExchange = ServerKeyExchange(self.cipherSuite, version)
@@ -299,12 +306,13 @@ class ECDHE_RSAKeyExchange(KeyExchange):
     """Helper class for conducting ECDHE key exchange"""
 
     def __init__(self, cipherSuite, clientHello, serverHello, privateKey,
-                 acceptedCurves):
+                 acceptedCurves, keyPool=None):
         super(ECDHE_RSAKeyExchange, self).__init__(cipherSuite, clientHello,
                                                    serverHello, privateKey)
 #pylint: enable = invalid-name
         self.ecdhXs = None
         self.acceptedCurves = acceptedCurves
+        self.keyPool = keyPool
         self.group_id = None
         self.ecdhYc = None
 
@@ -324,10 +332,12 @@ class ECDHE_RSAKeyExchange(KeyExchange):
                              None)
         if self.group_id is None:
             raise TLSInsufficientSecurity("No mutual groups")
-        generator = getCurveByName(GroupName.toRepr(self.group_id)).generator
-        self.ecdhXs = ecdsa.util.randrange(generator.order())
-
-        ecdhYs = encodeX962Point(generator * self.ecdhXs)
+        share = None
+        if self.keyPool is not None:
+            share = self.keyPool.getECDHKey(self.group_id)
+        if share is None:
+            share = generateECDHKey(self.group_id)
+        self.ecdhXs, ecdhYs = share
 
         version = self.serverHello.server_version
         serverKeyExchange = ServerKeyExchange(self.cipherSuite, version)
@@ -403,7 +413,7 @@ class SRPKeyExchange(KeyExchange):
         #Calculate server's ephemeral DH values (b, B)
         self.b = bytesToNumber(getRandomBytes(32))
         k = makeK(self.N, g)
-        self.B = (powMod(g, self.b, self.N) + (k * self.v)) % self.N
+        self.B = (fixedBasePowMod(g, self.b, self.N) + (k * self.v)) % self.N
 
         #Create ServerKeyExchange, signing it if necessary
         serverKeyExchange = ServerKeyExchange(self.cipherSuite,
@@ -24,19 +24,56 @@ goodGroupParameters = [(2,0xEEAF0AB9ADB38DD69C33F80AFA8FC5E86072618775FF3C0B9EA2
                        (5,0xFFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7EDEE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3BE39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA051015728E5A8AAAC42DAD33170D04507A33A85521ABDF1CBA64ECFB850458DBEF0A8AEA71575D060C7DB3970F85A6E1E4C7ABF5AE8CDB0933D71E8C94E04A25619DCEE3D2261AD2EE6BF12FFA06D98A0864D87602733EC86A64521F2B18177B200CBBE117577A615D6C770988C0BAD946E208E24FA074E5AB3143DB5BFCE0FD108E4B82D120A92108011A723C12A787E6D788719A10BDBA5B2699C327186AF4E23C1A946834B6150BDA2583E9CA2AD44CE8DBBBC2DB04DE8EF92E8EFC141FBECAA6287C59474E6BC05D99B2964FA090C3A2233BA186515BE7ED1F612970CEE2D7AFB81BDD762170481CD0069127D5B05AA993B4EA988D8FDDC186FFB7DC90A6C08F4DF435C93402849236C3FAB4D27C7026C1D4DCB2602646DEC9751E763DBA37BDF8FF9406AD9E530EE5DB382F413001AEB06A53ED9027D831179727B0865A8918DA3EDBEBCF9B14ED44CE6CBACED4BB1BDB7F1447E6CC254B332051512BD7AF426FB8F401378CD2BF5983CA01C64B92ECF032EA15D1721D03F482D7CE6E74FEF6D55E702F46980C82B5A84031900B1C9E59E7C97FBEC7E8F323A97A7E36CC88BE0F1D45B7FF585AC54BD407B22B4154AACC8F6D7EBF48E1D814CC5ED20F8037E0A79715EEF29BE32806A1D58BB7C5DA76F550AA3D8A1FBFF0EB19CCB1A313D55CDA56C9EC2EF29632387FE8D76E3C0468043E8F663F4860EE12BF2D5B0B7474D6E694F91E6DCC4024FFFFFFFFFFFFFFFF),\
                        (5,0xFFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7EDEE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3BE39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA051015728E5A8AAAC42DAD33170D04507A33A85521ABDF1CBA64ECFB850458DBEF0A8AEA71575D060C7DB3970F85A6E1E4C7ABF5AE8CDB0933D71E8C94E04A25619DCEE3D2261AD2EE6BF12FFA06D98A0864D87602733EC86A64521F2B18177B200CBBE117577A615D6C770988C0BAD946E208E24FA074E5AB3143DB5BFCE0FD108E4B82D120A92108011A723C12A787E6D788719A10BDBA5B2699C327186AF4E23C1A946834B6150BDA2583E9CA2AD44CE8DBBBC2DB04DE8EF92E8EFC141FBECAA6287C59474E6BC05D99B2964FA090C3A2233BA186515BE7ED1F612970CEE2D7AFB81BDD762170481CD0069127D5B05AA993B4EA988D8FDDC186FFB7DC90A6C08F4DF435C93402849236C3FAB4D27C7026C1D4DCB2602646DEC9751E763DBA37BDF8FF9406AD9E530EE5DB382F413001AEB06A53ED9027D831179727B0865A8918DA3EDBEBCF9B14ED44CE6CBACED4BB1BDB7F1447E6CC254B332051512BD7AF426FB8F401378CD2BF5983CA01C64B92ECF032EA15D1721D03F482D7CE6E74FEF6D55E702F46980C82B5A84031900B1C9E59E7C97FBEC7E8F323A97A7E36CC88BE0F1D45B7FF585AC54BD407B22B4154AACC8F6D7EBF48E1D814CC5ED20F8037E0A79715EEF29BE32806A1D58BB7C5DA76F550AA3D8A1FBFF0EB19CCB1A313D55CDA56C9EC2EF29632387FE8D76E3C0468043E8F663F4860EE12BF2D5B0B7474D6E694F91E6DBE115974A3926F12FEE5E438777CB6A932DF8CD8BEC4D073B931BA3BC832B68D9DD300741FA7BF8AFC47ED2576F6936BA424663AAB639C5AE4F5683423B4742BF1C978238F16CBE39D652DE3FDB8BEFC848AD922222E04A4037C0713EB57A81A23F0C73473FC646CEA306B4BCBC8862F8385DDFA9D4B7FA2C087E879683303ED5BDD3A062B3CF5B3A278A66D2A13F83F44F82DDF310EE074AB6A364597E899A0255DC164F31CC50846851DF9AB48195DED7EA1B1D510BD7EE74D73FAF36BC31ECFA268359046F4EB879F924009438B481C6CD7889A002ED5EE382BC9190DA6FC026E479558E4475677E9AA9E3050E2765694DFC81F56E880B96E7160C980DD98EDD3DFFFFFFFFFFFFFFFFF)]
 
+def P_hashName(macName, secret, seed, length):
+    """
+    Internal method for calculation of the PRF in TLS
+
+    @type macName: str
+    @param macName: name of the hash used for HMAC, e.g. 'sha256'
+    """
+    # HMAC is keyed only once, for every block its copy is used
+    mac = hmac.HMAC(compatHMAC(secret), digestmod=getattr(hashlib, macName))
+    seed = compatHMAC(seed)
+    A = seed
+    output = []
+    outputLength = 0
+    while outputLength < length:
+        aMac = mac.copy()
+        aMac.update(A)
+        A = aMac.digest()
+        outMac = mac.copy()
+        outMac.update(A)
+        outMac.update(seed)
+        block = outMac.digest()
+        output.append(block)
+        outputLength += len(block)
+    return bytearray(b''.join(output)[:length])
+
+_P_HASH_NAMES = {HMAC_MD5: 'md5',
+                 HMAC_SHA1: 'sha1',
+                 HMAC_SHA256: 'sha256',
+                 HMAC_SHA384: 'sha384'}
+
 def P_hash(macFunc, secret, seed, length):
-    bytes = bytearray(length)
+    """
+    Internal method for calculation of the PRF in TLS
+
+    @type macFunc: callable
+    @param macFunc: HMAC function called as macFunc(key, data), e.g.
+        HMAC_SHA256
+    """
+    macName = _P_HASH_NAMES.get(macFunc)
+    if macName is not None:
+        return P_hashName(macName, secret, seed, length)
+    output = []
+    outputLength = 0
     A = seed
-    index = 0
-    while 1:
+    while outputLength < length:
         A = macFunc(secret, A)
-        output = macFunc(secret, A + seed)
-        for c in output:
-            if index >= length:
-                return bytes
-            bytes[index] = c
-            index += 1
-    return bytes
+        block = macFunc(secret, A + seed)
+        output.append(block)
+        outputLength += len(block)
+    return bytearray().join(output)[:length]
 
 def PRF(secret, label, seed, length):
     #Split the secret into left and right halves
@@ -45,35 +82,33 @@ def PRF(secret, label, seed, length):
     S2 = secret[ int(math.floor(len(secret)/2.0)) : ]
 
     #Run the left half through P_MD5 and the right half through P_SHA1
-    p_md5 = P_hash(HMAC_MD5, S1, label + seed, length)
-    p_sha1 = P_hash(HMAC_SHA1, S2, label + seed, length)
+    p_md5 = P_hashName('md5', S1, label + seed, length)
+    p_sha1 = P_hashName('sha1', S2, label + seed, length)
 
     #XOR the output values and return the result
-    for x in range(length):
-        p_md5[x] ^= p_sha1[x]
-    return p_md5
+    return int_to_bytes(bytes_to_int(p_md5) ^ bytes_to_int(p_sha1), length)
 
 def PRF_1_2(secret, label, seed, length):
     """Pseudo Random Function for TLS1.2 ciphers that use SHA256"""
-    return P_hash(HMAC_SHA256, secret, label + seed, length)
+    return P_hashName('sha256', secret, label + seed, length)
 
 def PRF_1_2_SHA384(secret, label, seed, length):
     """Pseudo Random Function for TLS1.2 ciphers that use SHA384"""
-    return P_hash(HMAC_SHA384, secret, label + seed, length)
+    return P_hashName('sha384', secret, label + seed, length)
 
 def PRF_SSL(secret, seed, length):
-    bytes = bytearray(length)
-    index = 0
+    output = []
+    outputLength = 0
     for x in range(26):
+        if outputLength >= length:
+            break
         A = bytearray([ord('A')+x] * (x+1)) # 'A', 'BB', 'CCC', etc..
         input = secret + SHA1(A + secret + seed)
-        output = MD5(input)
-        for c in output:
-            if index >= length:
-                return bytes
-            bytes[index] = c
-            index += 1
-    return bytes
+        output.append(MD5(input))
+        outputLength += 16
+    output = bytearray().join(output)[:length]
+    # only 26 blocks are defined, longer requests are zero-padded
+    return output + bytearray(length - len(output))
 
 def calcExtendedMasterSecret(version, cipherSuite, premasterSecret,
                              handshakeHashes):
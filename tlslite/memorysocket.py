@@ -0,0 +1,107 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""Socket emulation that exchanges data through memory buffers"""
+
+import errno
+import socket
+
+
+class MemorySocket(object):
+    """
+    Socket-like object that reads and writes in-memory buffers
+
+    Allows using the TLS connection without any I/O, in the same way as
+    ssl.MemoryBIO: data received from the peer is passed to feed(), data
+    that needs to be sent to the peer is returned by dataToSend().
+
+    When no data is available, recv() raises EWOULDBLOCK, the same way a
+    non-blocking socket does, so the connection must be used through its
+    non-blocking (generator) API.
+
+    Not multithread safe.
+
+    @type eof: boolean
+    @ivar eof: whether the peer has finished sending data
+    """
+
+    def __init__(self):
+        """Create socket with empty buffers"""
+        self._incoming = bytearray()
+        self._outgoing = []
+        self.eof = False
+        self.closed = False
+
+    def feed(self, data):
+        """
+        Add data received from the peer
+
+        Empty data marks the end of the stream.
+        """
+        if not data:
+            self.eof = True
+        else:
+            self._incoming += data
+
+    def dataToSend(self):
+        """Return and remove all the data that was sent to the socket"""
+        data = bytearray().join(self._outgoing)
+        self._outgoing = []
+        return data
+
+    @property
+    def pendingLength(self):
+        """Number of received bytes not yet read"""
+        return len(self._incoming)
+
+    def _checkRecv(self):
+        """Raise exception if there's nothing to read"""
+        if not self._incoming and not self.eof and not self.closed:
+            raise socket.error(errno.EWOULDBLOCK, "No data available")
+
+    def recv(self, bufsize):
+        """Receive data (socket emulation)"""
+        self._checkRecv()
+        data = self._incoming[:bufsize]
+        del self._incoming[:bufsize]
+        return data
+
+    def recv_into(self, buffer):
+        """Receive data into buffer (socket emulation)"""
+        self._checkRecv()
+        length = min(len(buffer), len(self._incoming))
+        buffer[:length] = self._incoming[:length]
+        del self._incoming[:length]
+        return length
+
+    def send(self, data):
+        """Send data (socket emulation)"""
+        if self.closed:
+            raise socket.error(errno.EPIPE, "Socket closed")
+        self._outgoing.append(bytearray(data))
+        return len(data)
+
+    def sendall(self, data):
+        """Send all data (socket emulation)"""
+        self.send(data)
+
+    def sendmsg(self, buffers):
+        """Send data from multiple buffers (socket emulation)"""
+        if self.closed:
+            raise socket.error(errno.EPIPE, "Socket closed")
+        length = 0
+        for buf in buffers:
+            self._outgoing.append(bytearray(buf))
+            length += len(buf)
+        return length
+
+    def shutdown(self, how):
+        """Shut down the socket (socket emulation)"""
+        pass
+
+    def close(self):
+        """
+        Stop accepting data for sending (socket emulation)
+
+        Data sent before close can still be retrieved with dataToSend().
+        """
+        self.closed = True
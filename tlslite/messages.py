@@ -1625,6 +1625,53 @@ class Finished(HandshakeMsg):
         return self.postWrite(w)
 
 
+class NewSessionTicket(HandshakeMsg):
+    """
+    Handling of the TLS Handshake protocol NewSessionTicket message
+
+    See RFC5077.
+
+    @type ticket_lifetime_hint: int
+    @ivar ticket_lifetime_hint: number of seconds the ticket should be
+    stored by client, 0 if unspecified
+
+    @type ticket: bytearray
+    @ivar ticket: opaque ticket to send in the next ClientHello
+    """
+
+    def __init__(self):
+        """Create an object for deserialisation"""
+        HandshakeMsg.__init__(self, HandshakeType.new_session_ticket)
+        self.ticket_lifetime_hint = 0
+        self.ticket = bytearray(0)
+
+    def create(self, ticket_lifetime_hint, ticket):
+        """Set the message payload"""
+        self.ticket_lifetime_hint = ticket_lifetime_hint
+        self.ticket = ticket
+        return self
+
+    def parse(self, parser):
+        """Deserialise the message from on the wire data"""
+        parser.startLengthCheck(3)
+        self.ticket_lifetime_hint = parser.get(4)
+        self.ticket = parser.getVarBytes(2)
+        parser.stopLengthCheck()
+        return self
+
+    def write(self):
+        """Serialise the message to on the wire data"""
+        writer = Writer()
+        writer.add(self.ticket_lifetime_hint, 4)
+        writer.addVarSeq(self.ticket, 1, 2)
+        return self.postWrite(writer)
+
+    def __repr__(self):
+        """Human readable representation of object"""
+        return "NewSessionTicket(ticket_lifetime_hint={0}, ticket={1!r})"\
+               .format(self.ticket_lifetime_hint, self.ticket)
+
+
 class SSL2Finished(HandshakeMsg):
     """Handling of the SSL2 FINISHED messages"""
 
@@ -6,13 +6,15 @@
 
 import socket
 import errno
+import struct
+from collections import deque
 from .utils import tlshashlib as hashlib
 from .constants import ContentType, CipherSuite
 from .messages import RecordHeader3, RecordHeader2, Message
 from .utils.cipherfactory import createAESGCM, createAES, createRC4, \
         createTripleDES, createCHACHA20
-from .utils.codec import Parser, Writer
-from .utils.compat import compatHMAC
+from .utils.codec import Parser
+from .utils.compat import compatHMAC, compatMemoryview
 from .utils.cryptomath import getRandomBytes, MD5
 from .utils.constanttime import ct_compare_digest, ct_check_cbc_mac_and_pad
 from .errors import TLSRecordOverflow, TLSIllegalParameterException,\
@@ -22,7 +24,38 @@ from .mathtls import createMAC_SSL, createHMAC, PRF_SSL, PRF, PRF_1_2, \
 
 class RecordSocket(object):
 
-    """Socket wrapper for reading and writing TLS Records"""
+    """
+    Socket wrapper for reading and writing TLS Records
+
+    @type recvInto: bool
+    @ivar recvInto: receive records into a preallocated, per-connection
+    buffer using C{recv_into()} instead of concatenating the results of
+    C{recv()} calls. Record headers are parsed directly from the buffer,
+    so a record costs at most two system calls and the payload is copied
+    only once, when it is returned to the caller. False by default.
+
+    @type readAhead: int
+    @ivar readAhead: number of bytes to request from socket in a single
+    C{recv_into()} call, irrespective of size of the record being read.
+    Data read past the end of the record is kept for subsequent L{recv}
+    calls. Setting it to non-zero value implies L{recvInto}. Note that
+    data buffered this way is not visible to C{select()} and similar calls
+    on the underlying socket, check L{RecordLayer.bufferedLength} (which
+    also counts the records already decrypted by L{RecordLayer}) before
+    waiting on socket. 0 (disabled) by default.
+    """
+
+    # 18432 = 2**14 (basic record size limit) + 1024 (maximum compression
+    # overhead) + 1024 (maximum encryption overhead)
+    maxRecordLength = 18432
+
+    # maximum number of buffers passed to single sendmsg() call (IOV_MAX
+    # on Linux)
+    _iovMax = 1024
+
+    # 5 bytes is the size of SSLv3 record header, SSLv2 headers are 2 or 3
+    # bytes long
+    _headerLength = 5
 
     def __init__(self, sock):
         """
@@ -32,15 +65,30 @@ class RecordSocket(object):
         """
         self.sock = sock
         self.version = (0, 0)
+        self.recvInto = False
+        self.readAhead = 0
+
+        self._recvBuffer = None
+        self._recvView = None
+        self._recvStart = 0
+        self._recvEnd = 0
 
     def _sockSendAll(self, data):
         """
         Send all data through socket
 
-        @type data: bytearray
-        @param data: data to send
+        @type data: bytearray or list of bytearray
+        @param data: data to send, in case of a list the elements are sent
+            using scatter/gather I/O if the socket supports it
         @raise socket.error: when write to socket failed
         """
+        if isinstance(data, list):
+            if hasattr(self.sock, "sendmsg"):
+                for result in self._sockSendMsgAll(data):
+                    yield result
+                return
+            data = bytearray().join(data)
+
         while 1:
             try:
                 bytesSent = self.sock.send(data)
@@ -55,6 +103,37 @@ class RecordSocket(object):
             data = data[bytesSent:]
             yield 1
 
+    def _sockSendMsgAll(self, buffers):
+        """
+        Send all buffers through socket using sendmsg()
+
+        @type buffers: list of bytearray
+        @param buffers: data to send
+        @raise socket.error: when write to socket failed
+        """
+        buffers = list(buffers)
+        index = 0
+        while index < len(buffers):
+            batchEnd = min(index + self._iovMax, len(buffers))
+            try:
+                bytesSent = self.sock.sendmsg(buffers[index:batchEnd])
+            except socket.error as why:
+                if why.args[0] in (errno.EWOULDBLOCK, errno.EAGAIN):
+                    yield 1
+                    continue
+                raise
+
+            # skip over the buffers that were sent in their entirety
+            while index < len(buffers) and \
+                    bytesSent >= len(buffers[index]):
+                bytesSent -= len(buffers[index])
+                index += 1
+            if bytesSent:
+                buffers[index] = memoryview(buffers[index])[bytesSent:]
+
+            if index < batchEnd:
+                yield 1
+
     def send(self, msg, padding=0):
         """
         Send the message through socket.
@@ -65,19 +144,54 @@ class RecordSocket(object):
         @param padding: amount of padding to specify for SSLv2
         @raise socket.error: when write to socket failed
         """
-        data = msg.write()
+        for result in self.sendRecords([msg], [padding]):
+            yield result
 
-        if self.version in ((2, 0), (0, 2)):
-            header = RecordHeader2().create(len(data),
-                                            padding)
-        else:
-            header = RecordHeader3().create(self.version,
-                                            msg.contentType,
-                                            len(data))
+    def sendRecords(self, msgs, paddings=None):
+        """
+        Send multiple messages through socket using a single write.
+
+        Record headers and payloads are passed to the socket as separate
+        buffers, so no copy of the data is made when the socket supports
+        scatter/gather I/O (sendmsg()).
+
+        @type msgs: list
+        @param msgs: TLS messages to send
+        @type paddings: list of int
+        @param paddings: amount of padding to specify for SSLv2, for every
+            message
+        @raise socket.error: when write to socket failed
+        """
+        if paddings is None:
+            paddings = [0] * len(msgs)
+
+        buffers = []
+        for msg, padding in zip(msgs, paddings):
+            data = msg.write()
+
+            if self.version in ((2, 0), (0, 2)):
+                header = RecordHeader2().create(len(data),
+                                                padding)
+            else:
+                header = RecordHeader3().create(self.version,
+                                                msg.contentType,
+                                                len(data))
 
-        data = header.write() + data
+            buffers.append(header.write())
+            buffers.append(data)
 
-        for result in self._sockSendAll(data):
+        for result in self._sockSendAll(buffers):
+            yield result
+
+    def sendRawRecords(self, records):
+        """
+        Send records that already include the record header.
+
+        @type records: list of bytearray
+        @param records: complete records (header and payload) to send
+        @raise socket.error: when write to socket failed
+        """
+        for result in self._sockSendAll(list(records)):
             yield result
 
     def _sockRecvAll(self, length):
@@ -112,6 +226,185 @@ class RecordSocket(object):
             if len(buf) == length:
                 yield buf
 
+    @property
+    def bufferedLength(self):
+        """Return number of received bytes not yet returned as records"""
+        return self._recvEnd - self._recvStart
+
+    def _recvBufferSize(self):
+        """Return the size of buffer needed for receiving records"""
+        return max(self.maxRecordLength + self._headerLength, self.readAhead)
+
+    def bufferedRecordType(self):
+        """
+        Return content type of the next record if it was already received
+
+        @rtype: int
+        @return: content type of the record if it is buffered in its
+            entirety, None if the record is incomplete or an SSLv2 record
+        """
+        start = self._recvStart
+        if self._recvEnd - start < self._headerLength or \
+                self._recvBuffer[start] not in ContentType.all:
+            return None
+        length = self._recvBuffer[start + 3] << 8 | \
+                self._recvBuffer[start + 4]
+        if self._recvEnd - start < self._headerLength + length:
+            return None
+        return self._recvBuffer[start]
+
+    def _prepareRecvBuffer(self, length):
+        """
+        Make sure there is space for L{length} bytes in receive buffer
+
+        Allocates the buffer on first use and moves the unprocessed data to
+        the beginning of the buffer when there is not enough space left at
+        its end. As the data is consumed in whole records, at most a single
+        partially received record needs to be moved.
+        """
+        size = max(self._recvBufferSize(), length)
+        if self._recvBuffer is None or len(self._recvBuffer) < size:
+            newBuffer = bytearray(size)
+            if self._recvBuffer is not None:
+                pending = self._recvEnd - self._recvStart
+                newBuffer[:pending] = \
+                        self._recvBuffer[self._recvStart:self._recvEnd]
+                self._recvEnd = pending
+                self._recvStart = 0
+            self._recvBuffer = newBuffer
+            self._recvView = compatMemoryview(newBuffer)
+        elif self._recvStart == self._recvEnd:
+            self._recvStart = 0
+            self._recvEnd = 0
+        elif len(self._recvBuffer) - self._recvStart < length:
+            pending = self._recvEnd - self._recvStart
+            self._recvBuffer[:pending] = \
+                    self._recvBuffer[self._recvStart:self._recvEnd]
+            self._recvStart = 0
+            self._recvEnd = pending
+
+    def _sockRecvInto(self, start, end):
+        """Receive data from socket into the receive buffer at start:end"""
+        # without memoryview, slicing the buffer would copy it
+        if self._recvView is not self._recvBuffer and \
+                hasattr(self.sock, "recv_into"):
+            return self.sock.recv_into(self._recvView[start:end])
+        # socket-like objects don't have to support the buffer interface
+        data = self.sock.recv(end - start)
+        self._recvBuffer[start:start + len(data)] = data
+        return len(data)
+
+    def _sockRecvBuffered(self, length, maxLength=None):
+        """
+        Make sure that at least L{length} bytes are in the receive buffer.
+
+        @type maxLength: int
+        @param maxLength: number of bytes to request from socket when the
+            buffer holds less than L{length}, L{length} if not specified
+
+        @rtype: generator
+        @return: generator that will return 0 in case the socket is non
+           blocking and would block and memoryview of the requested data
+           in case the buffer holds it
+        @raise TLSAbruptCloseError: when the socket closed
+        """
+        if maxLength is None:
+            maxLength = length
+        if self._recvEnd - self._recvStart < length:
+            self._prepareRecvBuffer(maxLength)
+
+        while self._recvEnd - self._recvStart < length:
+            end = self._recvStart + maxLength
+            if self.readAhead:
+                end = min(len(self._recvBuffer),
+                          max(end, self._recvEnd + self.readAhead))
+            try:
+                received = self._sockRecvInto(self._recvEnd, end)
+            except socket.error as why:
+                if why.args[0] in (errno.EWOULDBLOCK, errno.EAGAIN):
+                    yield 0
+                    continue
+                else:
+                    raise
+
+            #if the connection closed, raise socket error
+            if not received:
+                raise TLSAbruptCloseError()
+
+            self._recvEnd += received
+
+        yield self._recvView[self._recvStart:self._recvStart + length]
+
+    def _recvBuffered(self):
+        """
+        Read a single record using the preallocated buffer
+
+        @rtype: generator
+        @return: generator that returns 0 in case the read would be
+            blocking or a tuple containing record header (object) and record
+            data (bytearray)
+        """
+        # the first byte tells the header length, but ask for a whole
+        # SSLv3 header so that it usually takes a single call
+        result = None
+        for result in self._sockRecvBuffered(1, self._headerLength):
+            if result in (0, 1):
+                yield result
+            else: break
+        assert result is not None
+
+        firstByte = self._recvBuffer[self._recvStart]
+        ssl2 = firstByte not in ContentType.all
+        if not ssl2:
+            headerLength = self._headerLength
+        elif firstByte & 0x80:
+            headerLength = 2
+        else:
+            headerLength = 3
+
+        result = None
+        for result in self._sockRecvBuffered(headerLength):
+            if result in (0, 1):
+                yield result
+            else: break
+        assert result is not None
+
+        # parse the header directly from the buffer
+        parser = Parser(self._recvBuffer)
+        parser.index = self._recvStart
+        if ssl2:
+            record = RecordHeader2().parse(parser)
+            self._checkSSL2Header(record)
+        else:
+            record = RecordHeader3().parse(parser)
+
+        if record.length > self.maxRecordLength:
+            raise TLSRecordOverflow()
+
+        result = None
+        for result in self._sockRecvBuffered(headerLength + record.length):
+            if result in (0, 1):
+                yield result
+            else: break
+        assert result is not None
+
+        start = self._recvStart + headerLength
+        end = start + record.length
+        buf = bytearray(self._recvView[start:end])
+        self._recvStart = end
+
+        yield (record, buf)
+
+    @staticmethod
+    def _checkSSL2Header(record):
+        """Check sanity of SSLv2 record header"""
+        # padding can't be longer than overall length and if it is present
+        # the overall size must be a multiple of cipher block size
+        if ((record.padding > record.length) or
+                (record.padding and record.length % 8)):
+            raise TLSIllegalParameterException(\
+                    "Malformed record layer header")
+
     def _recvHeader(self):
         """Read a single record header from socket"""
         #Read the next record header
@@ -157,12 +450,7 @@ class RecordSocket(object):
         #Parse the record header
         if ssl2:
             record = RecordHeader2().parse(Parser(buf))
-            # padding can't be longer than overall length and if it is present
-            # the overall size must be a multiple of cipher block size
-            if ((record.padding > record.length) or
-                    (record.padding and record.length % 8)):
-                raise TLSIllegalParameterException(\
-                        "Malformed record layer header")
+            self._checkSSL2Header(record)
         else:
             record = RecordHeader3().parse(Parser(buf))
 
@@ -184,6 +472,12 @@ class RecordSocket(object):
         @raise TLSIllegalParameterException: When the record header was
         malformed
         """
+        if self.recvInto or self.readAhead or \
+                self._recvEnd != self._recvStart:
+            for result in self._recvBuffered():
+                yield result
+            return
+
         record = None
         for record in self._recvHeader():
             if record in (0, 1):
@@ -192,9 +486,7 @@ class RecordSocket(object):
         assert record is not None
 
         #Check the record header fields
-        # 18432 = 2**14 (basic record size limit) + 1024 (maximum compression
-        # overhead) + 1024 (maximum encryption overhead)
-        if record.length > 18432:
+        if record.length > self.maxRecordLength:
             raise TLSRecordOverflow()
 
         #Read the record contents
@@ -224,10 +516,9 @@ class ConnectionState(object):
 
     def getSeqNumBytes(self):
         """Return encoded sequence number and increment it."""
-        writer = Writer()
-        writer.add(self.seqnum, 8)
+        seqnumBytes = bytearray(struct.pack('>Q', self.seqnum))
         self.seqnum += 1
-        return writer.bytes
+        return seqnumBytes
 
 class RecordLayer(object):
 
@@ -259,6 +550,8 @@ class RecordLayer(object):
 
         self.handshake_finished = False
 
+        self._recvQueue = deque()
+
     @property
     def blockSize(self):
         """Return the size of block used by current symmetric cipher (R/O)"""
@@ -275,6 +568,48 @@ class RecordLayer(object):
         self._version = val
         self._recordSocket.version = val
 
+    @property
+    def recvInto(self):
+        """Whether records are received into a preallocated buffer"""
+        return self._recordSocket.recvInto
+
+    @recvInto.setter
+    def recvInto(self, value):
+        """Set whether records are received into a preallocated buffer"""
+        self._recordSocket.recvInto = value
+
+    @property
+    def readAhead(self):
+        """
+        Return the number of bytes read from socket in single call
+
+        When non-zero, all complete application data records read together
+        with the current record are decrypted in one go.
+        """
+        return self._recordSocket.readAhead
+
+    @readAhead.setter
+    def readAhead(self, value):
+        """Set the number of bytes read from socket in single call"""
+        self._recordSocket.readAhead = value
+
+    @property
+    def bufferedLength(self):
+        """
+        Return number of received bytes not yet returned as records
+
+        Includes both the data buffered in socket wrapper and the records
+        decrypted ahead of time, a queued decryption error counts as one
+        byte. When non-zero, L{recvRecord} won't wait for the socket.
+        """
+        length = self._recordSocket.bufferedLength
+        for record in self._recvQueue:
+            if isinstance(record, Exception):
+                length += 1
+            else:
+                length += len(record[1].bytes)
+        return length
+
     def getCipherName(self):
         """
         Return the name of the bulk cipher used by this connection
@@ -301,6 +636,7 @@ class RecordLayer(object):
 
     def shutdown(self):
         """Clear read and write states"""
+        self._recvQueue.clear()
         self._writeState = ConnectionState()
         self._readState = ConnectionState()
         self._pendingWriteState = ConnectionState()
@@ -327,25 +663,38 @@ class RecordLayer(object):
         data += paddingBytes
         return data
 
+    def _macHeader(self, seqnumBytes, contentType, length):
+        """Return the sequence number and record header covered by MAC"""
+        assert self.version in ((3, 0), (3, 1), (3, 2), (3, 3))
+        if self.version == (3, 0):
+            return seqnumBytes + struct.pack('>BH', contentType, length)
+        return seqnumBytes + struct.pack('>BBBH', contentType,
+                                         self.version[0], self.version[1],
+                                         length)
+
     def calculateMAC(self, mac, seqnumBytes, contentType, data):
         """Calculate the SSL/TLS version of a MAC"""
-        mac.update(compatHMAC(seqnumBytes))
-        mac.update(compatHMAC(bytearray([contentType])))
-        assert self.version in ((3, 0), (3, 1), (3, 2), (3, 3))
-        if self.version != (3, 0):
-            mac.update(compatHMAC(bytearray([self.version[0]])))
-            mac.update(compatHMAC(bytearray([self.version[1]])))
-        mac.update(compatHMAC(bytearray([len(data)//256])))
-        mac.update(compatHMAC(bytearray([len(data)%256])))
+        mac.update(compatHMAC(self._macHeader(seqnumBytes, contentType,
+                                              len(data))))
         mac.update(compatHMAC(data))
         return bytearray(mac.digest())
 
+    def _calculateRecordMAC(self, state, seqnumBytes, contentType, data):
+        """
+        Calculate MAC of a record using the MAC key of connection state
+
+        Uses a copy of the keyed MAC context of the state, so the key is
+        not processed again for every record.
+        """
+        return self.calculateMAC(state.macContext.copy(), seqnumBytes,
+                                 contentType, data)
+
     def _macThenEncrypt(self, data, contentType):
         """MAC, pad then encrypt data"""
         if self._writeState.macContext:
             seqnumBytes = self._writeState.getSeqNumBytes()
-            mac = self._writeState.macContext.copy()
-            macBytes = self.calculateMAC(mac, seqnumBytes, contentType, data)
+            macBytes = self._calculateRecordMAC(self._writeState, seqnumBytes,
+                                                contentType, data)
             data += macBytes
 
         #Encrypt for Block or Stream Cipher
@@ -378,16 +727,22 @@ class RecordLayer(object):
         # add MAC
         if self._writeState.macContext:
             seqnumBytes = self._writeState.getSeqNumBytes()
-            mac = self._writeState.macContext.copy()
 
             # append MAC
-            macBytes = self.calculateMAC(mac, seqnumBytes, contentType, buf)
+            macBytes = self._calculateRecordMAC(self._writeState, seqnumBytes,
+                                                contentType, buf)
             buf += macBytes
 
         return buf
 
-    def _encryptThenSeal(self, buf, contentType):
-        """Encrypt with AEAD cipher"""
+    def _sealRecord(self, buf, contentType):
+        """
+        Encrypt with AEAD cipher, return the complete record
+
+        The header, explicit nonce, ciphertext and tag are written to a
+        single buffer, allocated once for the whole record.
+        """
+        encContext = self._writeState.encContext
         #Assemble the authenticated data.
         seqNumBytes = self._writeState.getSeqNumBytes()
         authData = seqNumBytes + bytearray([contentType,
@@ -399,15 +754,28 @@ class RecordLayer(object):
         #The nonce is always the fixed nonce and the sequence number.
         nonce = self._writeState.fixedNonce + seqNumBytes
 
-        assert len(nonce) == self._writeState.encContext.nonceLength
-
-        buf = self._writeState.encContext.seal(nonce, buf, authData)
+        assert len(nonce) == encContext.nonceLength
 
         #AES-GCM, has an explicit variable nonce.
-        if "aes" in self._writeState.encContext.name:
-            buf = seqNumBytes + buf
+        if "aes" in encContext.name:
+            explicitNonce = seqNumBytes
+        else:
+            explicitNonce = bytearray(0)
 
-        return buf
+        headerLength = RecordSocket._headerLength
+        offset = headerLength + len(explicitNonce)
+        length = len(explicitNonce) + len(buf) + encContext.tagLength
+        record = bytearray(headerLength + length)
+        record[0] = contentType
+        record[1] = self.version[0]
+        record[2] = self.version[1]
+        record[3] = length // 256
+        record[4] = length % 256
+        record[headerLength:offset] = explicitNonce
+
+        encContext.sealToBuffer(nonce, buf, authData, record, offset)
+
+        return record
 
     def _ssl2Encrypt(self, data):
         """Encrypt in SSL2 mode"""
@@ -444,25 +812,65 @@ class RecordLayer(object):
         @param msg: TLS message to send
         @type msg: ApplicationData, HandshakeMessage, etc.
         """
+        if self._sealsRecords():
+            record = self._sealRecord(msg.write(), msg.contentType)
+            for result in self._recordSocket.sendRawRecords([record]):
+                yield result
+            return
+
+        encryptedMessage, padding = self._encryptRecord(msg)
+
+        for result in self._recordSocket.send(encryptedMessage, padding):
+            yield result
+
+    def sendRecords(self, msgs):
+        """
+        Encrypt, MAC and send multiple messages using a single socket write.
+
+        All messages are encrypted first and then passed to the socket
+        together, see L{sendRecord} for details.
+
+        @param msgs: TLS messages to send
+        @type msgs: list
+        """
+        if self._sealsRecords():
+            records = [self._sealRecord(msg.write(), msg.contentType)
+                       for msg in msgs]
+            for result in self._recordSocket.sendRawRecords(records):
+                yield result
+            return
+
+        encryptedMessages = []
+        paddings = []
+        for msg in msgs:
+            encryptedMessage, padding = self._encryptRecord(msg)
+            encryptedMessages.append(encryptedMessage)
+            paddings.append(padding)
+
+        for result in self._recordSocket.sendRecords(encryptedMessages,
+                                                     paddings):
+            yield result
+
+    def _sealsRecords(self):
+        """Check if records are encrypted using an AEAD cipher"""
+        return self.version not in ((0, 2), (2, 0)) and \
+                self._writeState.encContext is not None and \
+                self._writeState.encContext.isAEAD
+
+    def _encryptRecord(self, msg):
+        """Encrypt and MAC message, return record and SSLv2 padding"""
         data = msg.write()
         contentType = msg.contentType
 
         padding = 0
         if self.version in ((0, 2), (2, 0)):
             data, padding = self._ssl2Encrypt(data)
-        elif self._writeState and \
-            self._writeState.encContext and \
-            self._writeState.encContext.isAEAD:
-            data = self._encryptThenSeal(data, contentType)
         elif self.encryptThenMAC:
             data = self._encryptThenMAC(data, contentType)
         else:
             data = self._macThenEncrypt(data, contentType)
 
-        encryptedMessage = Message(contentType, data)
-
-        for result in self._recordSocket.send(encryptedMessage, padding):
-            yield result
+        return Message(contentType, data), padding
 
     #
     # receiving messages
@@ -491,9 +899,9 @@ class RecordLayer(object):
                 #Calculate MAC
                 seqnumBytes = self._readState.getSeqNumBytes()
                 data = data[:-endLength]
-                mac = self._readState.macContext.copy()
-                macBytes = self.calculateMAC(mac, seqnumBytes, recordType,
-                                             data)
+                macBytes = self._calculateRecordMAC(self._readState,
+                                                    seqnumBytes, recordType,
+                                                    data)
 
                 #Compare MACs
                 if not ct_compare_digest(macBytes, checkBytes):
@@ -560,9 +968,9 @@ class RecordLayer(object):
             buf = buf[:-macLength]
 
             seqnumBytes = self._readState.getSeqNumBytes()
-            mac = self._readState.macContext.copy()
 
-            macBytes = self.calculateMAC(mac, seqnumBytes, recordType, buf)
+            macBytes = self._calculateRecordMAC(self._readState, seqnumBytes,
+                                                recordType, buf)
 
             if not ct_compare_digest(macBytes, checkBytes):
                 raise TLSBadRecordMAC("MAC mismatch")
@@ -613,7 +1021,8 @@ class RecordLayer(object):
                 #Publicly invalid.
                 raise TLSBadRecordMAC("Truncated nonce")
             nonce = self._readState.fixedNonce + buf[:explicitNonceLength]
-            buf = buf[8:]
+            # avoid copying the ciphertext, open() accepts memoryview
+            buf = compatMemoryview(buf)[explicitNonceLength:]
         else:
             nonce = self._readState.fixedNonce + seqnumBytes
 
@@ -678,6 +1087,13 @@ class RecordLayer(object):
         @raise TLSBadRecordMAC: when record has bad MAC or padding
         @raise socket.error: when reading from socket was unsuccessful
         """
+        if self._recvQueue:
+            record = self._recvQueue.popleft()
+            if isinstance(record, Exception):
+                raise record
+            yield record
+            return
+
         result = None
         for result in self._recordSocket.recv():
             if result in (0, 1):
@@ -687,6 +1103,37 @@ class RecordLayer(object):
 
         (header, data) = result
 
+        record = self._decryptRecord(header, data)
+
+        if self.readAhead and header.type == ContentType.application_data:
+            self._decryptBufferedRecords()
+
+        yield record
+
+    def _decryptBufferedRecords(self):
+        """
+        Decrypt application data records already read from socket
+
+        Stops on the first record of other type as it may change the
+        connection state (e.g. ChangeCipherSpec). Errors are queued so
+        that they are raised only after the preceding records were
+        returned.
+        """
+        while self._recordSocket.bufferedRecordType() == \
+                ContentType.application_data:
+            try:
+                for result in self._recordSocket.recv():
+                    assert result not in (0, 1)
+                    break
+                header, data = result
+                self._recvQueue.append(self._decryptRecord(header, data))
+            except (TLSRecordOverflow, TLSDecryptionFailed,
+                    TLSBadRecordMAC) as exc:
+                self._recvQueue.append(exc)
+                break
+
+    def _decryptRecord(self, header, data):
+        """Decrypt and check integrity of a record read from socket"""
         if isinstance(header, RecordHeader2):
             data = self._decryptSSL2(data, header.padding)
             if self.handshake_finished:
@@ -704,7 +1151,7 @@ class RecordLayer(object):
         else:
             data = self._decryptStreamThenMAC(header.type, data)
 
-        yield (header, Parser(data))
+        return (header, Parser(data))
 
     #
     # cryptography state methods
@@ -6,9 +6,43 @@
 
 """Class representing a TLS session."""
 
+import weakref
+
 from .utils.compat import *
+from .utils.codec import Parser, Writer
+from .utils.cryptomath import secureHash
 from .mathtls import *
 from .constants import *
+from .x509 import X509
+from .x509certchain import X509CertChain
+
+# version of the format written by Session.serialize()
+_SERIALIZATION_VERSION = 1
+_FLAG_RESUMABLE = 1
+_FLAG_ENCRYPT_THEN_MAC = 2
+_FLAG_EXTENDED_MASTER_SECRET = 4
+_FLAG_TACK_IN_HELLO_EXT = 8
+# set when the name is None, to tell it apart from an empty name
+_FLAG_NO_SERVER_NAME = 16
+_FLAG_NO_SRP_USERNAME = 32
+
+# server certificate chains referenced by sessions, by fingerprint
+_serverCertChains = weakref.WeakValueDictionary()
+
+
+def _certChainFingerprint(certChain):
+    """Return SHA-256 of the DER encoded certificates of the chain"""
+    writer = Writer()
+    for x509 in certChain.x509List:
+        _addVarBytes(writer, x509.bytes, 3)
+    return bytes(secureHash(writer.bytes, 'sha256'))
+
+
+def _addVarBytes(writer, data, lengthLength):
+    """Add length prefixed data to writer"""
+    writer.add(len(data), lengthLength)
+    writer.bytes += data
+
 
 class Session(object):
     """
@@ -46,8 +80,28 @@ class Session(object):
     @type encryptThenMAC: bool
     @ivar encryptThenMAC: True if connection uses CBC cipher in
     encrypt-then-MAC mode
+
+    @type ticket: bytearray
+    @ivar ticket: The session ticket issued by the server (or None),
+    used by client to resume the session (see RFC 5077).
+
+    @type ticketLifetimeHint: int
+    @ivar ticketLifetimeHint: The number of seconds the server suggested
+    to keep the ticket for, 0 if unspecified.
+
+    Sessions are kept by the thousands in session caches, so the attributes
+    are stored in slots and equal server certificate chains are shared by
+    all sessions. L{serialize} and L{deserialize} convert the session to
+    and from a compact binary form, for storing sessions outside of the
+    process.
     """
 
+    __slots__ = ('masterSecret', 'sessionID', 'cipherSuite', 'srpUsername',
+                 'clientCertChain', '_serverCertChain', 'tackExt',
+                 'tackInHelloExt', 'serverName', 'resumable',
+                 'encryptThenMAC', 'extendedMasterSecret', 'ticket',
+                 'ticketLifetimeHint')
+
     def __init__(self):
         self.masterSecret = bytearray(0)
         self.sessionID = bytearray(0)
@@ -61,6 +115,8 @@ class Session(object):
         self.resumable = False
         self.encryptThenMAC = False
         self.extendedMasterSecret = False
+        self.ticket = None
+        self.ticketLifetimeHint = 0
 
     def create(self, masterSecret, sessionID, cipherSuite,
                srpUsername, clientCertChain, serverCertChain,
@@ -79,33 +135,153 @@ class Session(object):
         self.encryptThenMAC = encryptThenMAC
         self.extendedMasterSecret = extendedMasterSecret
 
+    @property
+    def serverCertChain(self):
+        """The server's certificate chain (or None)."""
+        return self._serverCertChain
+
+    @serverCertChain.setter
+    def serverCertChain(self, certChain):
+        # all sessions of a server share its chain, clients get a new copy
+        # of the chain in every handshake, keep just one of them
+        if isinstance(certChain, X509CertChain) and certChain.x509List:
+            certChain = _serverCertChains.setdefault(
+                _certChainFingerprint(certChain), certChain)
+        self._serverCertChain = certChain
+
+    def __getstate__(self):
+        # classes with __slots__ and no __dict__ can't be pickled otherwise
+        state = dict((name, getattr(self, name)) for name in self.__slots__)
+        state['serverCertChain'] = state.pop('_serverCertChain')
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
     def _clone(self):
         other = Session()
-        other.masterSecret = self.masterSecret
-        other.sessionID = self.sessionID
-        other.cipherSuite = self.cipherSuite
-        other.srpUsername = self.srpUsername
-        other.clientCertChain = self.clientCertChain
-        other.serverCertChain = self.serverCertChain
-        other.tackExt = self.tackExt
-        other.tackInHelloExt = self.tackInHelloExt
-        other.serverName = self.serverName
-        other.resumable = self.resumable
-        other.encryptThenMAC = self.encryptThenMAC
-        other.extendedMasterSecret = self.extendedMasterSecret
+        for name in self.__slots__:
+            setattr(other, name, getattr(self, name))
         return other
 
+    def serialize(self):
+        """Return the session in binary form.
+
+        The TACK extension is not included and the server certificate
+        chain is included only as a fingerprint, see L{deserialize}.
+
+        @rtype: bytearray
+        """
+        flags = 0
+        if self.resumable:
+            flags |= _FLAG_RESUMABLE
+        if self.encryptThenMAC:
+            flags |= _FLAG_ENCRYPT_THEN_MAC
+        if self.extendedMasterSecret:
+            flags |= _FLAG_EXTENDED_MASTER_SECRET
+        if self.tackInHelloExt:
+            flags |= _FLAG_TACK_IN_HELLO_EXT
+        if self.serverName is None:
+            flags |= _FLAG_NO_SERVER_NAME
+        if self.srpUsername is None:
+            flags |= _FLAG_NO_SRP_USERNAME
+        writer = Writer()
+        writer.add(_SERIALIZATION_VERSION, 1)
+        writer.add(self.cipherSuite, 2)
+        writer.add(flags, 1)
+        _addVarBytes(writer, self.masterSecret, 1)
+        _addVarBytes(writer, self.sessionID, 1)
+        _addVarBytes(writer, bytearray(self.serverName or "", "utf-8"), 2)
+        _addVarBytes(writer, bytearray(self.srpUsername or "", "utf-8"), 2)
+        if isinstance(self.serverCertChain, X509CertChain) and \
+                self.serverCertChain.x509List:
+            fingerprint = _certChainFingerprint(self.serverCertChain)
+        else:
+            fingerprint = b''
+        _addVarBytes(writer, bytearray(fingerprint), 1)
+        certs = Writer()
+        if isinstance(self.clientCertChain, X509CertChain):
+            for x509 in self.clientCertChain.x509List:
+                _addVarBytes(certs, x509.bytes, 3)
+        _addVarBytes(writer, certs.bytes, 3)
+        _addVarBytes(writer, self.ticket or bytearray(0), 2)
+        writer.add(self.ticketLifetimeHint, 4)
+        return writer.bytes
+
+    @staticmethod
+    def deserialize(data, certChains=None):
+        """Create a session from the output of L{serialize}.
+
+        The server certificate chain is restored if it's one of
+        certChains or if it's still referenced by another session in the
+        process, otherwise it's set to None.
+
+        @type data: bytearray
+        @param data: serialised session
+
+        @type certChains: list of L{tlslite.x509certchain.X509CertChain}
+        @param certChains: known server certificate chains
+
+        @rtype: L{Session}
+        @raise ValueError: when the data is malformed or uses unsupported
+        version of the format
+        """
+        parser = Parser(bytearray(data))
+        try:
+            if parser.get(1) != _SERIALIZATION_VERSION:
+                raise ValueError("Unsupported session serialization version")
+            session = Session()
+            session.cipherSuite = parser.get(2)
+            flags = parser.get(1)
+            session.masterSecret = parser.getVarBytes(1)
+            session.sessionID = parser.getVarBytes(1)
+            session.serverName = parser.getVarBytes(2).decode("utf-8")
+            session.srpUsername = parser.getVarBytes(2).decode("utf-8")
+            fingerprint = bytes(parser.getVarBytes(1))
+            parser.startLengthCheck(3)
+            x509List = []
+            while not parser.atLengthCheck():
+                x509List.append(X509())
+                x509List[-1].parseBinary(parser.getVarBytes(3))
+            parser.stopLengthCheck()
+            session.ticket = parser.getVarBytes(2) or None
+            session.ticketLifetimeHint = parser.get(4)
+            if parser.getRemainingLength():
+                raise ValueError("Trailing data in serialized session")
+        except (SyntaxError, UnicodeDecodeError):
+            raise ValueError("Malformed serialized session")
+        session.resumable = bool(flags & _FLAG_RESUMABLE)
+        session.encryptThenMAC = bool(flags & _FLAG_ENCRYPT_THEN_MAC)
+        session.extendedMasterSecret = bool(flags &
+                                            _FLAG_EXTENDED_MASTER_SECRET)
+        session.tackInHelloExt = bool(flags & _FLAG_TACK_IN_HELLO_EXT)
+        if flags & _FLAG_NO_SERVER_NAME:
+            session.serverName = None
+        if flags & _FLAG_NO_SRP_USERNAME:
+            session.srpUsername = None
+        if x509List:
+            session.clientCertChain = X509CertChain(x509List)
+        if fingerprint:
+            for certChain in certChains or ():
+                if _certChainFingerprint(certChain) == fingerprint:
+                    session.serverCertChain = certChain
+                    break
+            else:
+                session.serverCertChain = _serverCertChains.get(fingerprint)
+        return session
+
     def valid(self):
         """If this session can be used for session resumption.
 
         @rtype: bool
         @return: If this session can be used for session resumption.
         """
-        return self.resumable and self.sessionID
+        return self.resumable and bool(self.sessionID or self.ticket)
 
     def _setResumable(self, boolean):
-        #Only let it be set to True if the sessionID is non-null
-        if (not boolean) or (boolean and self.sessionID):
+        #Only let it be set to True if the sessionID or ticket is non-null
+        if (not boolean) or (boolean and (self.sessionID or self.ticket)):
             self.resumable = boolean
 
     def getTackId(self):
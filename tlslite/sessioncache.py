@@ -1,4 +1,4 @@
-# Authors: 
+# Authors:
 #   Trevor Perrin
 #   Martin von Loewis - python 3 port
 #   Mirko Dziadzka - bugfix
@@ -9,8 +9,117 @@
 
 import threading
 import time
+from collections import deque
 
-class SessionCache(object):
+from .sessionstore import SessionStore
+
+class _SessionCacheShard(object):
+    """
+    Part of the L{SessionCache} with its own lock
+
+    Entries are kept in least recently used order, each with the time
+    when it expires.
+    """
+
+    # number of least recently used entries checked for expiry on insert
+    purgeBatch = 2
+
+    def __init__(self, maxEntries):
+        self.lock = threading.Lock()
+        self.maxEntries = maxEntries
+        # Maps sessionIDs to [session, expiry time, use stamp] lists
+        self.entries = {}
+        # (use stamp, sessionID) pairs, least recently used first, pairs
+        # with a stamp different from the entry's one are stale and skipped
+        self._order = deque()
+        self._stamp = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, sessionID, currentTime):
+        with self.lock:
+            entry = self.entries.get(sessionID)
+            if entry is None:
+                self.misses += 1
+                return None
+            #When we add sessions they're resumable, but it's possible
+            #for the session to be invalidated later on (if a fatal alert
+            #is returned), so we have to check for resumability before
+            #returning the session.
+            if currentTime > entry[1] or not entry[0].valid():
+                del self.entries[sessionID]
+                self.misses += 1
+                return None
+            self._moveToEnd(sessionID, entry)
+            self.hits += 1
+            return entry[0]
+
+    def _moveToEnd(self, sessionID, entry):
+        """Mark the entry as the most recently used"""
+        self._stamp += 1
+        entry[2] = self._stamp
+        self._order.append((self._stamp, sessionID))
+        # drop the stale pairs once they outnumber the entries
+        if len(self._order) > 2 * len(self.entries) + 16:
+            self._order = deque(i for i in self._order
+                                if self._isCurrent(i))
+
+    def _isCurrent(self, item):
+        """Return True if the order pair refers to a live entry"""
+        entry = self.entries.get(item[1])
+        return entry is not None and entry[2] == item[0]
+
+    def _oldest(self):
+        """Return sessionID of the least recently used entry, or None"""
+        while self._order:
+            if self._isCurrent(self._order[0]):
+                return self._order[0][1]
+            self._order.popleft()
+        return None
+
+    def set(self, sessionID, session, expiry, currentTime):
+        with self.lock:
+            self.entries.pop(sessionID, None)
+            self._purge(currentTime)
+            #If the cache is full, we delete the least recently used
+            #element to make an empty space
+            while self.entries and len(self.entries) >= self.maxEntries:
+                del self.entries[self._oldest()]
+                self.evictions += 1
+            entry = [session, expiry, 0]
+            self.entries[sessionID] = entry
+            self._moveToEnd(sessionID, entry)
+
+    def delete(self, sessionID):
+        with self.lock:
+            self.entries.pop(sessionID, None)
+
+    def touch(self, sessionID, expiry, currentTime):
+        with self.lock:
+            entry = self.entries.get(sessionID)
+            if entry is None or currentTime > entry[1]:
+                return False
+            entry[1] = expiry
+            self._moveToEnd(sessionID, entry)
+            return True
+
+    def _purge(self, currentTime):
+        """Delete expired items among the least recently used ones"""
+        # As every insert checks just a few entries, the cost of expiry is
+        # spread over all inserts, expired entries not reached here
+        # are removed when looked up or evicted
+        for _ in range(self.purgeBatch):
+            sessionID = self._oldest()
+            if sessionID is None:
+                return
+            if currentTime > self.entries[sessionID][1]:
+                del self.entries[sessionID]
+            else:
+                return
+
+
+class SessionCache(SessionStore):
     """This class is used by the server to cache TLS sessions.
 
     Caching sessions allows the client to use TLS session resumption
@@ -18,6 +127,10 @@ class SessionCache(object):
     simply pass a SessionCache instance into the server handshake
     function.
 
+    The sessions are split between shards by hash of session ID, each
+    shard with its own lock, so concurrent lookups rarely wait for each
+    other.
+
     This class is thread-safe.
     """
 
@@ -26,78 +139,83 @@ class SessionCache(object):
     #flag, so the SessionCache must return the same instances
     #it was passed in.
 
-    def __init__(self, maxEntries=10000, maxAge=14400):
+    def __init__(self, maxEntries=10000, maxAge=14400, shards=16):
         """Create a new SessionCache.
 
         @type maxEntries: int
         @param maxEntries: The maximum size of the cache.  When this
-        limit is reached, the oldest sessions will be deleted as
-        necessary to make room for new ones.  The default is 10000.
+        limit is reached, the least recently used sessions will be deleted
+        as necessary to make room for new ones.  The default is 10000.
 
         @type maxAge: int
         @param maxAge:  The number of seconds before a session expires
-        from the cache.  The default is 14400 (i.e. 4 hours)."""
+        from the cache.  The default is 14400 (i.e. 4 hours).
 
-        self.lock = threading.Lock()
-
-        # Maps sessionIDs to sessions
-        self.entriesDict = {}
+        @type shards: int
+        @param shards: The number of independently locked parts of the
+        cache.  The default is 16."""
 
-        #Circular list of (sessionID, timestamp) pairs
-        self.entriesList = [(None,None)] * maxEntries
-
-        self.firstIndex = 0
-        self.lastIndex = 0
         self.maxAge = maxAge
+        shards = max(1, min(shards, maxEntries))
+        self._shards = [_SessionCacheShard(maxEntries // shards +
+                                           (1 if i < maxEntries % shards
+                                            else 0))
+                        for i in range(shards)]
+
+    @property
+    def hits(self):
+        """Number of lookups that returned a session"""
+        return sum(shard.hits for shard in self._shards)
+
+    @property
+    def misses(self):
+        """Number of lookups of missing, expired or invalid sessions"""
+        return sum(shard.misses for shard in self._shards)
+
+    @property
+    def evictions(self):
+        """Number of sessions deleted to make room for new ones"""
+        return sum(shard.evictions for shard in self._shards)
+
+    def _getShard(self, sessionID):
+        return self._shards[hash(sessionID) % len(self._shards)]
+
+    def get(self, sessionID):
+        """Return the cached session, None if it's missing or invalid."""
+        sessionID = bytes(sessionID)
+        return self._getShard(sessionID).get(sessionID, time.time())
+
+    def put(self, sessionID, session, maxAge=None):
+        """Add a session to the cache.
 
-    def __getitem__(self, sessionID):
-        self.lock.acquire()
-        try:
-            self._purge() #Delete old items, so we're assured of a new one
-            session = self.entriesDict[bytes(sessionID)]
+        @type maxAge: int
+        @param maxAge: The number of seconds before the session expires,
+        the maxAge of the cache if not specified."""
+        if maxAge is None:
+            maxAge = self.maxAge
+        sessionID = bytes(sessionID)
+        currentTime = time.time()
+        self._getShard(sessionID).set(sessionID, session,
+                                      currentTime + maxAge, currentTime)
 
-            #When we add sessions they're resumable, but it's possible
-            #for the session to be invalidated later on (if a fatal alert
-            #is returned), so we have to check for resumability before
-            #returning the session.
+    def delete(self, sessionID):
+        """Remove a session from the cache."""
+        sessionID = bytes(sessionID)
+        self._getShard(sessionID).delete(sessionID)
 
-            if session.valid():
-                return session
-            else:
-                raise KeyError()
-        finally:
-            self.lock.release()
-
-
-    def __setitem__(self, sessionID, session):
-        self.lock.acquire()
-        try:
-            #Add the new element
-            self.entriesDict[bytes(sessionID)] = session
-            self.entriesList[self.lastIndex] = (bytes(sessionID), time.time())
-            self.lastIndex = (self.lastIndex+1) % len(self.entriesList)
-
-            #If the cache is full, we delete the oldest element to make an
-            #empty space
-            if self.lastIndex == self.firstIndex:
-                del(self.entriesDict[self.entriesList[self.firstIndex][0]])
-                self.firstIndex = (self.firstIndex+1) % len(self.entriesList)
-        finally:
-            self.lock.release()
-
-    #Delete expired items
-    def _purge(self):
-        currentTime = time.time()
+    def touch(self, sessionID, maxAge=None):
+        """Postpone the expiry of a cached session.
 
-        #Search through the circular list, deleting expired elements until
-        #we reach a non-expired element.  Since elements in list are
-        #ordered in time, we can break once we reach the first non-expired
-        #element
-        index = self.firstIndex
-        while index != self.lastIndex:
-            if currentTime - self.entriesList[index][1] > self.maxAge:
-                del(self.entriesDict[self.entriesList[index][0]])
-                index = (index+1) % len(self.entriesList)
-            else:
-                break
-        self.firstIndex = index
+        @type maxAge: int
+        @param maxAge: The number of seconds from now before the session
+        expires, the maxAge of the cache if not specified.
+
+        @rtype: bool
+        @return: True if the session was in the cache."""
+        if maxAge is None:
+            maxAge = self.maxAge
+        sessionID = bytes(sessionID)
+        currentTime = time.time()
+        return self._getShard(sessionID).touch(sessionID,
+                                               currentTime + maxAge,
+                                               currentTime)
@@ -0,0 +1,110 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""Interface of server side session storage."""
+
+
+class SessionStore(object):
+    """
+    Storage of sessions that clients can resume
+
+    Subclasses implement L{get}, L{put}, L{delete} and L{touch}, they can
+    then be passed as the sessionCache to
+    L{tlslite.tlsconnection.TLSConnection.handshakeServer}. The server
+    looks up the session ID sent by client, stores the sessions of full
+    handshakes and deletes sessions invalidated by a fatal alert.
+
+    Every session is stored with the time when it expires, sessions are
+    never returned after they expire.
+
+    The handshake waits for the store only while calling it, so stores
+    backed by a database or a network service should return quickly. They
+    can buffer the writes and save them later in batches, see L{putMany}
+    and L{flush}; lookups must see the buffered writes.
+
+    Instances can also be used with the C{[]} operator, like a dict.
+    """
+
+    def get(self, sessionID):
+        """
+        Return the session with the session ID
+
+        @type sessionID: bytearray
+        @param sessionID: session ID chosen by the server
+
+        @rtype: L{tlslite.session.Session}
+        @return: the session, None if the session is unknown, expired or
+        not resumable
+        """
+        raise NotImplementedError()
+
+    def put(self, sessionID, session, maxAge=None):
+        """
+        Store the session
+
+        @type sessionID: bytearray
+        @param sessionID: session ID chosen by the server
+
+        @type session: L{tlslite.session.Session}
+        @param session: session to store, replaces any session stored
+        with the same session ID
+
+        @type maxAge: int
+        @param maxAge: number of seconds before the session expires, the
+        default of the store if not specified
+        """
+        raise NotImplementedError()
+
+    def putMany(self, sessions, maxAge=None):
+        """
+        Store the sessions, with a single write if the store supports it
+
+        @type sessions: iterable
+        @param sessions: (session ID, session) pairs
+
+        @type maxAge: int
+        @param maxAge: number of seconds before the sessions expire, the
+        default of the store if not specified
+        """
+        for sessionID, session in sessions:
+            self.put(sessionID, session, maxAge)
+
+    def delete(self, sessionID):
+        """
+        Remove the session so that it can't be resumed
+
+        @type sessionID: bytearray
+        @param sessionID: session ID chosen by the server
+        """
+        raise NotImplementedError()
+
+    def touch(self, sessionID, maxAge=None):
+        """
+        Postpone the expiry of the session
+
+        @type sessionID: bytearray
+        @param sessionID: session ID chosen by the server
+
+        @type maxAge: int
+        @param maxAge: number of seconds from now before the session
+        expires, the default of the store if not specified
+
+        @rtype: bool
+        @return: True if the session was found
+        """
+        raise NotImplementedError()
+
+    def flush(self):
+        """Save buffered writes, if the store buffers them"""
+        pass
+
+    def __getitem__(self, sessionID):
+        session = self.get(sessionID)
+        if session is None:
+            raise KeyError()
+        return session
+
+    def __setitem__(self, sessionID, session):
+        self.put(sessionID, session)
+
+    def __delitem__(self, sessionID):
+        self.delete(sessionID)
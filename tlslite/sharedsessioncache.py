@@ -0,0 +1,255 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""Session cache shared between forked processes."""
+
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .session import Session
+from .sessionstore import SessionStore
+
+# slot header: sequence number, expiry time, session ID length, data length
+_SLOT_HEADER = struct.Struct('<IdBH')
+_SEQUENCE = struct.Struct('<I')
+_MAX_SESSION_ID_LENGTH = 32
+# serialised session with 48 byte master secret, 32 byte session ID and
+# empty names, certificate chains and ticket
+_MIN_SESSION_SIZE = 100
+# serialises the recreation of thread locks in a forked child
+_forkLock = threading.Lock()
+
+
+class SharedSessionCache(SessionStore):
+    """
+    Session cache shared by all processes forked after its creation.
+
+    The sessions are stored in a shared memory region divided into fixed
+    size slots. The slots are grouped into buckets of a few slots and
+    the bucket of a session is selected by hash of its session ID. A new
+    session replaces a slot with an expired session or the session that
+    expires first in its bucket.
+
+    Every slot starts with a sequence number that writers make odd while
+    they modify the slot, so lookups never take a lock: they copy the
+    slot and retry if the sequence number changed in the meantime.
+    Writers are serialised by a per bucket byte range lock on the file
+    backing the region and a lock in every process.
+
+    Sessions are stored as returned by L{Session.serialize}, so the
+    server certificate chain is restored only while some other session
+    in the process references it. Lookups return new L{Session} objects,
+    so marking a returned session as not resumable does not remove it
+    from the cache, the server calls L{delete} for that.
+
+    Create the cache in the parent process, before the workers are
+    forked. It requires the fcntl module, so it is not available on
+    Windows.
+
+    This class is thread-safe.
+    """
+
+    def __init__(self, maxEntries=10000, maxAge=14400, slotSize=256,
+                 bucketSize=4):
+        """Create a new SharedSessionCache.
+
+        @type maxEntries: int
+        @param maxEntries: The number of slots in the cache.
+
+        @type maxAge: int
+        @param maxAge: The number of seconds before a session expires
+        from the cache.  The default is 14400 (i.e. 4 hours).
+
+        @type slotSize: int
+        @param slotSize: The size of a slot in bytes.  Sessions which
+        don't fit in a slot (e.g. with very long server names) are not
+        cached.
+
+        @type bucketSize: int
+        @param bucketSize: The number of slots a session can be stored
+        in."""
+        if fcntl is None:
+            raise ValueError("SharedSessionCache requires fcntl module")
+        if slotSize < _SLOT_HEADER.size + _MAX_SESSION_ID_LENGTH + \
+                _MIN_SESSION_SIZE:
+            raise ValueError("slotSize too small")
+        self.maxAge = maxAge
+        self.slotSize = slotSize
+        self.bucketSize = bucketSize
+        self.buckets = max(1, maxEntries // bucketSize)
+        size = self.buckets * bucketSize * slotSize
+        # file descriptor is needed for the cross process locks, the file
+        # is already unlinked, so it disappears with the last process
+        self._file = tempfile.TemporaryFile()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._newLocks()
+
+    def _newLocks(self):
+        """Create the thread locks for the current process"""
+        self._locks = [threading.Lock() for _ in range(min(self.buckets, 64))]
+        self._pid = os.getpid()
+
+    def _threadLock(self, bucket):
+        """Return the thread lock of the bucket in the current process"""
+        if self._pid != os.getpid():
+            # locks inherited from the parent may be held by threads that
+            # don't exist in the child; the pid of the parent never
+            # changes, so _forkLock is never held there at fork time
+            with _forkLock:
+                if self._pid != os.getpid():
+                    self._newLocks()
+        return self._locks[bucket % len(self._locks)]
+
+    def _bucket(self, sessionID):
+        """Return index of bucket for the session ID"""
+        return (zlib.crc32(sessionID) & 0xffffffff) % self.buckets
+
+    def _readSlot(self, offset):
+        """Return consistent copy of slot, None if it's modified all time"""
+        for _ in range(100):
+            sequence = _SEQUENCE.unpack_from(self._map, offset)[0]
+            if sequence & 1:
+                continue
+            slot = self._map[offset:offset + self.slotSize]
+            if _SEQUENCE.unpack_from(self._map, offset)[0] == sequence and \
+                    _SEQUENCE.unpack_from(slot)[0] == sequence:
+                return slot
+        return None
+
+    def get(self, sessionID):
+        """Return the cached session, None if it's missing or expired."""
+        sessionID = bytes(sessionID)
+        bucket = self._bucket(sessionID)
+        currentTime = time.time()
+        for slot in range(self.bucketSize):
+            offset = (bucket * self.bucketSize + slot) * self.slotSize
+            data = self._readSlot(offset)
+            if data is None:
+                continue
+            _, expiry, idLength, dataLength = _SLOT_HEADER.unpack_from(data)
+            start = _SLOT_HEADER.size
+            if data[start:start + idLength] != sessionID or \
+                    currentTime > expiry:
+                continue
+            start += _MAX_SESSION_ID_LENGTH
+            session = Session.deserialize(data[start:start + dataLength])
+            session.sessionID = bytearray(sessionID)
+            return session
+        return None
+
+    def put(self, sessionID, session, maxAge=None):
+        """Add a session to the cache.
+
+        @type maxAge: int
+        @param maxAge: The number of seconds before the session expires,
+        the maxAge of the cache if not specified."""
+        if maxAge is None:
+            maxAge = self.maxAge
+        sessionID = bytes(sessionID)
+        data = bytes(session.serialize())
+        if len(sessionID) > _MAX_SESSION_ID_LENGTH or \
+                _SLOT_HEADER.size + _MAX_SESSION_ID_LENGTH + len(data) > \
+                self.slotSize:
+            return
+        bucket = self._bucket(sessionID)
+        currentTime = time.time()
+        with self._lockBucket(bucket):
+            offset = self._findSlot(bucket, sessionID, currentTime)
+            self._writeSlot(offset, currentTime + maxAge, sessionID, data)
+
+    def delete(self, sessionID):
+        """Remove a session from the cache."""
+        sessionID = bytes(sessionID)
+        bucket = self._bucket(sessionID)
+        with self._lockBucket(bucket):
+            offset = self._findEntry(bucket, sessionID)
+            if offset is not None:
+                self._writeSlot(offset, 0, b'', b'')
+
+    def touch(self, sessionID, maxAge=None):
+        """Postpone the expiry of a cached session.
+
+        @type maxAge: int
+        @param maxAge: The number of seconds from now before the session
+        expires, the maxAge of the cache if not specified.
+
+        @rtype: bool
+        @return: True if the session was in the cache."""
+        if maxAge is None:
+            maxAge = self.maxAge
+        sessionID = bytes(sessionID)
+        bucket = self._bucket(sessionID)
+        currentTime = time.time()
+        with self._lockBucket(bucket):
+            offset = self._findEntry(bucket, sessionID)
+            if offset is None:
+                return False
+            _, expiry, _, dataLength = _SLOT_HEADER.unpack_from(self._map,
+                                                                offset)
+            if currentTime > expiry:
+                return False
+            start = offset + _SLOT_HEADER.size + _MAX_SESSION_ID_LENGTH
+            self._writeSlot(offset, currentTime + maxAge, sessionID,
+                            self._map[start:start + dataLength])
+            return True
+
+    @contextmanager
+    def _lockBucket(self, bucket):
+        """Lock the bucket against writers in all processes"""
+        with self._threadLock(bucket):
+            fcntl.lockf(self._file.fileno(), fcntl.LOCK_EX, 1, bucket)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._file.fileno(), fcntl.LOCK_UN, 1, bucket)
+
+    def _findEntry(self, bucket, sessionID):
+        """Return offset of slot with the session, bucket must be locked"""
+        for slot in range(self.bucketSize):
+            offset = (bucket * self.bucketSize + slot) * self.slotSize
+            idLength = _SLOT_HEADER.unpack_from(self._map, offset)[2]
+            start = offset + _SLOT_HEADER.size
+            if idLength and self._map[start:start + idLength] == sessionID:
+                return offset
+        return None
+
+    def _findSlot(self, bucket, sessionID, currentTime):
+        """Return offset of slot to overwrite, bucket must be locked"""
+        best = None
+        bestExpiry = None
+        for slot in range(self.bucketSize):
+            offset = (bucket * self.bucketSize + slot) * self.slotSize
+            _, expiry, idLength, _ = _SLOT_HEADER.unpack_from(self._map,
+                                                              offset)
+            start = offset + _SLOT_HEADER.size
+            if self._map[start:start + idLength] == sessionID or \
+                    currentTime > expiry:
+                return offset
+            if best is None or expiry < bestExpiry:
+                best = offset
+                bestExpiry = expiry
+        return best
+
+    def _writeSlot(self, offset, expiry, sessionID, data):
+        """Replace slot contents, bucket must be locked"""
+        sequence = _SEQUENCE.unpack_from(self._map, offset)[0]
+        _SEQUENCE.pack_into(self._map, offset, (sequence + 1) & 0xffffffff)
+        _SLOT_HEADER.pack_into(self._map, offset,
+                               (sequence + 1) & 0xffffffff, expiry,
+                               len(sessionID), len(data))
+        start = offset + _SLOT_HEADER.size
+        self._map[start:start + len(sessionID)] = sessionID
+        start += _MAX_SESSION_ID_LENGTH
+        self._map[start:start + len(data)] = data
+        _SEQUENCE.pack_into(self._map, offset, (sequence + 2) & 0xffffffff)
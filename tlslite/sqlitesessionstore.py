@@ -0,0 +1,230 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""Session store persisted in an SQLite database."""
+
+import threading
+import time
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+from .session import Session
+from .sessionstore import SessionStore
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    Session store saved in an SQLite database file.
+
+    The sessions survive restarts of the server and can be shared by
+    processes that open the same file. Sessions are stored as returned by
+    L{Session.serialize}, pass the certificate chains of the server to
+    restore them from sessions saved before a restart.
+
+    Writes are buffered and saved in a single transaction once batchSize
+    writes are pending or flushInterval seconds after the first of them,
+    whichever comes first; this is checked whenever the store is used.
+    Lookups in the same instance see the pending writes, other processes
+    see them only after they are saved. Call L{flush} or L{close} before
+    the server exits, to not lose the pending writes.
+
+    Expired sessions are removed from the database when the writes are
+    saved.
+
+    It requires the sqlite3 module.
+
+    This class is thread-safe.
+
+    @type maxAge: int
+    @ivar maxAge: number of seconds before a session expires
+
+    @type batchSize: int
+    @ivar batchSize: number of pending writes that are saved immediately
+
+    @type flushInterval: float
+    @ivar flushInterval: number of seconds a write can stay pending
+    """
+
+    def __init__(self, path, maxAge=14400, batchSize=64, flushInterval=1.0,
+                 certChains=None):
+        """Create a new SqliteSessionStore.
+
+        @type path: str
+        @param path: The name of the database file, created if it doesn't
+        exist.  ":memory:" keeps the sessions in memory only.
+
+        @type maxAge: int
+        @param maxAge: The number of seconds before a session expires
+        from the store.  The default is 14400 (i.e. 4 hours).
+
+        @type batchSize: int
+        @param batchSize: The number of writes saved in one transaction,
+        1 to save every write immediately.
+
+        @type flushInterval: float
+        @param flushInterval: The number of seconds after which pending
+        writes are saved.
+
+        @type certChains: list of L{tlslite.x509certchain.X509CertChain}
+        @param certChains: Certificate chains the server uses, see
+        L{Session.deserialize}."""
+        if sqlite3 is None:
+            raise ValueError("SqliteSessionStore requires sqlite3 module")
+        if batchSize < 1:
+            raise ValueError("batchSize must be positive")
+        self.maxAge = maxAge
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+        self._certChains = certChains
+        self._lock = threading.Lock()
+        # maps session IDs to (expiry time, serialised session) pairs, or
+        # to None for deleted sessions
+        self._pending = {}
+        self._pendingSince = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS sessions ("
+                             "id BLOB PRIMARY KEY, "
+                             "expiry REAL NOT NULL, "
+                             "data BLOB NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS sessions_expiry "
+                             "ON sessions (expiry)")
+
+    def get(self, sessionID):
+        """Return the stored session, None if it's missing or expired."""
+        sessionID = bytes(sessionID)
+        currentTime = time.time()
+        with self._lock:
+            self._flushIfDue(currentTime)
+            if sessionID in self._pending:
+                entry = self._pending[sessionID]
+            else:
+                entry = self._db.execute("SELECT expiry, data FROM sessions "
+                                         "WHERE id = ?",
+                                         (sqlite3.Binary(sessionID),)
+                                        ).fetchone()
+        if entry is None or currentTime > entry[0]:
+            return None
+        try:
+            session = Session.deserialize(bytearray(entry[1]),
+                                          self._certChains)
+        except ValueError:
+            return None
+        session.sessionID = bytearray(sessionID)
+        if not session.valid():
+            return None
+        return session
+
+    def put(self, sessionID, session, maxAge=None):
+        """Add a session to the store.
+
+        @type maxAge: int
+        @param maxAge: The number of seconds before the session expires,
+        the maxAge of the store if not specified."""
+        self.putMany([(sessionID, session)], maxAge)
+
+    def putMany(self, sessions, maxAge=None):
+        """Add sessions to the store.
+
+        @type sessions: iterable
+        @param sessions: (session ID, session) pairs
+
+        @type maxAge: int
+        @param maxAge: The number of seconds before the sessions expire,
+        the maxAge of the store if not specified."""
+        if maxAge is None:
+            maxAge = self.maxAge
+        currentTime = time.time()
+        entries = [(bytes(sessionID),
+                    (currentTime + maxAge, bytes(session.serialize())))
+                   for sessionID, session in sessions]
+        with self._lock:
+            for sessionID, entry in entries:
+                self._addPending(sessionID, entry, currentTime)
+            self._flushIfDue(currentTime)
+
+    def delete(self, sessionID):
+        """Remove a session from the store."""
+        currentTime = time.time()
+        with self._lock:
+            self._addPending(bytes(sessionID), None, currentTime)
+            self._flushIfDue(currentTime)
+
+    def touch(self, sessionID, maxAge=None):
+        """Postpone the expiry of a stored session.
+
+        @type maxAge: int
+        @param maxAge: The number of seconds from now before the session
+        expires, the maxAge of the store if not specified.
+
+        @rtype: bool
+        @return: True if the session was in the store."""
+        if maxAge is None:
+            maxAge = self.maxAge
+        sessionID = bytes(sessionID)
+        currentTime = time.time()
+        with self._lock:
+            if sessionID in self._pending:
+                entry = self._pending[sessionID]
+                if entry is None or currentTime > entry[0]:
+                    return False
+                self._pending[sessionID] = (currentTime + maxAge, entry[1])
+                return True
+            with self._db:
+                cursor = self._db.execute("UPDATE sessions SET expiry = ? "
+                                          "WHERE id = ? AND expiry >= ?",
+                                          (currentTime + maxAge,
+                                           sqlite3.Binary(sessionID),
+                                           currentTime))
+            return cursor.rowcount > 0
+
+    def flush(self):
+        """Save the pending writes."""
+        with self._lock:
+            self._flush(time.time())
+
+    def close(self):
+        """Save the pending writes and close the database."""
+        with self._lock:
+            self._flush(time.time())
+            self._db.close()
+
+    def _addPending(self, sessionID, entry, currentTime):
+        """Queue a write, lock must be held"""
+        self._pending[sessionID] = entry
+        if self._pendingSince is None:
+            self._pendingSince = currentTime
+
+    def _flushIfDue(self, currentTime):
+        """Save the pending writes if there's enough of them or they're
+        too old, lock must be held"""
+        if self._pendingSince is not None and \
+                (len(self._pending) >= self.batchSize or
+                 currentTime - self._pendingSince >= self.flushInterval):
+            self._flush(currentTime)
+
+    def _flush(self, currentTime):
+        """Save the pending writes and remove expired sessions, lock must
+        be held"""
+        # the writes stay pending if the transaction fails, e.g. when
+        # another process holds the database locked
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sessions (id, expiry, data) "
+                "VALUES (?, ?, ?)",
+                [(sqlite3.Binary(sessionID), entry[0],
+                  sqlite3.Binary(entry[1]))
+                 for sessionID, entry in self._pending.items()
+                 if entry is not None])
+            self._db.executemany(
+                "DELETE FROM sessions WHERE id = ?",
+                [(sqlite3.Binary(sessionID),)
+                 for sessionID, entry in self._pending.items()
+                 if entry is None])
+            self._db.execute("DELETE FROM sessions WHERE expiry < ?",
+                             (currentTime,))
+        self._pending = {}
+        self._pendingSince = None
@@ -0,0 +1,175 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""Keys protecting the session tickets issued by the server."""
+
+import struct
+import threading
+import time
+
+from .utils.cryptomath import getRandomBytes, HMAC_SHA256
+from .utils.cipherfactory import createAESGCM
+
+# ticket: key name, nonce, encrypted issue time and session state, tag
+_KEY_NAME_LENGTH = 16
+_NONCE_LENGTH = 12
+_TAG_LENGTH = 16
+_ISSUE_TIME = struct.Struct('>Q')
+
+
+class TicketKeyManager(object):
+    """
+    Keys used by the server to encrypt and decrypt session tickets
+
+    The server stores the state needed for resumption in a session ticket
+    encrypted with AES-GCM and sends it to the client (see RFC 5077), so
+    resumption doesn't need any memory on the server.
+
+    A new key is used every rotationInterval seconds. Keys are derived
+    from the secret and the number of the rotation interval with
+    HMAC-SHA256, so all servers and processes created with the same secret
+    use the same keys, without any coordination. Tickets encrypted with
+    older keys are accepted until they are ticketLifetime seconds old,
+    clients presenting them get a new ticket. Tickets encrypted with the
+    key of the next interval are accepted as well, so that servers with
+    slightly skewed clocks accept each other's tickets.
+
+    To use it, create the manager once and pass it to
+    L{tlslite.tlsconnection.TLSConnection.handshakeServer} of every
+    connection. When the secret isn't specified, a random one is generated,
+    it is then shared only by processes forked after the manager was
+    created.
+
+    This class is thread-safe.
+
+    @type rotationInterval: int
+    @ivar rotationInterval: number of seconds a key is used to encrypt new
+    tickets
+
+    @type ticketLifetime: int
+    @ivar ticketLifetime: number of seconds a ticket can be used for
+    resumption, also sent to clients as the ticket lifetime hint
+    """
+
+    def __init__(self, secret=None, rotationInterval=3600,
+                 ticketLifetime=14400, keySize=16, implementations=None):
+        """
+        Create the key manager
+
+        @type secret: bytearray
+        @param secret: master secret the keys are derived from, at least
+        16 bytes long, random if not specified
+
+        @type rotationInterval: int
+        @param rotationInterval: number of seconds after which a new key
+        is used for new tickets, one hour by default
+
+        @type ticketLifetime: int
+        @param ticketLifetime: number of seconds the tickets are valid, four
+        hours by default
+
+        @type keySize: int
+        @param keySize: size of the AES keys, 16 or 32 bytes
+
+        @type implementations: list of str
+        @param implementations: AES-GCM implementations to use, in order of
+        preference, see L{tlslite.utils.cipherfactory.createAESGCM}
+        """
+        if secret is None:
+            secret = getRandomBytes(32)
+        if len(secret) < 16:
+            raise ValueError("Ticket key secret too short")
+        if keySize not in (16, 32):
+            raise ValueError("keySize must be 16 or 32")
+        if rotationInterval <= 0 or ticketLifetime <= 0:
+            raise ValueError("rotationInterval and ticketLifetime must be "
+                             "positive")
+        self.rotationInterval = rotationInterval
+        self.ticketLifetime = ticketLifetime
+        self._secret = bytearray(secret)
+        self._keySize = keySize
+        self._implementations = implementations
+        self._lock = threading.Lock()
+        # maps key names to (interval number, cipher) pairs
+        self._keys = {}
+        # key name of every interval in self._keys
+        self._names = {}
+
+    def _deriveKey(self, interval):
+        """Return name and cipher of key for the interval"""
+        label = bytearray(struct.pack('>Q', interval))
+        keyName = HMAC_SHA256(self._secret,
+                              bytearray(b'key name') + label)
+        key = HMAC_SHA256(self._secret, bytearray(b'key') + label)
+        return (keyName[:_KEY_NAME_LENGTH],
+                createAESGCM(key[:self._keySize], self._implementations))
+
+    def _updateKeys(self, currentTime):
+        """Derive keys that may be used, return the current one"""
+        current = int(currentTime // self.rotationInterval)
+        with self._lock:
+            if current in self._names and current + 1 in self._names:
+                keyName = self._names[current]
+                return current, keyName, self._keys[bytes(keyName)][1]
+            oldest = current - (self.ticketLifetime - 1) // \
+                self.rotationInterval - 1
+            # the key of the next interval is accepted too, as other servers
+            # with clocks slightly ahead may already use it
+            for interval in range(oldest, current + 2):
+                if interval not in self._names:
+                    keyName, cipher = self._deriveKey(interval)
+                    self._keys[bytes(keyName)] = (interval, cipher)
+                    self._names[interval] = keyName
+            for interval in [i for i in self._names if i < oldest]:
+                del self._keys[bytes(self._names.pop(interval))]
+            keyName = self._names[current]
+            return current, keyName, self._keys[bytes(keyName)][1]
+
+    def encrypt(self, state):
+        """
+        Return a new ticket with the state encrypted with the current key
+
+        @type state: bytes
+        @param state: session state to store in the ticket
+
+        @rtype: bytearray
+        """
+        currentTime = time.time()
+        _, keyName, cipher = self._updateKeys(currentTime)
+        nonce = getRandomBytes(_NONCE_LENGTH)
+        plaintext = bytearray(_ISSUE_TIME.pack(int(currentTime))) + \
+            bytearray(state)
+        return keyName + nonce + cipher.seal(nonce, plaintext, keyName)
+
+    def decrypt(self, ticket):
+        """
+        Return the state from the ticket
+
+        @type ticket: bytearray
+        @param ticket: ticket received from client
+
+        @rtype: tuple
+        @return: state and a flag set when the ticket should be replaced
+        by a new one (as it's encrypted with an old key), None if the
+        ticket is invalid or expired
+        """
+        if len(ticket) < _KEY_NAME_LENGTH + _NONCE_LENGTH + \
+                _ISSUE_TIME.size + _TAG_LENGTH:
+            return None
+        currentTime = time.time()
+        current = self._updateKeys(currentTime)[0]
+        ticket = bytearray(ticket)
+        keyName = ticket[:_KEY_NAME_LENGTH]
+        entry = self._keys.get(bytes(keyName))
+        if entry is None:
+            return None
+        interval, cipher = entry
+        nonce = ticket[_KEY_NAME_LENGTH:_KEY_NAME_LENGTH + _NONCE_LENGTH]
+        plaintext = cipher.open(nonce,
+                                ticket[_KEY_NAME_LENGTH + _NONCE_LENGTH:],
+                                keyName)
+        if plaintext is None:
+            return None
+        issueTime = _ISSUE_TIME.unpack(bytes(plaintext[:_ISSUE_TIME.size]))[0]
+        if currentTime >= issueTime + self.ticketLifetime:
+            return None
+        return bytes(plaintext[_ISSUE_TIME.size:]), interval < current
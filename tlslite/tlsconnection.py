@@ -20,6 +20,7 @@ import socket
 from .utils.compat import formatExceptionTrace
 from .tlsrecordlayer import TLSRecordLayer
 from .session import Session
+from .sessionstore import SessionStore
 from .constants import *
 from .utils.cryptomath import getRandomBytes
 from .errors import *
@@ -30,6 +31,7 @@ from .utils.tackwrapper import *
 from .keyexchange import KeyExchange, RSAKeyExchange, DHE_RSAKeyExchange, \
         ECDHE_RSAKeyExchange, SRPKeyExchange
 from .handshakehelpers import HandshakeHelpers
+from .ephemeralkeypool import generateDHKey
 
 class TLSConnection(TLSRecordLayer):
     """
@@ -54,13 +56,20 @@ class TLSConnection(TLSRecordLayer):
     L{tlslite.integration.tlsasyncdispatchermixin.TLSAsyncDispatcherMixIn}).
     """
 
-    def __init__(self, sock):
+    def __init__(self, sock=None):
         """Create a new TLSConnection instance.
 
         @param sock: The socket data will be transmitted on.  The
         socket should already be connected.  It may be in blocking or
         non-blocking mode.
 
+        If no socket is provided, the connection doesn't perform any I/O:
+        data received from the peer needs to be passed to L{feed} and data
+        returned by L{data_to_send} needs to be sent to the peer. As
+        operations then can't block, the asynchronous variants of
+        handshake, read, write and close methods must be used in this mode,
+        resuming them after every call to L{feed}.
+
         @type sock: L{socket.socket}
         """
         TLSRecordLayer.__init__(self, sock)
@@ -70,6 +79,8 @@ class TLSConnection(TLSRecordLayer):
         self.extendedMasterSecret = False
         self._clientRandom = bytearray(0)
         self._serverRandom = bytearray(0)
+        self._sessionTicket = None
+        self._sessionStore = None
 
     def keyingMaterialExporter(self, label, length=20):
         """Return keying material as described in RFC 5705
@@ -159,6 +170,8 @@ class TLSConnection(TLSRecordLayer):
         @raise tlslite.errors.TLSAlert: If a TLS alert is signalled.
         @raise tlslite.errors.TLSAuthenticationError: If the checker
         doesn't like the other party's authentication credentials.
+        @raise ValueError: If 'async' is False and the connection was
+        created without a socket.
         """
         handshaker = self._handshakeClientAsync(anonParams=(True),
                                                 session=session,
@@ -167,6 +180,7 @@ class TLSConnection(TLSRecordLayer):
                                                 serverName=serverName)
         if async:
             return handshaker
+        self._checkBlockingAllowed()
         for result in handshaker:
             pass
 
@@ -236,6 +250,8 @@ class TLSConnection(TLSRecordLayer):
         @raise tlslite.errors.TLSAlert: If a TLS alert is signalled.
         @raise tlslite.errors.TLSAuthenticationError: If the checker
         doesn't like the other party's authentication credentials.
+        @raise ValueError: If 'async' is False and the connection was
+        created without a socket.
         """
         handshaker = self._handshakeClientAsync(srpParams=(username, password),
                         session=session, settings=settings, checker=checker,
@@ -249,6 +265,7 @@ class TLSConnection(TLSRecordLayer):
         # otherwise it is executed to completion here.  
         if async:
             return handshaker
+        self._checkBlockingAllowed()
         for result in handshaker:
             pass
 
@@ -330,6 +347,8 @@ class TLSConnection(TLSRecordLayer):
         @raise tlslite.errors.TLSAlert: If a TLS alert is signalled.
         @raise tlslite.errors.TLSAuthenticationError: If the checker
         doesn't like the other party's authentication credentials.
+        @raise ValueError: If 'async' is False and the connection was
+        created without a socket.
         """
         handshaker = \
                 self._handshakeClientAsync(certParams=(certChain, privateKey),
@@ -347,6 +366,7 @@ class TLSConnection(TLSRecordLayer):
         # otherwise it is executed to completion here.                        
         if async:
             return handshaker
+        self._checkBlockingAllowed()
         for result in handshaker:
             pass
 
@@ -423,8 +443,8 @@ class TLSConnection(TLSRecordLayer):
                                  "Handshake Settings")
                                   
         if session:
-            # session.valid() ensures session is resumable and has 
-            # non-empty sessionID
+            # session.valid() ensures session is resumable and has
+            # non-empty sessionID or ticket
             if not session.valid():
                 session = None #ignore non-resumable sessions...
             elif session.resumable: 
@@ -462,6 +482,8 @@ class TLSConnection(TLSRecordLayer):
             else: break
         serverHello = result
         cipherSuite = serverHello.cipher_suite
+        self._selectHandshakeHashes(settings, cipherSuite,
+                                    clientAuth=privateKey is not None)
         
         # Choose a matching Next Protocol from server list against ours
         # (string or None)
@@ -475,8 +497,8 @@ class TLSConnection(TLSRecordLayer):
             self.extendedMasterSecret = True
 
         #If the server elected to resume the session, it is handled here.
-        for result in self._clientResume(session, serverHello, 
-                        clientHello.random, 
+        for result in self._clientResume(session, serverHello,
+                        clientHello,
                         settings.cipherImplementations,
                         nextProto):
             if result in (0,1): yield result
@@ -542,7 +564,9 @@ class TLSConnection(TLSRecordLayer):
                             clientHello.random, 
                             serverHello.random,
                             cipherSuite, settings.cipherImplementations,
-                            nextProto):
+                            nextProto,
+                            serverHello.getExtension(
+                                ExtensionType.session_ticket) is not None):
                 if result in (0,1): yield result
                 else: break
         masterSecret = result
@@ -555,6 +579,10 @@ class TLSConnection(TLSRecordLayer):
                             serverName,
                             encryptThenMAC=self._recordLayer.encryptThenMAC,
                             extendedMasterSecret=self.extendedMasterSecret)
+        if self._sessionTicket is not None and self._sessionTicket.ticket:
+            self.session.ticket = self._sessionTicket.ticket
+            self.session.ticketLifetimeHint = \
+                self._sessionTicket.ticket_lifetime_hint
         self._handshakeDone(resumed=False)
         self._serverRandom = serverHello.random
         self._clientRandom = clientHello.random
@@ -610,12 +638,26 @@ class TLSConnection(TLSRecordLayer):
             assert len(sigList) > 0
             extensions.append(SignatureAlgorithmsExtension().\
                               create(sigList))
+        # RFC 5077: empty extension asks for a new ticket
+        sessionTicket = None
+        if settings.useSessionTickets and settings.maxVersion > (3, 0):
+            if session and session.ticket:
+                sessionTicket = session.ticket
+            extensions.append(SessionTicketExtension().create(sessionTicket))
         # don't send empty list of extensions or extensions in SSLv3
         if not extensions or settings.maxVersion == (3, 0):
             extensions = None
 
+        sessionID = bytearray(0)
+        if session:
+            sessionID = session.sessionID
+            # server echoes the session ID when it accepts the ticket, so
+            # send a random one if the session doesn't have any
+            if not sessionID and sessionTicket:
+                sessionID = getRandomBytes(32)
+
         #Either send ClientHello (with a resumable session)...
-        if session and session.sessionID:
+        if sessionID:
             #If it's resumable, then its
             #ciphersuite must be one of the acceptable ciphersuites
             if session.cipherSuite not in cipherSuites:
@@ -624,7 +666,7 @@ class TLSConnection(TLSRecordLayer):
             else:
                 clientHello = ClientHello()
                 clientHello.create(settings.maxVersion, getRandomBytes(32),
-                                   session.sessionID, wireCipherSuites,
+                                   sessionID, wireCipherSuites,
                                    certificateTypes, 
                                    session.srpUsername,
                                    reqTack, nextProtos is not None,
@@ -709,6 +751,15 @@ class TLSConnection(TLSRecordLayer):
                 AlertDescription.illegal_parameter,
                 "Server responded with unrequested NPN Extension"):
                 yield result
+        ticketExt = serverHello.getExtension(ExtensionType.session_ticket)
+        if ticketExt is not None and \
+                (clientHello.getExtension(ExtensionType.session_ticket) is None
+                 or ticketExt.ticket):
+            for result in self._sendError(
+                    AlertDescription.illegal_parameter,
+                    "Server responded with unrequested or non-empty "
+                    "SessionTicket extension"):
+                yield result
         if not serverHello.getExtension(ExtensionType.extended_master_secret)\
             and settings.requireExtendedMasterSecret:
             for result in self._sendError(
@@ -736,11 +787,11 @@ class TLSConnection(TLSRecordLayer):
                 return bytearray(nextProtos[0])
         return None
  
-    def _clientResume(self, session, serverHello, clientRandom, 
+    def _clientResume(self, session, serverHello, clientHello,
                       cipherImplementations, nextProto):
         #If the server agrees to resume
-        if session and session.sessionID and \
-            serverHello.session_id == session.sessionID:
+        if session and clientHello.session_id and \
+            serverHello.session_id == clientHello.session_id:
 
             if serverHello.cipher_suite != session.cipherSuite:
                 for result in self._sendError(\
@@ -751,12 +802,15 @@ class TLSConnection(TLSRecordLayer):
             #Calculate pending connection states
             self._calcPendingStates(session.cipherSuite, 
                                     session.masterSecret, 
-                                    clientRandom, serverHello.random, 
+                                    clientHello.random, serverHello.random,
                                     cipherImplementations)                                   
 
             #Exchange ChangeCipherSpec and Finished messages
-            for result in self._getFinished(session.masterSecret,
-                                            session.cipherSuite):
+            for result in self._getFinished(
+                    session.masterSecret,
+                    session.cipherSuite,
+                    expectSessionTicket=serverHello.getExtension(
+                        ExtensionType.session_ticket) is not None):
                 yield result
             # buffer writes so that CCS and Finished go out in one TCP packet
             self.sock.buffer_writes = True
@@ -767,6 +821,13 @@ class TLSConnection(TLSRecordLayer):
             self.sock.flush()
             self.sock.buffer_writes = False
 
+            #Server may have renewed the ticket
+            if self._sessionTicket is not None and self._sessionTicket.ticket:
+                session = session._clone()
+                session.ticket = self._sessionTicket.ticket
+                session.ticketLifetimeHint = \
+                    self._sessionTicket.ticket_lifetime_hint
+
             #Set the session for this connection
             self.session = session
             yield "resumed_and_finished"
@@ -944,7 +1005,8 @@ class TLSConnection(TLSRecordLayer):
         yield (premasterSecret, serverCertChain, clientCertChain, tackExt)
 
     def _clientFinished(self, premasterSecret, clientRandom, serverRandom,
-                        cipherSuite, cipherImplementations, nextProto):
+                        cipherSuite, cipherImplementations, nextProto,
+                        expectSessionTicket=False):
         if self.extendedMasterSecret:
             masterSecret = calcExtendedMasterSecret(self.version,
                                                     cipherSuite,
@@ -967,7 +1029,9 @@ class TLSConnection(TLSRecordLayer):
         self.sock.buffer_writes = False
         for result in self._getFinished(masterSecret,
                                         cipherSuite,
-                                        nextProto=nextProto):
+                                        nextProto=nextProto,
+                                        expectSessionTicket=\
+                                            expectSessionTicket):
             yield result
         yield masterSecret
 
@@ -1019,7 +1083,8 @@ class TLSConnection(TLSRecordLayer):
                         sessionCache=None, settings=None, checker=None,
                         reqCAs = None, 
                         tacks=None, activationFlags=0,
-                        nextProtos=None, anon=False):
+                        nextProtos=None, anon=False, keyPool=None,
+                        ticketKeyManager=None):
         """Perform a handshake in the role of server.
 
         This function performs an SSL or TLS handshake.  Depending on
@@ -1063,11 +1128,13 @@ class TLSConnection(TLSRecordLayer):
         performs a client certificate authentication, the sessions's
         clientCertChain attribute will be set.
 
-        @type sessionCache: L{tlslite.sessioncache.SessionCache}
-        @param sessionCache: An in-memory cache of resumable sessions.
+        @type sessionCache: L{tlslite.sessionstore.SessionStore}
+        @param sessionCache: A store of resumable sessions, like the
+        in-memory L{tlslite.sessioncache.SessionCache}.
         The client can resume sessions from this cache.  Alternatively,
         if the client performs a full handshake, a new session will be
-        added to the cache.
+        added to the cache.  Sessions invalidated by a fatal alert are
+        deleted from the store.
 
         @type settings: L{tlslite.handshakesettings.HandshakeSettings}
         @param settings: Various settings which can be used to control
@@ -1088,18 +1155,33 @@ class TLSConnection(TLSRecordLayer):
         clients through the Next-Protocol Negotiation Extension, 
         if they support it.
 
+        @type keyPool: L{tlslite.ephemeralkeypool.EphemeralKeyPool}
+        @param keyPool: A pool of pre-generated ephemeral key shares.  If
+        the negotiated ECDHE or DHE group is pooled, the server key share
+        is taken from the pool instead of being generated during the
+        handshake.
+
+        @type ticketKeyManager: L{tlslite.ticketkeymanager.TicketKeyManager}
+        @param ticketKeyManager: Keys used to encrypt session tickets.  If
+        specified, clients supporting session tickets (RFC 5077) receive
+        the session state in a ticket and can resume the session with it,
+        without the server storing the session.
+
         @raise socket.error: If a socket error occurs.
         @raise tlslite.errors.TLSAbruptCloseError: If the socket is closed
         without a preceding alert.
         @raise tlslite.errors.TLSAlert: If a TLS alert is signalled.
         @raise tlslite.errors.TLSAuthenticationError: If the checker
         doesn't like the other party's authentication credentials.
+        @raise ValueError: If the connection was created without a socket.
         """
+        self._checkBlockingAllowed()
         for result in self.handshakeServerAsync(verifierDB,
                 certChain, privateKey, reqCert, sessionCache, settings,
                 checker, reqCAs, 
                 tacks=tacks, activationFlags=activationFlags, 
-                nextProtos=nextProtos, anon=anon):
+                nextProtos=nextProtos, anon=anon, keyPool=keyPool,
+                ticketKeyManager=ticketKeyManager):
             pass
 
 
@@ -1108,8 +1190,8 @@ class TLSConnection(TLSRecordLayer):
                              sessionCache=None, settings=None, checker=None,
                              reqCAs=None, 
                              tacks=None, activationFlags=0,
-                             nextProtos=None, anon=False
-                             ):
+                             nextProtos=None, anon=False, keyPool=None,
+                             ticketKeyManager=None):
         """Start a server handshake operation on the TLS connection.
 
         This function returns a generator which behaves similarly to
@@ -1127,7 +1209,8 @@ class TLSConnection(TLSRecordLayer):
             sessionCache=sessionCache, settings=settings, 
             reqCAs=reqCAs, 
             tacks=tacks, activationFlags=activationFlags, 
-            nextProtos=nextProtos, anon=anon)
+            nextProtos=nextProtos, anon=anon, keyPool=keyPool,
+            ticketKeyManager=ticketKeyManager)
         for result in self._handshakeWrapperAsync(handshaker, checker):
             yield result
 
@@ -1136,9 +1219,12 @@ class TLSConnection(TLSRecordLayer):
                              certChain, privateKey, reqCert, sessionCache,
                              settings, reqCAs, 
                              tacks, activationFlags, 
-                             nextProtos, anon):
+                             nextProtos, anon, keyPool=None,
+                             ticketKeyManager=None):
 
         self._handshakeStart(client=False)
+        if isinstance(sessionCache, SessionStore):
+            self._sessionStore = sessionCache
 
         if (not verifierDB) and (not certChain) and not anon:
             raise ValueError("Caller passed no authentication credentials")
@@ -1168,13 +1254,14 @@ class TLSConnection(TLSRecordLayer):
         # Handle ClientHello and resumption
         for result in self._serverGetClientHello(settings, certChain,\
                                             verifierDB, sessionCache,
-                                            anon):
+                                            anon, ticketKeyManager):
             if result in (0,1): yield result
             elif result == None:
                 self._handshakeDone(resumed=True)                
                 return # Handshake was resumed, we're done 
             else: break
         (clientHello, cipherSuite) = result
+        self._selectHandshakeHashes(settings, cipherSuite, clientAuth=reqCert)
         
         #If not a resumption...
 
@@ -1220,6 +1307,11 @@ class TLSConnection(TLSRecordLayer):
                         "Failed to negotiate Extended Master Secret"):
                     yield result
 
+        # Announce a session ticket to client which asked for one
+        if ticketKeyManager is not None and self.version > (3, 0) and \
+                clientHello.getExtension(ExtensionType.session_ticket):
+            extensions.append(SessionTicketExtension().create())
+
         # don't send empty list of extensions
         if not extensions:
             extensions = None
@@ -1254,14 +1346,16 @@ class TLSConnection(TLSRecordLayer):
                 keyExchange = DHE_RSAKeyExchange(cipherSuite,
                                                  clientHello,
                                                  serverHello,
-                                                 privateKey)
+                                                 privateKey,
+                                                 keyPool)
             elif cipherSuite in CipherSuite.ecdheCertSuites:
                 acceptedCurves = self._curveNamesToList(settings)
                 keyExchange = ECDHE_RSAKeyExchange(cipherSuite,
                                                    clientHello,
                                                    serverHello,
                                                    privateKey,
-                                                   acceptedCurves)
+                                                   acceptedCurves,
+                                                   keyPool)
             else:
                 assert(False)
             for result in self._serverCertKeyExchange(clientHello, serverHello, 
@@ -1275,7 +1369,7 @@ class TLSConnection(TLSRecordLayer):
         # Perform anonymous Diffie Hellman key exchange
         elif cipherSuite in CipherSuite.anonSuites:
             for result in self._serverAnonKeyExchange(clientHello, serverHello, 
-                                        cipherSuite, settings):
+                                        cipherSuite, settings, keyPool):
                 if result in (0,1): yield result
                 else: break
             premasterSecret = result
@@ -1283,17 +1377,8 @@ class TLSConnection(TLSRecordLayer):
         else:
             assert(False)
                         
-        # Exchange Finished messages      
-        for result in self._serverFinished(premasterSecret, 
-                                clientHello.random, serverHello.random,
-                                cipherSuite, settings.cipherImplementations,
-                                nextProtos):
-                if result in (0,1): yield result
-                else: break
-        masterSecret = result
-
-        #Create the session object
-        self.session = Session()
+        #Create the session object, master secret is set after it's known
+        session = Session()
         if cipherSuite in CipherSuite.certAllSuites:        
             serverCertChain = certChain
         else:
@@ -1304,12 +1389,31 @@ class TLSConnection(TLSRecordLayer):
             srpUsername = clientHello.srp_username.decode("utf-8")
         if clientHello.server_name:
             serverName = clientHello.server_name.decode("utf-8")
-        self.session.create(masterSecret, serverHello.session_id, cipherSuite,
-                            srpUsername, clientCertChain, serverCertChain,
-                            tackExt, (serverHello.tackExt is not None),
-                            serverName,
-                            encryptThenMAC=self._recordLayer.encryptThenMAC)
-            
+        session.create(bytearray(0), serverHello.session_id, cipherSuite,
+                       srpUsername, clientCertChain, serverCertChain,
+                       tackExt, (serverHello.tackExt is not None),
+                       serverName,
+                       encryptThenMAC=self._recordLayer.encryptThenMAC,
+                       extendedMasterSecret=self.extendedMasterSecret)
+
+        createSessionTicket = None
+        if serverHello.getExtension(ExtensionType.session_ticket):
+            def createSessionTicket(masterSecret):
+                """Return NewSessionTicket for the finished session"""
+                session.masterSecret = masterSecret
+                return self._serverNewSessionTicket(ticketKeyManager,
+                                                    session)
+
+        # Exchange Finished messages      
+        for result in self._serverFinished(premasterSecret, 
+                                clientHello.random, serverHello.random,
+                                cipherSuite, settings.cipherImplementations,
+                                nextProtos, createSessionTicket):
+                if result in (0,1): yield result
+                else: break
+        session.masterSecret = result
+        self.session = session
+
         #Add the session object to the session cache
         if sessionCache and sessionID:
             sessionCache[sessionID] = self.session
@@ -1320,7 +1424,7 @@ class TLSConnection(TLSRecordLayer):
 
 
     def _serverGetClientHello(self, settings, certChain, verifierDB,
-                                sessionCache, anon):
+                                sessionCache, anon, ticketKeyManager=None):
         #Tentatively set version to most-desirable version, so if an error
         #occurs parsing the ClientHello, this is what we'll use for the
         #error alert
@@ -1389,9 +1493,23 @@ class TLSConnection(TLSRecordLayer):
                                                     minVersion=self.version,
                                                     maxVersion=self.version)
 
-        #If resumption was requested and we have a session cache...
-        if clientHello.session_id and sessionCache:
+        #Client's session ticket, if we can decrypt it
+        ticketExt = None
+        if ticketKeyManager is not None and self.version > (3, 0):
+            ticketExt = clientHello.getExtension(ExtensionType.session_ticket)
+            if ticketExt is not None and not ticketExt.ticket:
+                ticketExt = None
+
+        #If resumption was requested and we have a session cache or ticket...
+        if clientHello.session_id and (sessionCache or ticketExt):
             session = None
+            renewTicket = False
+
+            #Check the ticket
+            if ticketExt:
+                session, renewTicket = self._serverDecryptTicket(
+                    ticketKeyManager, ticketExt.ticket,
+                    clientHello.session_id, certChain)
 
             #Check in the session cache
             if sessionCache and not session:
@@ -1399,41 +1517,43 @@ class TLSConnection(TLSRecordLayer):
                     session = sessionCache[clientHello.session_id]
                     if not session.resumable:
                         raise AssertionError()
-                    #Check for consistency with ClientHello
-                    if session.cipherSuite not in cipherSuites:
-                        for result in self._sendError(\
-                                AlertDescription.handshake_failure):
-                            yield result
-                    if session.cipherSuite not in clientHello.cipher_suites:
-                        for result in self._sendError(\
-                                AlertDescription.handshake_failure):
-                            yield result
-                    if clientHello.srp_username:
-                        if not session.srpUsername or \
-                            clientHello.srp_username != bytearray(session.srpUsername, "utf-8"):
-                            for result in self._sendError(\
-                                    AlertDescription.handshake_failure):
-                                yield result
-                    if clientHello.server_name:
-                        if not session.serverName or \
-                            clientHello.server_name != bytearray(session.serverName, "utf-8"):
-                            for result in self._sendError(\
-                                    AlertDescription.handshake_failure):
-                                yield result                    
-                    if session.encryptThenMAC and \
-                            not clientHello.getExtension(
-                                    ExtensionType.encrypt_then_mac):
+                except KeyError:
+                    pass
+
+            #Check for consistency with ClientHello
+            if session:
+                if session.cipherSuite not in cipherSuites:
+                    for result in self._sendError(\
+                            AlertDescription.handshake_failure):
+                        yield result
+                if session.cipherSuite not in clientHello.cipher_suites:
+                    for result in self._sendError(\
+                            AlertDescription.handshake_failure):
+                        yield result
+                if clientHello.srp_username:
+                    if not session.srpUsername or \
+                        clientHello.srp_username != bytearray(session.srpUsername, "utf-8"):
                         for result in self._sendError(\
                                 AlertDescription.handshake_failure):
                             yield result
-                    if session.extendedMasterSecret and \
-                            not clientHello.getExtension(
-                                    ExtensionType.extended_master_secret):
+                if clientHello.server_name:
+                    if not session.serverName or \
+                        clientHello.server_name != bytearray(session.serverName, "utf-8"):
                         for result in self._sendError(\
                                 AlertDescription.handshake_failure):
-                            yield result
-                except KeyError:
-                    pass
+                            yield result                    
+                if session.encryptThenMAC and \
+                        not clientHello.getExtension(
+                                ExtensionType.encrypt_then_mac):
+                    for result in self._sendError(\
+                            AlertDescription.handshake_failure):
+                        yield result
+                if session.extendedMasterSecret and \
+                        not clientHello.getExtension(
+                                ExtensionType.extended_master_secret):
+                    for result in self._sendError(\
+                            AlertDescription.handshake_failure):
+                        yield result
 
             #If a session is found..
             if session:
@@ -1449,6 +1569,11 @@ class TLSConnection(TLSRecordLayer):
                                                 extended_master_secret,
                                                 bytearray(0))
                     extensions.append(ems)
+                newSessionTicket = None
+                if renewTicket:
+                    extensions.append(SessionTicketExtension().create())
+                    newSessionTicket = self._serverNewSessionTicket(
+                        ticketKeyManager, session)
                 # don't send empty extensions
                 if not extensions:
                     extensions = None
@@ -1457,8 +1582,13 @@ class TLSConnection(TLSRecordLayer):
                                    session.sessionID, session.cipherSuite,
                                    CertificateType.x509, None, None,
                                    extensions=extensions)
+                # send ServerHello, NewSessionTicket, CCS and Finished in
+                # single TCP packet
+                self.sock.buffer_writes = True
                 for result in self._sendMsg(serverHello):
                     yield result
+                self._selectHandshakeHashes(settings, session.cipherSuite,
+                                            clientAuth=False)
 
                 #Calculate pending connection states
                 self._calcPendingStates(session.cipherSuite, 
@@ -1469,7 +1599,9 @@ class TLSConnection(TLSRecordLayer):
 
                 #Exchange ChangeCipherSpec and Finished messages
                 for result in self._sendFinished(session.masterSecret,
-                                                 session.cipherSuite):
+                                                 session.cipherSuite,
+                                                 sessionTicket=\
+                                                     newSessionTicket):
                     yield result
                 for result in self._getFinished(session.masterSecret,
                                                 session.cipherSuite):
@@ -1696,12 +1828,16 @@ class TLSConnection(TLSRecordLayer):
 
 
     def _serverAnonKeyExchange(self, clientHello, serverHello, cipherSuite, 
-                               settings):
+                               settings, keyPool=None):
         # Calculate DH p, g, Xs, Ys
         # TODO make configurable
         dh_g, dh_p = goodGroupParameters[2]
-        dh_Xs = bytesToNumber(getRandomBytes(32))
-        dh_Ys = powMod(dh_g, dh_Xs, dh_p)
+        share = None
+        if keyPool is not None:
+            share = keyPool.getDHKey(dh_g, dh_p)
+        if share is None:
+            share = generateDHKey((dh_g, dh_p), 256)
+        dh_Xs, dh_Ys = share
 
         #Create ServerKeyExchange
         serverKeyExchange = ServerKeyExchange(cipherSuite, self.version)
@@ -1741,7 +1877,8 @@ class TLSConnection(TLSRecordLayer):
 
 
     def _serverFinished(self,  premasterSecret, clientRandom, serverRandom,
-                        cipherSuite, cipherImplementations, nextProtos):
+                        cipherSuite, cipherImplementations, nextProtos,
+                        createSessionTicket=None):
         if self.extendedMasterSecret:
             masterSecret = calcExtendedMasterSecret(self.version,
                                                     cipherSuite,
@@ -1765,20 +1902,55 @@ class TLSConnection(TLSRecordLayer):
                                    expect_next_protocol=nextProtos is not None):
             yield result
 
-        for result in self._sendFinished(masterSecret, cipherSuite):
+        sessionTicket = None
+        if createSessionTicket is not None:
+            sessionTicket = createSessionTicket(masterSecret)
+
+        for result in self._sendFinished(masterSecret, cipherSuite,
+                                         sessionTicket=sessionTicket):
             yield result
         
         yield masterSecret        
 
+    def _serverNewSessionTicket(self, ticketKeyManager, session):
+        """Return NewSessionTicket message with the encrypted session"""
+        ticket = ticketKeyManager.encrypt(session.serialize())
+        return NewSessionTicket().create(ticketKeyManager.ticketLifetime,
+                                         ticket)
+
+    @staticmethod
+    def _serverDecryptTicket(ticketKeyManager, ticket, sessionID, certChain):
+        """Return session from the ticket and whether to issue a new ticket
+
+        Session is None if the ticket is invalid or expired.
+        """
+        result = ticketKeyManager.decrypt(ticket)
+        if result is None:
+            return None, False
+        state, renew = result
+        try:
+            session = Session.deserialize(state,
+                                          [certChain] if certChain else None)
+        except ValueError:
+            return None, False
+        session.sessionID = sessionID
+        return session, renew
+
 
     #*********************************************************
     # Shared Handshake Functions
     #*********************************************************
 
 
-    def _sendFinished(self, masterSecret, cipherSuite=None, nextProto=None):
+    def _sendFinished(self, masterSecret, cipherSuite=None, nextProto=None,
+                      sessionTicket=None):
         # send the CCS and Finished in single TCP packet
         self.sock.buffer_writes = True
+        #Server - send the ticket announced in ServerHello
+        if sessionTicket is not None:
+            for result in self._sendMsg(sessionTicket):
+                yield result
+
         #Send ChangeCipherSpec
         for result in self._sendMsg(ChangeCipherSpec()):
             yield result
@@ -1808,7 +1980,18 @@ class TLSConnection(TLSRecordLayer):
         self.sock.buffer_writes = False
 
     def _getFinished(self, masterSecret, cipherSuite=None,
-                     expect_next_protocol=False, nextProto=None):
+                     expect_next_protocol=False, nextProto=None,
+                     expectSessionTicket=False):
+        #Client - get the ticket the server announced in ServerHello
+        if expectSessionTicket:
+            for result in self._getMsg(ContentType.handshake,
+                                       HandshakeType.new_session_ticket):
+                if result in (0, 1):
+                    yield result
+            self._sessionTicket = result
+        else:
+            self._sessionTicket = None
+
         #Get and check ChangeCipherSpec
         for result in self._getMsg(ContentType.change_cipher_spec):
             if result in (0,1):
@@ -1859,6 +2042,14 @@ class TLSConnection(TLSRecordLayer):
                                          "Finished message is incorrect"):
                 yield result
 
+    def _shutdown(self, resumable):
+        TLSRecordLayer._shutdown(self, resumable)
+        #Stores may return copies of the sessions, so the flag set above
+        #doesn't reach them
+        if not resumable and self._sessionStore is not None and \
+                self.session and self.session.sessionID:
+            self._sessionStore.delete(self.session.sessionID)
+
     def _handshakeWrapperAsync(self, handshaker, checker):
         try:
             for result in handshaker:
@@ -1906,6 +2097,24 @@ class TLSConnection(TLSRecordLayer):
         # if none match, default to sha1
         return "sha1"
 
+    def _selectHandshakeHashes(self, settings, cipherSuite, clientAuth):
+        """
+        Select hashes of handshake messages needed in the negotiated version
+
+        All Finished messages, extended master secret and CertificateVerify
+        use these, the signature of client certificate only when clientAuth
+        is set.
+        """
+        if self.version < (3, 3):
+            names = ['md5', 'sha1']
+        elif cipherSuite in CipherSuite.sha384PrfSuites:
+            names = ['sha384']
+        else:
+            names = ['sha256']
+        if clientAuth and self.version == (3, 3):
+            names += settings.rsaSigHashes
+        self._handshake_hash.selectHashes(names)
+
     @staticmethod
     def _sigHashesToList(settings):
         """Convert list of valid signature hashes to array of tuples"""
@@ -22,9 +22,11 @@ from .recordlayer import RecordLayer
 from .defragmenter import Defragmenter
 from .handshakehashes import HandshakeHashes
 from .bufferedsocket import BufferedSocket
+from .memorysocket import MemorySocket
 
 import socket
 import traceback
+from collections import deque
 
 class TLSRecordLayer(object):
     """
@@ -38,6 +40,11 @@ class TLSRecordLayer(object):
     @type sock: socket.socket
     @ivar sock: The underlying socket object.
 
+    @type sansIO: bool
+    @ivar sansIO: True if the connection was created without a socket, in
+    that case data is exchanged with the peer through L{feed} and
+    L{data_to_send} (read-only).
+
     @type session: L{tlslite.Session.Session}
     @ivar session: The session corresponding to this connection.
 
@@ -105,7 +112,15 @@ class TLSRecordLayer(object):
     getCipherImplementation, getCipherName
     """
 
-    def __init__(self, sock):
+    # limit on number of records encrypted before they're passed to socket
+    _maxRecordsPerWrite = 64
+
+    def __init__(self, sock=None):
+        if sock is None:
+            self._memorySocket = MemorySocket()
+            sock = self._memorySocket
+        else:
+            self._memorySocket = None
         sock = BufferedSocket(sock)
         self.sock = sock
         self._recordLayer = RecordLayer(sock)
@@ -178,8 +193,123 @@ class TLSRecordLayer(object):
         """Whether the connection uses Encrypt Then MAC (RFC 7366)"""
         return self._recordLayer.encryptThenMAC
 
+    @property
+    def recvInto(self):
+        """
+        Whether records are received into a preallocated buffer
+
+        When set to True, the records are read from socket using the
+        recv_into() method into a buffer reused for the whole connection,
+        that limits the number of system calls and copies needed for every
+        received record. False by default.
+        """
+        return self._recordLayer.recvInto
+
+    @recvInto.setter
+    def recvInto(self, value):
+        """Set whether records are received into a preallocated buffer"""
+        self._recordLayer.recvInto = value
+
+    @property
+    def readAhead(self):
+        """
+        Number of bytes to read from socket in a single call
+
+        When set to non-zero value, the connection will try to read that
+        many bytes from socket at a time, irrespective of size of the record
+        currently read, and will decrypt all complete application data
+        records received this way in one go. That greatly reduces the number
+        of system calls when the peer sends many small records (as is
+        common with protocols like IMAP or SMTP).
+
+        As the data is buffered in the connection object, it's not visible
+        to select() and similar calls on the socket, so this option is
+        suitable only for blocking sockets or callers that read from
+        connection until it would block. 0 (disabled) by default.
+        """
+        return self._recordLayer.readAhead
+
+    @readAhead.setter
+    def readAhead(self, value):
+        """Set the number of bytes to read from socket in a single call"""
+        self._recordLayer.readAhead = value
+
+    @property
+    def sansIO(self):
+        """Whether the connection was created without a socket"""
+        return self._memorySocket is not None
+
+    def feed(self, data):
+        """Pass data received from the peer to a connection without socket.
+
+        The data is processed by the next operation on the connection,
+        i.e. after feeding data, the generator returned by handshake,
+        readAsync() or closeAsync() should be resumed. Passing empty data
+        signals that the peer closed the connection.
+
+        @type data: bytes-like
+        @param data: data received from the peer
+        """
+        if self._memorySocket is None:
+            raise ValueError("feed() can be used only with connections "
+                             "created without a socket")
+        self._memorySocket.feed(data)
+
+    def data_to_send(self):
+        """Return data that needs to be sent to the peer.
+
+        For connections created without a socket, returns (and removes)
+        all the data the connection generated since the previous call;
+        should be called whenever an operation on the connection yields
+        or completes.
+
+        @rtype: bytearray
+        """
+        if self._memorySocket is None:
+            raise ValueError("data_to_send() can be used only with "
+                             "connections created without a socket")
+        return self._memorySocket.dataToSend()
+
+    def _checkBlockingAllowed(self):
+        """Raise ValueError if the connection can't block on I/O"""
+        if self.sansIO:
+            raise ValueError("use the *Async generators and "
+                             "feed()/data_to_send() in sans-I/O mode")
+
     def clearReadBuffer(self):
-        self._readBuffer = b''
+        # received application data is kept as a queue of chunks, with
+        # an offset of unread data in the first one, so that neither adding
+        # data nor reading it requires copying the whole buffer
+        self._readBuffer = deque()
+        self._readBufferOffset = 0
+        self._readBufferLength = 0
+
+    def _addToReadBuffer(self, data):
+        """Append received application data to the read buffer"""
+        if data:
+            # chunks are kept as bytes, so that a read which returns a whole
+            # chunk doesn't need to copy it
+            self._readBuffer.append(bytes(data))
+            self._readBufferLength += len(data)
+
+    def _getFromReadBuffer(self, max):
+        """Remove and return up to max bytes from the read buffer"""
+        pieces = []
+        length = 0
+        while self._readBuffer and length < max:
+            chunk = self._readBuffer[0]
+            start = self._readBufferOffset
+            end = start + max - length
+            if end >= len(chunk):
+                pieces.append(chunk[start:])
+                self._readBuffer.popleft()
+                self._readBufferOffset = 0
+            else:
+                pieces.append(chunk[start:end])
+                self._readBufferOffset = end
+            length += len(pieces[-1])
+        self._readBufferLength -= length
+        return b''.join(pieces)
 
     def clearWriteBuffer(self):
         self._send_writer = None
@@ -213,7 +343,9 @@ class TLSRecordLayer(object):
         @raise tlslite.errors.TLSAbruptCloseError: If the socket is closed
         without a preceding alert.
         @raise tlslite.errors.TLSAlert: If a TLS alert is signalled.
+        @raise ValueError: If the connection was created without a socket.
         """
+        self._checkBlockingAllowed()
         for result in self.readAsync(max, min):
             pass
         return result
@@ -231,13 +363,13 @@ class TLSRecordLayer(object):
         @return: A generator; see above for details.
         """
         try:
-            while len(self._readBuffer)<min and not self.closed:
+            while self._readBufferLength < min and not self.closed:
                 try:
                     for result in self._getMsg(ContentType.application_data):
                         if result in (0,1):
                             yield result
                     applicationData = result
-                    self._readBuffer += applicationData.write()
+                    self._addToReadBuffer(applicationData.write())
                 except TLSRemoteAlert as alert:
                     if alert.description != AlertDescription.close_notify:
                         raise
@@ -248,11 +380,9 @@ class TLSRecordLayer(object):
                         self._shutdown(True)
 
             if max == None:
-                max = len(self._readBuffer)
+                max = self._readBufferLength
 
-            returnBytes = self._readBuffer[:max]
-            self._readBuffer = self._readBuffer[max:]
-            yield bytes(returnBytes)
+            yield self._getFromReadBuffer(max)
         except GeneratorExit:
             raise
         except:
@@ -265,7 +395,12 @@ class TLSRecordLayer(object):
         unread the last data from a socket, that won't wake up selected waiters,
         and those waiters may hang forever.
         """
-        self._readBuffer = b + self._readBuffer
+        if self._readBufferOffset:
+            self._readBuffer[0] = \
+                    self._readBuffer[0][self._readBufferOffset:]
+            self._readBufferOffset = 0
+        self._readBuffer.appendleft(bytes(b))
+        self._readBufferLength += len(b)
 
     def write(self, s):
         """Write some data to the TLS connection.
@@ -279,7 +414,9 @@ class TLSRecordLayer(object):
         @param s: The data to transmit to the other party.
 
         @raise socket.error: If a socket error occurs.
+        @raise ValueError: If the connection was created without a socket.
         """
+        self._checkBlockingAllowed()
         for result in self.writeAsync(s):
             pass
 
@@ -330,8 +467,10 @@ class TLSRecordLayer(object):
         @raise tlslite.errors.TLSAbruptCloseError: If the socket is closed
         without a preceding alert.
         @raise tlslite.errors.TLSAlert: If a TLS alert is signalled.
+        @raise ValueError: If the connection was created without a socket.
         """
         if not self.closed:
+            self._checkBlockingAllowed()
             for result in self._decrefAsync():
                 pass
 
@@ -571,18 +710,37 @@ class TLSRecordLayer(object):
         if contentType == ContentType.handshake:
             self._handshake_hash.update(buf)
 
-        #Fragment big messages
-        while len(buf) > self.recordSize:
-            newB = buf[:self.recordSize]
-            buf = buf[self.recordSize:]
+        #Fragment big messages, slicing at offsets so that every byte of
+        #the message is copied only once
+        fragments = []
+        for start in range(0, max(len(buf), 1), self.recordSize):
+            fragments.append(Message(contentType,
+                                     buf[start:start + self.recordSize]))
+            if len(fragments) >= self._maxRecordsPerWrite:
+                for result in self._sendMsgsThroughSocket(fragments):
+                    yield result
+                fragments = []
 
-            msgFragment = Message(contentType, newB)
-            for result in self._sendMsgThroughSocket(msgFragment):
+        if fragments:
+            for result in self._sendMsgsThroughSocket(fragments):
                 yield result
 
-        msgFragment = Message(contentType, buf)
-        for result in self._sendMsgThroughSocket(msgFragment):
-            yield result
+    def _sendMsgsThroughSocket(self, msgs):
+        """
+        Send fragments of a message, handle errors
+
+        Fragments of messages other than handshake are encrypted together
+        and written to socket using a single call
+        """
+        if msgs[0].contentType == ContentType.handshake:
+            for msg in msgs:
+                for result in self._sendMsgThroughSocket(msg):
+                    yield result
+            return
+
+        for result in self._recordLayer.sendRecords(msgs):
+            if result in (0, 1):
+                yield result
 
     def _sendMsgThroughSocket(self, msg):
         """Send message, handle errors"""
@@ -776,6 +934,8 @@ class TLSRecordLayer(object):
                     yield Finished(self.version).parse(p)
                 elif subType == HandshakeType.next_protocol:
                     yield NextProtocol().parse(p)
+                elif subType == HandshakeType.new_session_ticket:
+                    yield NewSessionTicket().parse(p)
                 else:
                     raise AssertionError()
 
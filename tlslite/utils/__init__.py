@@ -15,6 +15,7 @@ __all__ = ["aes",
            "openssl_rc4",
            "openssl_rsakey",
            "openssl_tripledes",
+           "processpool_rsakey",
            "pycrypto_aes",
            "pycrypto_rc4",
            "pycrypto_rsakey",
@@ -14,7 +14,19 @@
 # look-up table.
 
 from __future__ import division
-from .cryptomath import bytesToNumber, numberToByteArray
+import struct
+from .compat import bytes_to_int, int_to_bytes, compatMemoryview
+
+def _reduction(i, bits):
+    """
+    Return the reduction of i * x^bits, where i is a polynomial of degree
+    smaller than bits, with terms stored in the least significant bits of i.
+    The result is returned as a 16-bit polynomial.
+    """
+    for _ in range(bits):
+        i = AESGCM._gcmShift(i)
+    return i >> (128-16)
+
 
 class AESGCM(object):
     """
@@ -22,7 +34,26 @@ class AESGCM(object):
     to be side-channel resistant. It's also rather slow.
     """
 
-    def __init__(self, key, implementation, rawAesEncrypt):
+    def __init__(self, key, implementation, rawAesEncrypt, tableBits=4,
+                 multiBlock=False):
+        """
+        Create AES-GCM cipher using the provided block cipher.
+
+        @type rawAesEncrypt: callable
+        @param rawAesEncrypt: function performing AES encryption of a single
+            block with the key
+
+        @type multiBlock: bool
+        @param multiBlock: whether rawAesEncrypt can encrypt multiple
+            consecutive blocks in one call (in ECB mode), if True, the whole
+            keystream for a record is generated in one call
+
+        @type tableBits: int
+        @param tableBits: number of bits of the hash key processed at a time
+            by GHASH, either 4 (tables of 16 entries) or 8 (tables of 256
+            entries, about 10KiB of memory per key, but multiplication
+            is about twice as fast)
+        """
         self.isBlockCipher = False
         self.isAEAD = True
         self.nonceLength = 12
@@ -34,36 +65,63 @@ class AESGCM(object):
             self.name = "aes256gcm"
         else:
             raise AssertionError()
+        if tableBits == 4:
+            self._reductionTable = AESGCM._gcmReductionTable
+        elif tableBits == 8:
+            self._reductionTable = AESGCM._gcmReductionTable8
+        else:
+            raise ValueError("Unsupported table size: {0}".format(tableBits))
+        self._tableBits = tableBits
+        self._multiBlock = multiBlock
 
         self._rawAesEncrypt = rawAesEncrypt
 
         # The GCM key is AES(0).
-        h = bytesToNumber(self._rawAesEncrypt(bytearray(16)))
-
-        # Pre-compute all 4-bit multiples of h. Note that bits are reversed
-        # because our polynomial representation places low-order terms at the
-        # most significant bit. Thus x^0 * h = h is at index 0b1000 = 8 and
-        # x^1 * h is at index 0b0100 = 4.
-        self._productTable = [0] * 16
-        self._productTable[self._reverseBits(1)] = h
-        for i in range(2, 16, 2):
-            self._productTable[self._reverseBits(i)] = \
-                self._gcmShift(self._productTable[self._reverseBits(i//2)])
-            self._productTable[self._reverseBits(i+1)] = \
-                self._gcmAdd(self._productTable[self._reverseBits(i)], h)
+        h = bytes_to_int(self._rawAesEncrypt(bytearray(16)))
+
+        # Pre-compute all 4-bit (or 8-bit) multiples of h. Note that bits are
+        # reversed because our polynomial representation places low-order
+        # terms at the most significant bit. Thus x^0 * h = h is at index
+        # 0b1000 = 8 and x^1 * h is at index 0b0100 = 4 (for 4-bit table).
+        tableSize = 1 << tableBits
+        self._productTable = [0] * tableSize
+        self._productTable[self._reverseBits(1, tableBits)] = h
+        for i in range(2, tableSize, 2):
+            self._productTable[self._reverseBits(i, tableBits)] = \
+                self._gcmShift(self._productTable[
+                    self._reverseBits(i//2, tableBits)])
+            self._productTable[self._reverseBits(i+1, tableBits)] = \
+                self._gcmAdd(self._productTable[
+                    self._reverseBits(i, tableBits)], h)
 
     def _rawAesCtrEncrypt(self, counter, inp):
         """
         Encrypts (or decrypts) plaintext with AES-CTR. counter is modified.
         """
-        out = bytearray(len(inp))
-        rawAesEncrypt = self._rawAesEncrypt
-        for i in range(0, len(out), 16):
-            mask = rawAesEncrypt(counter)
-            for j in range(i, min(len(out), i + 16)):
-                out[j] = inp[j] ^ mask[j-i]
-            self._inc32(counter)
-        return out
+        if not inp:
+            return bytearray(0)
+        blocks = (len(inp) + 15) // 16
+
+        # generate the counter blocks for the whole input at once
+        prefix = bytes(counter[:12])
+        start = struct.unpack('>I', bytes(counter[12:16]))[0]
+        counters = bytearray().join(
+            prefix + struct.pack('>I', (start + i) & 0xffffffff)
+            for i in range(blocks))
+        counter[12:16] = struct.pack('>I', (start + blocks) & 0xffffffff)
+
+        if self._multiBlock:
+            keystream = self._rawAesEncrypt(counters)
+        else:
+            rawAesEncrypt = self._rawAesEncrypt
+            keystream = bytearray().join(rawAesEncrypt(counters[i:i+16])
+                                         for i in range(0, len(counters), 16))
+
+        # XOR the input with the keystream as big integers
+        inpLen = len(inp)
+        return int_to_bytes(bytes_to_int(inp) ^
+                            bytes_to_int(keystream[:inpLen]),
+                            inpLen)
 
     def _auth(self, ciphertext, ad, tagMask):
         y = 0
@@ -71,38 +129,43 @@ class AESGCM(object):
         y = self._update(y, ciphertext)
         y ^= (len(ad) << (3 + 64)) | (len(ciphertext) << 3)
         y = self._mul(y)
-        y ^= bytesToNumber(tagMask)
-        return numberToByteArray(y, 16)
+        y ^= bytes_to_int(tagMask)
+        return int_to_bytes(y, 16)
 
     def _update(self, y, data):
         for i in range(0, len(data) // 16):
-            y ^= bytesToNumber(data[16*i:16*i+16])
+            y ^= bytes_to_int(data[16*i:16*i+16])
             y = self._mul(y)
         extra = len(data) % 16
         if extra != 0:
             block = bytearray(16)
             block[:extra] = data[-extra:]
-            y ^= bytesToNumber(block)
+            y ^= bytes_to_int(block)
             y = self._mul(y)
         return y
 
     def _mul(self, y):
         """ Returns y*H, where H is the GCM key. """
         ret = 0
-        # Multiply H by y 4 bits at a time, starting with the highest power
-        # terms.
-        for i in range(0, 128, 4):
-            # Multiply by x^4. The reduction for the top four terms is
+        bits = self._tableBits
+        mask = (1 << bits) - 1
+        productTable = self._productTable
+        reductionTable = self._reductionTable
+        # Multiply H by y 4 (or 8) bits at a time, starting with the highest
+        # power terms.
+        for i in range(0, 128, bits):
+            # Multiply by x^4 (x^8). The reduction for the top terms is
             # precomputed.
-            retHigh = ret & 0xf
-            ret >>= 4
-            ret ^= (AESGCM._gcmReductionTable[retHigh] << (128-16))
-
-            # Add in y' * H where y' are the next four terms of y, shifted down
-            # to the x^0..x^4. This is one of the pre-computed multiples of
-            # H. The multiplication by x^4 shifts them back into place.
-            ret ^= self._productTable[y & 0xf]
-            y >>= 4
+            retHigh = ret & mask
+            ret >>= bits
+            ret ^= (reductionTable[retHigh] << (128-16))
+
+            # Add in y' * H where y' are the next four (eight) terms of y,
+            # shifted down to the x^0..x^4 (x^0..x^8). This is one of the
+            # pre-computed multiples of H. The multiplication by x^4 (x^8)
+            # shifts them back into place.
+            ret ^= productTable[y & mask]
+            y >>= bits
         assert y == 0
         return ret
 
@@ -111,6 +174,27 @@ class AESGCM(object):
         Encrypts and authenticates plaintext using nonce and data. Returns the
         ciphertext, consisting of the encrypted plaintext and tag concatenated.
         """
+        out = bytearray(len(plaintext) + self.tagLength)
+        self.sealToBuffer(nonce, plaintext, data, out)
+        return out
+
+    def sealToBuffer(self, nonce, plaintext, data, out, offset=0):
+        """
+        Encrypts and authenticates plaintext using nonce and data, writes
+        the encrypted plaintext followed by the tag to out.
+
+        The ciphertext is computed in a temporary buffer and copied to out,
+        this only saves the copies needed to prepend data (like record
+        header) to the value returned by L{seal}.
+
+        @type out: bytearray
+        @param out: buffer with at least len(plaintext) + tagLength bytes
+            available after offset
+        @type offset: int
+        @param offset: position in out where the ciphertext starts
+        @rtype: int
+        @return: number of bytes written to out
+        """
 
         if len(nonce) != 12:
             raise ValueError("Bad nonce length")
@@ -126,15 +210,20 @@ class AESGCM(object):
         counter[-1] = 2
         ciphertext = self._rawAesCtrEncrypt(counter, plaintext)
 
-        tag = self._auth(ciphertext, data, tagMask)
+        end = offset + len(ciphertext)
+        out[offset:end] = ciphertext
+        out[end:end + 16] = self._auth(ciphertext, data, tagMask)
 
-        return ciphertext + tag
+        return len(ciphertext) + 16
 
     def open(self, nonce, ciphertext, data):
         """
         Decrypts and authenticates ciphertext using nonce and data. If the
         tag is valid, the plaintext is returned. If the tag is invalid,
         returns None.
+
+        ciphertext can be a memoryview, e.g. of the received record, it is
+        not copied before decryption.
         """
 
         if len(nonce) != 12:
@@ -142,8 +231,8 @@ class AESGCM(object):
         if len(ciphertext) < 16:
             return None
 
-        tag = ciphertext[-16:]
-        ciphertext = ciphertext[:-16]
+        tag = bytearray(ciphertext[-16:])
+        ciphertext = compatMemoryview(ciphertext)[:-16]
 
         # The initial counter value is the nonce, followed by a 32-bit counter
         # that starts at 1. It's used to compute the tag mask.
@@ -160,11 +249,13 @@ class AESGCM(object):
         return self._rawAesCtrEncrypt(counter, ciphertext)
 
     @staticmethod
-    def _reverseBits(i):
-        assert i < 16
-        i = ((i << 2) & 0xc) | ((i >> 2) & 0x3)
-        i = ((i << 1) & 0xa) | ((i >> 1) & 0x5)
-        return i
+    def _reverseBits(i, bits=4):
+        assert i < (1 << bits)
+        ret = 0
+        for _ in range(bits):
+            ret = (ret << 1) | (i & 1)
+            i >>= 1
+        return ret
 
     @staticmethod
     def _gcmAdd(x, y):
@@ -182,14 +273,6 @@ class AESGCM(object):
             x ^= 0xe1 << (128-8)
         return x
 
-    @staticmethod
-    def _inc32(counter):
-        for i in range(len(counter)-1, len(counter)-5, -1):
-            counter[i] = (counter[i] + 1) % 256
-            if counter[i] != 0:
-                break
-        return counter
-
     # _gcmReductionTable[i] is i * (1+x+x^2+x^7) for all 4-bit polynomials i. The
     # result is stored as a 16-bit polynomial. This is used in the reduction step to
     # multiply elements of GF(2^128) by x^4.
@@ -197,3 +280,7 @@ class AESGCM(object):
         0x0000, 0x1c20, 0x3840, 0x2460, 0x7080, 0x6ca0, 0x48c0, 0x54e0,
         0xe100, 0xfd20, 0xd940, 0xc560, 0x9180, 0x8da0, 0xa9c0, 0xb5e0,
     ]
+
+# _gcmReductionTable8[i] is the same as above but for all 8-bit polynomials i,
+# used to multiply elements of GF(2^128) by x^8.
+AESGCM._gcmReductionTable8 = [_reduction(i, 8) for i in range(256)]
@@ -7,7 +7,7 @@ Implementation that follows RFC 7539 closely.
 """
 
 from __future__ import division
-from .compat import compat26Str
+from .compat import compat26Str, bytes_to_int, int_to_bytes
 import copy
 import struct
 try:
@@ -15,6 +15,11 @@ try:
     from itertools import izip
 except ImportError:
     izip = zip
+try:
+    import numpy
+    numpyLoaded = True
+except ImportError:
+    numpyLoaded = False
 
 class ChaCha(object):
 
@@ -108,6 +113,68 @@ class ChaCha(object):
         return [(st + wrkSt) & 0xffffffff for st, wrkSt
                 in izip(state, working_state)]
 
+    # below that number of blocks the NumPy setup costs more than it saves
+    _numpy_min_blocks = 4
+
+    @staticmethod
+    def _chacha_blocks_python(key, counter, nonce, rounds, blocks):
+        """Generate key stream of consecutive blocks one block at a time"""
+        words = []
+        chacha_block = ChaCha.chacha_block
+        for i in range(blocks):
+            words.extend(chacha_block(key, (counter + i) & 0xffffffff, nonce,
+                                      rounds))
+        return struct.pack('<{0}L'.format(len(words)), *words)
+
+    @classmethod
+    def _chacha_blocks_numpy(cls, key, counter, nonce, rounds, blocks):
+        """Generate key stream of consecutive blocks, all at the same time"""
+        # every word of the state is a vector with values for all blocks
+        state = numpy.empty((16, blocks), dtype=numpy.uint32)
+        state[0:4] = numpy.array(cls.constants, dtype=numpy.uint32)[:, None]
+        state[4:12] = numpy.array(key, dtype=numpy.uint32)[:, None]
+        state[12] = (numpy.arange(blocks, dtype=numpy.uint64) + counter) \
+                    & 0xffffffff
+        state[13:16] = numpy.array(nonce, dtype=numpy.uint32)[:, None]
+
+        x = [row.copy() for row in state]
+        for _ in range(0, rounds // 2):
+            for a, b, c, d in cls._round_mixup_box:
+                xa = x[a]
+                xb = x[b]
+                xc = x[c]
+                xd = x[d]
+
+                xa += xb
+                xd ^= xa
+                xd = (xd << 16) | (xd >> 16)
+
+                xc += xd
+                xb ^= xc
+                xb = (xb << 12) | (xb >> 20)
+
+                xa += xb
+                xd ^= xa
+                xd = (xd << 8) | (xd >> 24)
+
+                xc += xd
+                xb ^= xc
+                xb = (xb << 7) | (xb >> 25)
+
+                x[b] = xb
+                x[d] = xd
+
+        state += numpy.array(x)
+        return state.T.astype('<u4').tobytes()
+
+    @classmethod
+    def chacha_blocks(cls, key, counter, nonce, rounds, blocks):
+        """Generate key stream of multiple consecutive blocks"""
+        if numpyLoaded and blocks >= cls._numpy_min_blocks:
+            return cls._chacha_blocks_numpy(key, counter, nonce, rounds,
+                                            blocks)
+        return cls._chacha_blocks_python(key, counter, nonce, rounds, blocks)
+
     @staticmethod
     def word_to_bytearray(state):
         """Convert state to little endian bytestream"""
@@ -139,18 +206,15 @@ class ChaCha(object):
 
     def encrypt(self, plaintext):
         """Encrypt the data"""
-        encrypted_message = bytearray()
-        for i, block in enumerate(plaintext[i:i+64] for i
-                                  in range(0, len(plaintext), 64)):
-            key_stream = ChaCha.chacha_block(self.key,
-                                             self.counter + i,
-                                             self.nonce,
-                                             self.rounds)
-            key_stream = ChaCha.word_to_bytearray(key_stream)
-            encrypted_message += bytearray(x ^ y for x, y
-                                           in izip(key_stream, block))
-
-        return encrypted_message
+        length = len(plaintext)
+        if not length:
+            return bytearray()
+        key_stream = self.chacha_blocks(self.key, self.counter, self.nonce,
+                                        self.rounds, (length + 63) // 64)
+        # XOR the whole message at once, as big integers
+        return int_to_bytes(bytes_to_int(plaintext) ^
+                            bytes_to_int(key_stream[:length]),
+                            length)
 
     def decrypt(self, ciphertext):
         """Decrypt the data"""
@@ -9,6 +9,7 @@ Implementation that follows RFC 7539 and draft-ietf-tls-chacha20-poly1305-00
 from __future__ import division
 from .chacha import ChaCha
 from .poly1305 import Poly1305
+from .compat import compatMemoryview
 import struct
 
 class CHACHA20_POLY1305(object):
@@ -44,11 +45,35 @@ class CHACHA20_POLY1305(object):
         else:
             return bytearray(16-(len(data)%16))
 
+    def _calculate_tag(self, otk, ciphertext, data):
+        """Calculate the Poly1305 tag over data and ciphertext"""
+        poly = Poly1305(otk)
+        poly.update(data)
+        poly.update(self.pad16(data))
+        poly.update(ciphertext)
+        poly.update(self.pad16(ciphertext))
+        poly.update(struct.pack('<QQ', len(data), len(ciphertext)))
+        return poly.finalize()
+
     def seal(self, nonce, plaintext, data):
         """
         Encrypts and authenticates plaintext using nonce and data. Returns the
         ciphertext, consisting of the encrypted plaintext and tag concatenated.
         """
+        out = bytearray(len(plaintext) + self.tagLength)
+        self.sealToBuffer(nonce, plaintext, data, out)
+        return out
+
+    def sealToBuffer(self, nonce, plaintext, data, out, offset=0):
+        """
+        Encrypts and authenticates plaintext using nonce and data, writes
+        the encrypted plaintext followed by the tag to out starting at
+        offset. Returns the number of bytes written.
+
+        The ciphertext is computed in a temporary buffer and copied to out,
+        this only saves the copies needed to prepend data (like record
+        header) to the value returned by seal().
+        """
         if len(nonce) != 12:
             raise ValueError("Nonce must be 96 bit large")
 
@@ -56,13 +81,11 @@ class CHACHA20_POLY1305(object):
 
         ciphertext = ChaCha(self.key, nonce, counter=1).encrypt(plaintext)
 
-        mac_data = data + self.pad16(data)
-        mac_data += ciphertext + self.pad16(ciphertext)
-        mac_data += struct.pack('<Q', len(data))
-        mac_data += struct.pack('<Q', len(ciphertext))
-        tag = Poly1305(otk).create_tag(mac_data)
+        end = offset + len(ciphertext)
+        out[offset:end] = ciphertext
+        out[end:end + 16] = self._calculate_tag(otk, ciphertext, data)
 
-        return ciphertext + tag
+        return len(ciphertext) + 16
 
     def open(self, nonce, ciphertext, data):
         """
@@ -76,16 +99,12 @@ class CHACHA20_POLY1305(object):
         if len(ciphertext) < 16:
             return None
 
-        expected_tag = ciphertext[-16:]
-        ciphertext = ciphertext[:-16]
+        expected_tag = bytearray(ciphertext[-16:])
+        ciphertext = compatMemoryview(ciphertext)[:-16]
 
         otk = self.poly1305_key_gen(self.key, nonce)
 
-        mac_data = data + self.pad16(data)
-        mac_data += ciphertext + self.pad16(ciphertext)
-        mac_data += struct.pack('<Q', len(data))
-        mac_data += struct.pack('<Q', len(ciphertext))
-        tag = Poly1305(otk).create_tag(mac_data)
+        tag = self._calculate_tag(otk, ciphertext, data)
 
         if tag != expected_tag:
             return None
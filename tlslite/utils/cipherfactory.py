@@ -16,6 +16,7 @@ tripleDESPresent = False
 
 if cryptomath.m2cryptoLoaded:
     from tlslite.utils import openssl_aes
+    from tlslite.utils import openssl_aesgcm
     from tlslite.utils import openssl_rc4
     from tlslite.utils import openssl_tripledes
     tripleDESPresent = True
@@ -65,9 +66,11 @@ def createAESGCM(key, implList=None):
     @return: An AESGCM object.
     """
     if implList is None:
-        implList = ["pycrypto", "python"]
+        implList = ["openssl", "pycrypto", "python"]
 
     for impl in implList:
+        if impl == "openssl" and cryptomath.m2cryptoLoaded:
+            return openssl_aesgcm.new(key)
         if impl == "pycrypto" and cryptomath.pycryptoLoaded:
             return pycrypto_aesgcm.new(key)
         if impl == "python":
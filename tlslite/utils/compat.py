@@ -52,6 +52,16 @@ if sys.version_info >= (3,0):
     def compatLong(num):
         return int(num)
 
+    def bytes_to_int(val, byteorder="big"):
+        """Convert bytes to an int."""
+        return int.from_bytes(val, byteorder)
+
+    def int_to_bytes(val, length=None, byteorder="big"):
+        """Return number converted to bytes"""
+        if length is None:
+            length = byte_length(val)
+        return bytearray(val.to_bytes(length, byteorder))
+
 else:
     # Python 2.6 requires strings instead of bytearrays in a couple places,
     # so we define this function so it does the conversion if needed.
@@ -86,7 +96,54 @@ else:
 
     def compatLong(num):
         return long(num)
+
+    def bytes_to_int(val, byteorder="big"):
+        """Convert bytes to an int."""
+        if not val:
+            return 0
+        if byteorder == "little":
+            val = bytearray(val)
+            val.reverse()
+        elif byteorder != "big":
+            raise ValueError("byteorder must be either 'little' or 'big'")
+        return int(b2a_hex(val), 16)
+
+    def int_to_bytes(val, length=None, byteorder="big"):
+        """Return number converted to bytes"""
+        if length is None:
+            length = byte_length(val)
+        if byteorder not in ("little", "big"):
+            raise ValueError("byteorder must be either 'little' or 'big'")
+        if val < 0 or val >> (length * 8):
+            raise OverflowError("int too big to convert")
+        if not length:
+            return bytearray()
+        ret = a2b_hex("%0*x" % (length * 2, val))
+        if byteorder == "little":
+            ret.reverse()
+        return ret
         
+def byte_length(val):
+    """Return number of bytes necessary to represent the integer"""
+    if not val:
+        return 0
+    if sys.version_info < (2, 7):
+        # bit_length() was introduced in 2.7
+        return (len(bin(val)) - 2 + 7) // 8
+    return (val.bit_length() + 7) // 8
+
+try:
+    memoryview
+except NameError:
+    # Python 2.6 doesn't have memoryview, slices of data are copies there
+    def compatMemoryview(data):
+        """Return memoryview of data, data itself if it's not supported"""
+        return data
+else:
+    def compatMemoryview(data):
+        """Return memoryview of data, data itself if it's not supported"""
+        return memoryview(data)
+
 import traceback
 def formatExceptionTrace(e):
     newStr = "".join(traceback.format_exception(sys.exc_type, sys.exc_value, sys.exc_traceback))
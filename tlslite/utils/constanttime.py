@@ -5,8 +5,9 @@
 
 from __future__ import division
 
-from .compat import compatHMAC
+from .compat import compatHMAC, bytes_to_int
 import hmac
+import struct
 
 def ct_lt_u32(val_a, val_b):
     """
@@ -93,10 +94,25 @@ def ct_eq_u32(val_a, val_b):
     """
     return 1 ^ ct_neq_u32(val_a, val_b)
 
+# 0x0101...01 - multiplied by the padding length gives the expected value of
+# a 256 byte long padding
+_PAD_BYTES = int("01" * 256, 16)
+
+# masks selecting the last pad_length + 1 bytes of data, the bit above 256
+# bytes makes all of them the same size, so that the bitwise operations with
+# them take the same time irrespective of the padding length
+_PAD_MASKS = [((1 << (8 * (i + 1))) - 1) | (1 << (8 * 257))
+              for i in range(256)]
+
 def ct_check_cbc_mac_and_pad(data, mac, seqnumBytes, contentType, version):
     """
     Check CBC cipher HMAC and padding. Close to constant time.
 
+    The padding is compared as a single integer, the HMAC is calculated for
+    all the possible positions of the MAC value (bounded by the maximum
+    padding length) and compared using integer masks, so the work done
+    depends only on the length of data, not on the padding length.
+
     @type data: bytearray
     @param data: data with HMAC value to test and padding
 
@@ -119,7 +135,8 @@ def ct_check_cbc_mac_and_pad(data, mac, seqnumBytes, contentType, version):
     assert version in ((3, 0), (3, 1), (3, 2), (3, 3))
 
     data_len = len(data)
-    if mac.digest_size + 1 > data_len: # data_len is public
+    digest_size = mac.digest_size
+    if digest_size + 1 > data_len: # data_len is public
         return False
 
     # 0 - OK
@@ -132,56 +149,57 @@ def ct_check_cbc_mac_and_pad(data, mac, seqnumBytes, contentType, version):
     pad_start = data_len - pad_length - 1
     pad_start = max(0, pad_start)
 
-    if version == (3, 0): # version is public
-        # in SSLv3 we can only check if pad is not longer than overall length
+    # padding and MAC must fit in the data
+    result |= ct_gt_u32(pad_length, data_len - 1 - digest_size)
 
-        # subtract 1 for the pad length byte
-        mask = ct_lsb_prop_u8(ct_lt_u32(data_len-1, pad_length))
-        result |= mask
-    else:
-        start_pos = max(0, data_len - 256)
-        for i in range(start_pos, data_len):
-            # if pad_start < i: mask = 0xff; else: mask = 0x00
-            mask = ct_lsb_prop_u8(ct_le_u32(pad_start, i))
-            # if data[i] != pad_length and "inside_pad": result = False
-            result |= (data[i] ^ pad_length) & mask
+    if version != (3, 0): # version is public
+        # in SSLv3 we can only check if pad is not longer than overall
+        # length, in TLS all the padding bytes must be equal to pad_length
+        tail_len = min(256, data_len)
+        tail = bytes_to_int(data[data_len - tail_len:])
+        expected = (_PAD_BYTES >> (8 * (256 - tail_len))) * pad_length
+        result |= ((tail ^ expected) & _PAD_MASKS[pad_length]) != 0
 
     #
     # check MAC
     #
 
     # real place where mac starts and data ends
-    mac_start = pad_start - mac.digest_size
+    mac_start = pad_start - digest_size
     mac_start = max(0, mac_start)
 
     # place to start processing
-    start_pos = max(0, data_len - (256 + mac.digest_size)) // mac.block_size
+    start_pos = max(0, data_len - (256 + digest_size)) // mac.block_size
     start_pos *= mac.block_size
 
     # add start data
     data_mac = mac.copy()
+    if version == (3, 0): # version is public
+        header = struct.pack('>BH', contentType, mac_start)
+    else:
+        header = struct.pack('>BBBH', contentType, version[0], version[1],
+                             mac_start)
     data_mac.update(compatHMAC(seqnumBytes))
-    data_mac.update(compatHMAC(bytearray([contentType])))
-    if version != (3, 0): # version is public
-        data_mac.update(compatHMAC(bytearray([version[0]])))
-        data_mac.update(compatHMAC(bytearray([version[1]])))
-    data_mac.update(compatHMAC(bytearray([mac_start >> 8])))
-    data_mac.update(compatHMAC(bytearray([mac_start & 0xff])))
+    data_mac.update(header)
     data_mac.update(compatHMAC(data[:start_pos]))
 
-    # don't check past the array end (already checked to be >= zero)
-    end_pos = data_len - 1 - mac.digest_size
+    # last possible position of MAC (with zero length padding)
+    end_pos = data_len - 1 - digest_size
+
+    digest_mask = (1 << (8 * digest_size)) - 1
+    mac_diff = 0
 
     # calculate all possible
-    for i in range(start_pos, end_pos): # constant for given overall length
-        cur_mac = data_mac.copy()
-        cur_mac.update(compatHMAC(data[start_pos:i]))
-        mac_compare = bytearray(cur_mac.digest())
+    for i in range(start_pos, end_pos + 1): # constant for given data length
+        mac_compare = bytes_to_int(data_mac.copy().digest())
         # compare the hash for real only if it's the place where mac is
         # supposed to be
-        mask = ct_lsb_prop_u8(ct_eq_u32(i, mac_start))
-        for j in range(0, mac.digest_size): # digest_size is public
-            result |= (data[i+j] ^ mac_compare[j]) & mask
+        mask = -ct_eq_u32(i, mac_start) & digest_mask
+        mac_diff |= (mac_compare ^
+                     bytes_to_int(data[i:i + digest_size])) & mask
+        data_mac.update(compatHMAC(data[i:i + 1]))
+
+    result |= mac_diff != 0
 
     # return python boolean
     return result == 0
@@ -14,6 +14,7 @@ import math
 import base64
 import binascii
 import sys
+import threading
 
 from .compat import compat26Str, compatHMAC, compatLong
 
@@ -239,6 +240,104 @@ else:
         else:
             return pow(base, power, modulus)
 
+class FixedBasePowMod(object):
+    """
+    Modular exponentiation with fixed base and modulus
+
+    Uses precomputed tables of base^(d * 2^(windowBits * i)) % modulus
+    for all windowBits wide digits d of the exponent, so that the
+    exponentiation needs just one modular multiplication per digit and no
+    squarings. Exponents longer than maxBits are handled by falling back
+    to powMod() for the bits not covered by the tables.
+
+    The tables are not modified after creation so the object can be
+    shared between threads.
+
+    @type base: int
+    @ivar base: the base of exponentiation
+
+    @type modulus: int
+    @ivar modulus: the modulus of exponentiation
+    """
+
+    def __init__(self, base, modulus, maxBits=384, windowBits=6):
+        """
+        Precompute the tables for given base and modulus
+
+        @type maxBits: int
+        @param maxBits: size of the largest exponent covered by tables
+
+        @type windowBits: int
+        @param windowBits: number of exponent bits handled with single
+        table lookup
+        """
+        self.base = base
+        self.modulus = modulus
+        self._windowBits = windowBits
+        self._mask = (1 << windowBits) - 1
+        if gmpyLoaded:
+            base = gmpy.mpz(base)
+            modulus = gmpy.mpz(modulus)
+        tables = []
+        for _ in range((maxBits + windowBits - 1) // windowBits):
+            row = [1, base % modulus]
+            for _ in range(2, 1 << windowBits):
+                row.append(row[-1] * base % modulus)
+            tables.append(tuple(row))
+            base = row[-1] * base % modulus
+        self._tables = tuple(tables)
+        # base^(2^(windowBits * len(tables))), for exponent bits above maxBits
+        self._highBase = base
+        self._coveredBits = windowBits * len(tables)
+
+    def __call__(self, power):
+        """Return base**power % modulus"""
+        if power < 0:
+            return powMod(self.base, power, self.modulus)
+        modulus = self.modulus
+        mask = self._mask
+        windowBits = self._windowBits
+        exponent = power
+        result = 1
+        for row in self._tables:
+            if not exponent:
+                break
+            digit = exponent & mask
+            if digit:
+                result = result * row[digit] % modulus
+            exponent >>= windowBits
+        if exponent:
+            result = result * powMod(self._highBase, exponent, modulus) \
+                     % modulus
+        return compatLong(result % modulus)
+
+
+_fixedBasePowMods = {}
+_fixedBasePowModsLock = threading.Lock()
+_FIXED_BASE_CACHE_SIZE = 16
+
+def fixedBasePowMod(base, power, modulus):
+    """
+    Calculate base**power % modulus for a base and modulus used repeatedly
+
+    Tables for the base and modulus (see L{FixedBasePowMod}) are created on
+    first use and shared by all callers, so it should be used only with
+    fixed groups, like the DH and SRP groups used by the server. Once
+    tables for L{_FIXED_BASE_CACHE_SIZE} groups exist, exponentiation with
+    other groups is performed using powMod().
+    """
+    key = (base, modulus)
+    fixedBase = _fixedBasePowMods.get(key)
+    if fixedBase is None:
+        with _fixedBasePowModsLock:
+            fixedBase = _fixedBasePowMods.get(key)
+            if fixedBase is None:
+                if len(_fixedBasePowMods) >= _FIXED_BASE_CACHE_SIZE:
+                    return powMod(base, power, modulus)
+                fixedBase = FixedBasePowMod(base, modulus)
+                _fixedBasePowMods[key] = fixedBase
+    return fixedBase(power)
+
 #Pre-calculate a sieve of the ~100 primes < 1000:
 def makeSieve(n):
     sieve = list(range(n))
@@ -0,0 +1,73 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""OpenSSL/M2Crypto AES-GCM implementation."""
+
+import struct
+
+from .cryptomath import *
+from .aesgcm import AESGCM
+
+if m2cryptoLoaded:
+
+    def new(key, tableBits=8):
+        return OpenSSL_AESGCM(key, tableBits)
+
+    class OpenSSL_AESGCM(AESGCM):
+        """
+        AES-GCM using OpenSSL for the AES-CTR step
+
+        M2Crypto doesn't provide access to the OpenSSL AEAD interface, so
+        only the encryption is performed by OpenSSL, the GHASH is calculated
+        in Python.
+        """
+
+        def __init__(self, key, tableBits=8):
+            if len(key) == 16:
+                ecbType = m2.aes_128_ecb()
+                self._ctrType = m2.aes_128_ctr()
+            elif len(key) == 32:
+                ecbType = m2.aes_256_ecb()
+                self._ctrType = m2.aes_256_ctr()
+            else:
+                raise AssertionError()
+            self._key = bytes(key)
+            self._ecbContext = m2.cipher_ctx_new()
+            m2.cipher_init(self._ecbContext, ecbType, self._key,
+                           bytes(bytearray(16)), 1)
+            AESGCM.__init__(self, key, "openssl", self._ecbEncrypt,
+                            tableBits, multiBlock=True)
+
+        def __del__(self):
+            if getattr(self, "_ecbContext", None) is not None:
+                m2.cipher_ctx_free(self._ecbContext)
+                self._ecbContext = None
+
+        def _ecbEncrypt(self, plaintext):
+            """Encrypt blocks using AES in ECB mode"""
+            return bytearray(m2.cipher_update(self._ecbContext,
+                                              bytes(plaintext)))
+
+        def _rawAesCtrEncrypt(self, counter, inp):
+            """
+            Encrypts (or decrypts) plaintext with AES-CTR. counter is modified.
+            """
+            if not inp:
+                return bytearray(0)
+            if not isinstance(inp, (bytes, bytearray)):
+                # memoryview
+                inp = inp.tobytes()
+            # OpenSSL increments the whole 128 bit block, not just the low 32
+            # bits like GCM does, but as GCM messages are limited to
+            # 2^32 - 2 blocks and the counter starts at 2, the low 32 bits
+            # never overflow
+            context = m2.cipher_ctx_new()
+            try:
+                m2.cipher_init(context, self._ctrType, self._key,
+                               bytes(counter), 1)
+                out = bytearray(m2.cipher_update(context, bytes(inp)))
+            finally:
+                m2.cipher_ctx_free(context)
+            start = struct.unpack('>I', bytes(counter[12:16]))[0]
+            counter[12:16] = struct.pack('>I', (start + (len(inp) + 15) // 16)
+                                         & 0xffffffff)
+            return out
@@ -3,9 +3,17 @@
 # See the LICENSE file for legal information regarding use of this file.
 """Implementation of Poly1305 authenticator for RFC 7539"""
 
+from .compat import bytes_to_int, int_to_bytes, compatMemoryview
+
 class Poly1305(object):
 
-    """Poly1305 authenticator"""
+    """
+    Poly1305 authenticator
+
+    The tag can be calculated either for a single message with create_tag()
+    or incrementally, by passing parts of message to update() and then
+    calling finalize().
+    """
 
     P = 0x3fffffffffffffffffffffffffffffffb # 2^130-5
 
@@ -41,13 +49,70 @@ class Poly1305(object):
         self.r = self.le_bytes_to_num(key[0:16])
         self.r &= 0x0ffffffc0ffffffc0ffffffc0fffffff
         self.s = self.le_bytes_to_num(key[16:32])
+        # powers of r let us process four blocks with a single reduction:
+        # (((a + m1)r + m2)r + m3)r + m4)r =
+        #   (a + m1)r^4 + m2 r^3 + m3 r^2 + m4 r
+        r2 = (self.r * self.r) % self.P
+        r3 = (r2 * self.r) % self.P
+        r4 = (r3 * self.r) % self.P
+        self._r_powers = (r4, r3, r2)
+        self._buffer = bytearray(0)
 
-    def create_tag(self, data):
-        """Calculate authentication tag for data"""
-        for i in range(0, self.divceil(len(data), 16)):
-            n = self.le_bytes_to_num(data[i*16:(i+1)*16] + b'\x01')
-            self.acc += n
-            self.acc = (self.r * self.acc) % self.P
+    def _process_blocks(self, data):
+        """Process data consisting of whole 16 byte blocks"""
+        data = compatMemoryview(data)
+        acc = self.acc
+        r = self.r
+        r4, r3, r2 = self._r_powers
+        P = self.P
+        hibit = 1 << 128
+        end = len(data)
+        end4 = end - end % 64
+        i = 0
+        while i < end4:
+            acc = ((acc + bytes_to_int(data[i:i+16], "little") + hibit) * r4 +
+                   (bytes_to_int(data[i+16:i+32], "little") + hibit) * r3 +
+                   (bytes_to_int(data[i+32:i+48], "little") + hibit) * r2 +
+                   (bytes_to_int(data[i+48:i+64], "little") + hibit) * r) % P
+            i += 64
+        while i < end:
+            acc = ((acc + bytes_to_int(data[i:i+16], "little") + hibit) *
+                   r) % P
+            i += 16
+        self.acc = acc
+
+    def update(self, data):
+        """
+        Add data to the authenticated message
+
+        @type data: bytes-like object
+        """
+        if self._buffer:
+            fill = 16 - len(self._buffer)
+            self._buffer += data[:fill]
+            data = data[fill:]
+            if len(self._buffer) < 16:
+                return
+            self._process_blocks(self._buffer)
+            self._buffer = bytearray(0)
+        full = len(data) - len(data) % 16
+        if full:
+            self._process_blocks(data[:full])
+        if full < len(data):
+            self._buffer = bytearray(data[full:])
+
+    def finalize(self):
+        """Return the authentication tag for the message passed to update()"""
+        if self._buffer:
+            n = bytes_to_int(self._buffer, "little") + \
+                (1 << (8 * len(self._buffer)))
+            self.acc = ((self.acc + n) * self.r) % self.P
+            self._buffer = bytearray(0)
         self.acc += self.s
-        return self.num_to_16_le_bytes(self.acc)
+        return int_to_bytes(self.acc & 0xffffffffffffffffffffffffffffffff,
+                            16, "little")
 
+    def create_tag(self, data):
+        """Calculate authentication tag for data"""
+        self.update(data)
+        return self.finalize()
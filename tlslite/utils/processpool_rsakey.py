@@ -0,0 +1,153 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+"""RSA implementation performing private key operations in worker processes."""
+
+from .cryptomath import *
+
+from .rsakey import *
+from .python_rsakey import Python_RSAKey
+
+try:
+    from concurrent.futures import ProcessPoolExecutor, Future
+    processPoolLoaded = True
+except ImportError:
+    processPoolLoaded = False
+
+# private keys already instantiated in the worker process, by key parameters
+_workerKeys = {}
+
+
+def _workerPrivateKeyOp(keyParams, m):
+    """Perform the raw private key operation in the worker process"""
+    key = _workerKeys.get(keyParams)
+    if key is None:
+        # the key keeps the blinding values between calls
+        key = Python_RSAKey(*keyParams)
+        _workerKeys[keyParams] = key
+    return key._rawPrivateKeyOp(m)
+
+
+if processPoolLoaded:
+    class ProcessPool_RSAKey(RSAKey):
+        """
+        RSA key performing the private key operations in a process pool
+
+        The private key operations of pure Python RSA keys hold the GIL
+        for the whole exponentiation, so threads handling handshakes
+        execute them one at a time. This key sends them to worker
+        processes instead; the calling thread releases the GIL while it
+        waits for the result, so a threaded server can perform as many
+        operations in parallel as there are workers.
+
+        The sign() and decrypt() methods block until the worker finishes,
+        so the key can be used in place of any other private key.
+        L{signAsync} and L{decryptAsync} return a
+        concurrent.futures.Future instead, which can be awaited in
+        asyncio code using asyncio.wrap_future().
+
+        Public key operations are performed in the calling process.
+
+        @type executor: concurrent.futures.Executor
+        @ivar executor: pool performing the private key operations
+        """
+
+        def __init__(self, key, executor=None, maxWorkers=None):
+            """
+            Create a key using the private key parameters of key
+
+            @type key: L{RSAKey}
+            @param key: private key exposing its n, e, d, p and q
+            parameters, e.g. L{Python_RSAKey}
+
+            @type executor: concurrent.futures.Executor
+            @param executor: process pool to use, if not specified a new
+            ProcessPoolExecutor is created and closed by L{close}
+
+            @type maxWorkers: int
+            @param maxWorkers: number of worker processes of the created
+            pool, by default the number of processors
+            """
+            if not key.hasPrivateKey():
+                raise ValueError("Key does not have private component")
+            self.n = key.n
+            self.e = key.e
+            self.d = key.d
+            p = key.p
+            q = key.q
+            self._keyParams = (self.n, self.e, self.d, p, q,
+                               self.d % (p - 1), self.d % (q - 1),
+                               invMod(q, p))
+            self._ownExecutor = executor is None
+            if executor is None:
+                executor = ProcessPoolExecutor(maxWorkers)
+            self.executor = executor
+
+        def close(self):
+            """Shut down the process pool if it was created by the key"""
+            if self._ownExecutor:
+                self.executor.shutdown()
+
+        def hasPrivateKey(self):
+            return True
+
+        def acceptsPassword(self):
+            return False
+
+        def _rawPrivateKeyOp(self, m):
+            return self._rawPrivateKeyOpAsync(m).result()
+
+        def _rawPrivateKeyOpAsync(self, m):
+            """Submit the private key operation, return its future"""
+            return self.executor.submit(_workerPrivateKeyOp,
+                                        self._keyParams, m)
+
+        def _rawPublicKeyOp(self, c):
+            return powMod(c, self.e, self.n)
+
+        def signAsync(self, bytes):
+            """
+            Sign the passed-in bytes in a worker process
+
+            @type bytes: L{bytearray} of unsigned bytes
+            @param bytes: The value which will be signed.
+
+            @rtype: concurrent.futures.Future
+            @return: future with the PKCS1 signature, see L{RSAKey.sign}
+            """
+            m = self._signaturePaddedNumber(bytes)
+            return self._chain(self._rawPrivateKeyOpAsync(m),
+                               lambda c: numberToByteArray(c,
+                                                           numBytes(self.n)))
+
+        def decryptAsync(self, encBytes):
+            """
+            Decrypt the passed-in bytes in a worker process
+
+            @type encBytes: L{bytearray} of unsigned bytes
+            @param encBytes: The value which will be decrypted.
+
+            @rtype: concurrent.futures.Future
+            @return: future with the decrypted data or None, see
+            L{RSAKey.decrypt}
+            """
+            c = self._ciphertextNumber(encBytes)
+            if c is None:
+                future = Future()
+                future.set_result(None)
+                return future
+            return self._chain(self._rawPrivateKeyOpAsync(c),
+                               self._removePKCS1Padding)
+
+        @staticmethod
+        def _chain(future, func):
+            """Return future with result of func applied to future result"""
+            result = Future()
+
+            def done(future):
+                try:
+                    result.set_result(func(future.result()))
+                except Exception as exc:
+                    result.set_exception(exc)
+
+            future.add_done_callback(done)
+            return result
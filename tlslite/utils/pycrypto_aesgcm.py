@@ -9,8 +9,8 @@ from .aesgcm import AESGCM
 if pycryptoLoaded:
     import Crypto.Cipher.AES
 
-    def new(key):
+    def new(key, tableBits=8):
         cipher = Crypto.Cipher.AES.new(bytes(key))
         def encrypt(plaintext):
             return bytearray(cipher.encrypt(bytes(plaintext)))
-        return AESGCM(key, "pycrypto", encrypt)
+        return AESGCM(key, "pycrypto", encrypt, tableBits, multiBlock=True)
@@ -3,7 +3,10 @@
 
 """Pure-Python AES implementation."""
 
+import struct
+
 from .cryptomath import *
+from .compat import compat26Str
 
 from .aes import *
 from .rijndael import rijndael
@@ -20,50 +23,37 @@ class Python_AES(AES):
     def encrypt(self, plaintext):
         AES.encrypt(self, plaintext)
 
-        plaintextBytes = plaintext[:]
-        chainBytes = self.IV[:]
-
-        #CBC Mode: For each block...
-        for x in range(len(plaintextBytes)//16):
-
-            #XOR with the chaining block
-            blockBytes = plaintextBytes[x*16 : (x*16)+16]
-            for y in range(16):
-                blockBytes[y] ^= chainBytes[y]
-
-            #Encrypt it
-            encryptedBytes = self.rijndael.encrypt(blockBytes)
+        # CBC Mode: the whole record is processed as 32 bit words, the
+        # chaining block is kept as integers between blocks
+        words = struct.unpack('>{0}I'.format(len(plaintext) // 4),
+                              compat26Str(plaintext))
+        c0, c1, c2, c3 = struct.unpack('>4I', compat26Str(self.IV))
+        encryptWords = self.rijndael.encryptWords
+        result = []
 
-            #Overwrite the input with the output
-            for y in range(16):
-                plaintextBytes[(x*16)+y] = encryptedBytes[y]
+        for x in range(0, len(words), 4):
+            c0, c1, c2, c3 = encryptWords(words[x] ^ c0, words[x+1] ^ c1,
+                                          words[x+2] ^ c2, words[x+3] ^ c3)
+            result += (c0, c1, c2, c3)
 
-            #Set the next chaining block
-            chainBytes = encryptedBytes
-
-        self.IV = chainBytes[:]
-        return plaintextBytes
+        self.IV = bytearray(struct.pack('>4I', c0, c1, c2, c3))
+        return bytearray(struct.pack('>{0}I'.format(len(result)), *result))
 
     def decrypt(self, ciphertext):
         AES.decrypt(self, ciphertext)
 
-        ciphertextBytes = ciphertext[:]
-        chainBytes = self.IV[:]
+        words = struct.unpack('>{0}I'.format(len(ciphertext) // 4),
+                              compat26Str(ciphertext))
+        c0, c1, c2, c3 = struct.unpack('>4I', compat26Str(self.IV))
+        decryptWords = self.rijndael.decryptWords
+        result = []
 
         #CBC Mode: For each block...
-        for x in range(len(ciphertextBytes)//16):
-
-            #Decrypt it
-            blockBytes = ciphertextBytes[x*16 : (x*16)+16]
-            decryptedBytes = self.rijndael.decrypt(blockBytes)
-
-            #XOR with the chaining block and overwrite the input with output
-            for y in range(16):
-                decryptedBytes[y] ^= chainBytes[y]
-                ciphertextBytes[(x*16)+y] = decryptedBytes[y]
-
-            #Set the next chaining block
-            chainBytes = blockBytes
-
-        self.IV = chainBytes[:]
-        return ciphertextBytes
+        for x in range(0, len(words), 4):
+            p0, p1, p2, p3 = decryptWords(words[x], words[x+1],
+                                          words[x+2], words[x+3])
+            result += (p0 ^ c0, p1 ^ c1, p2 ^ c2, p3 ^ c3)
+            c0, c1, c2, c3 = words[x:x+4]
+
+        self.IV = bytearray(struct.pack('>4I', c0, c1, c2, c3))
+        return bytearray(struct.pack('>{0}I'.format(len(result)), *result))
@@ -6,5 +6,5 @@
 from .aesgcm import AESGCM
 from .rijndael import rijndael
 
-def new(key):
-    return AESGCM(key, "python", rijndael(key, 16).encrypt)
+def new(key, tableBits=8):
+    return AESGCM(key, "python", rijndael(key, 16).encrypt, tableBits)
@@ -35,6 +35,9 @@ If any strings are of the wrong length a ValueError is thrown
 
 import copy
 import string
+import struct
+
+from .compat import compat26Str
 
 shifts = [[[0, 0], [1, 3], [2, 2], [3, 1]],
           [[0, 0], [1, 5], [2, 4], [3, 3]],
@@ -274,10 +277,87 @@ class rijndael:
                            U4[ tt        & 0xFF]
         self.Ke = Ke
         self.Kd = Kd
+        # round keys as tuples, for the 16 byte block fast path
+        self._encKeys = [tuple(i) for i in Ke]
+        self._decKeys = [tuple(i) for i in Kd]
+        self._encRounds = self._encKeys[1:-1]
+        self._decRounds = self._decKeys[1:-1]
+
+    def encryptWords(self, s0, s1, s2, s3):
+        """
+        Encrypt a single 16 byte block
+
+        The block and the result are represented as four big-endian 32 bit
+        integers. Works only with block_size of 16.
+        """
+        # local variables are much faster to access than globals
+        te1, te2, te3, te4, sbox = T1, T2, T3, T4, S
+        k0, k1, k2, k3 = self._encKeys[0]
+        s0 ^= k0
+        s1 ^= k1
+        s2 ^= k2
+        s3 ^= k3
+        for k0, k1, k2, k3 in self._encRounds:
+            t0 = (te1[s0 >> 24] ^ te2[(s1 >> 16) & 0xFF] ^
+                  te3[(s2 >> 8) & 0xFF] ^ te4[s3 & 0xFF] ^ k0)
+            t1 = (te1[s1 >> 24] ^ te2[(s2 >> 16) & 0xFF] ^
+                  te3[(s3 >> 8) & 0xFF] ^ te4[s0 & 0xFF] ^ k1)
+            t2 = (te1[s2 >> 24] ^ te2[(s3 >> 16) & 0xFF] ^
+                  te3[(s0 >> 8) & 0xFF] ^ te4[s1 & 0xFF] ^ k2)
+            s3 = (te1[s3 >> 24] ^ te2[(s0 >> 16) & 0xFF] ^
+                  te3[(s1 >> 8) & 0xFF] ^ te4[s2 & 0xFF] ^ k3)
+            s0, s1, s2 = t0, t1, t2
+        # last round is special
+        k0, k1, k2, k3 = self._encKeys[-1]
+        return ((sbox[s0 >> 24] << 24 | sbox[(s1 >> 16) & 0xFF] << 16 |
+                 sbox[(s2 >> 8) & 0xFF] << 8 | sbox[s3 & 0xFF]) ^ k0,
+                (sbox[s1 >> 24] << 24 | sbox[(s2 >> 16) & 0xFF] << 16 |
+                 sbox[(s3 >> 8) & 0xFF] << 8 | sbox[s0 & 0xFF]) ^ k1,
+                (sbox[s2 >> 24] << 24 | sbox[(s3 >> 16) & 0xFF] << 16 |
+                 sbox[(s0 >> 8) & 0xFF] << 8 | sbox[s1 & 0xFF]) ^ k2,
+                (sbox[s3 >> 24] << 24 | sbox[(s0 >> 16) & 0xFF] << 16 |
+                 sbox[(s1 >> 8) & 0xFF] << 8 | sbox[s2 & 0xFF]) ^ k3)
+
+    def decryptWords(self, s0, s1, s2, s3):
+        """
+        Decrypt a single 16 byte block
+
+        The block and the result are represented as four big-endian 32 bit
+        integers. Works only with block_size of 16.
+        """
+        td1, td2, td3, td4, sboxInv = T5, T6, T7, T8, Si
+        k0, k1, k2, k3 = self._decKeys[0]
+        s0 ^= k0
+        s1 ^= k1
+        s2 ^= k2
+        s3 ^= k3
+        for k0, k1, k2, k3 in self._decRounds:
+            t0 = (td1[s0 >> 24] ^ td2[(s3 >> 16) & 0xFF] ^
+                  td3[(s2 >> 8) & 0xFF] ^ td4[s1 & 0xFF] ^ k0)
+            t1 = (td1[s1 >> 24] ^ td2[(s0 >> 16) & 0xFF] ^
+                  td3[(s3 >> 8) & 0xFF] ^ td4[s2 & 0xFF] ^ k1)
+            t2 = (td1[s2 >> 24] ^ td2[(s1 >> 16) & 0xFF] ^
+                  td3[(s0 >> 8) & 0xFF] ^ td4[s3 & 0xFF] ^ k2)
+            s3 = (td1[s3 >> 24] ^ td2[(s2 >> 16) & 0xFF] ^
+                  td3[(s1 >> 8) & 0xFF] ^ td4[s0 & 0xFF] ^ k3)
+            s0, s1, s2 = t0, t1, t2
+        # last round is special
+        k0, k1, k2, k3 = self._decKeys[-1]
+        return ((sboxInv[s0 >> 24] << 24 | sboxInv[(s3 >> 16) & 0xFF] << 16 |
+                 sboxInv[(s2 >> 8) & 0xFF] << 8 | sboxInv[s1 & 0xFF]) ^ k0,
+                (sboxInv[s1 >> 24] << 24 | sboxInv[(s0 >> 16) & 0xFF] << 16 |
+                 sboxInv[(s3 >> 8) & 0xFF] << 8 | sboxInv[s2 & 0xFF]) ^ k1,
+                (sboxInv[s2 >> 24] << 24 | sboxInv[(s1 >> 16) & 0xFF] << 16 |
+                 sboxInv[(s0 >> 8) & 0xFF] << 8 | sboxInv[s3 & 0xFF]) ^ k2,
+                (sboxInv[s3 >> 24] << 24 | sboxInv[(s2 >> 16) & 0xFF] << 16 |
+                 sboxInv[(s1 >> 8) & 0xFF] << 8 | sboxInv[s0 & 0xFF]) ^ k3)
 
     def encrypt(self, plaintext):
         if len(plaintext) != self.block_size:
             raise ValueError('wrong block length, expected ' + str(self.block_size) + ' got ' + str(len(plaintext)))
+        if self.block_size == 16:
+            return bytearray(struct.pack('>4I', *self.encryptWords(
+                *struct.unpack('>4I', compat26Str(plaintext)))))
         Ke = self.Ke
 
         BC = self.block_size // 4
@@ -320,7 +400,10 @@ class rijndael:
 
     def decrypt(self, ciphertext):
         if len(ciphertext) != self.block_size:
-            raise ValueError('wrong block length, expected ' + str(self.block_size) + ' got ' + str(len(plaintext)))
+            raise ValueError('wrong block length, expected ' + str(self.block_size) + ' got ' + str(len(ciphertext)))
+        if self.block_size == 16:
+            return bytearray(struct.pack('>4I', *self.decryptWords(
+                *struct.unpack('>4I', compat26Str(ciphertext)))))
         Kd = self.Kd
 
         BC = self.block_size // 4
@@ -101,10 +101,7 @@ class RSAKey(object):
         """
         if not self.hasPrivateKey():
             raise AssertionError()
-        paddedBytes = self._addPKCS1Padding(bytes, 1)
-        m = bytesToNumber(paddedBytes)
-        if m >= self.n:
-            raise ValueError()
+        m = self._signaturePaddedNumber(bytes)
         c = self._rawPrivateKeyOp(m)
         sigBytes = numberToByteArray(c, numBytes(self.n))
         return sigBytes
@@ -167,23 +164,11 @@ class RSAKey(object):
         """
         if not self.hasPrivateKey():
             raise AssertionError()
-        if len(encBytes) != numBytes(self.n):
-            return None
-        c = bytesToNumber(encBytes)
-        if c >= self.n:
+        c = self._ciphertextNumber(encBytes)
+        if c is None:
             return None
         m = self._rawPrivateKeyOp(c)
-        decBytes = numberToByteArray(m, numBytes(self.n))
-        #Check first two bytes
-        if decBytes[0] != 0 or decBytes[1] != 2:
-            return None
-        #Scan through for zero separator
-        for x in range(1, len(decBytes)-1):
-            if decBytes[x]== 0:
-                break
-        else:
-            return None
-        return decBytes[x+1:] #Return everything after the separator
+        return self._removePKCS1Padding(m)
 
     def _rawPrivateKeyOp(self, m):
         raise NotImplementedError()
@@ -287,3 +272,34 @@ class RSAKey(object):
         padding = bytearray([0,blockType] + pad + [0])
         paddedBytes = padding + bytes
         return paddedBytes
+
+    def _signaturePaddedNumber(self, bytes):
+        """Return bytes with PKCS1 signature padding as an integer"""
+        paddedBytes = self._addPKCS1Padding(bytes, 1)
+        m = bytesToNumber(paddedBytes)
+        if m >= self.n:
+            raise ValueError()
+        return m
+
+    def _ciphertextNumber(self, encBytes):
+        """Return PKCS1 ciphertext as an integer, None if malformed"""
+        if len(encBytes) != numBytes(self.n):
+            return None
+        c = bytesToNumber(encBytes)
+        if c >= self.n:
+            return None
+        return c
+
+    def _removePKCS1Padding(self, m):
+        """Return the data from PKCS1 encryption padded integer, or None"""
+        decBytes = numberToByteArray(m, numBytes(self.n))
+        #Check first two bytes
+        if decBytes[0] != 0 or decBytes[1] != 2:
+            return None
+        #Scan through for zero separator
+        for x in range(1, len(decBytes)-1):
+            if decBytes[x]== 0:
+                break
+        else:
+            return None
+        return decBytes[x+1:] #Return everything after the separator
@@ -66,6 +66,11 @@ class MockSocket(socket.socket):
             self.index+=size
             return ret
 
+    def recv_into(self, buf):
+        ret = self.recv(len(buf))
+        buf[:len(ret)] = ret
+        return len(ret)
+
     def send(self, data):
         if self.closed:
             raise ValueError("Write to closed socket")
@@ -89,5 +94,11 @@ class MockSocket(socket.socket):
         self.sent.append(data[:self.maxWrite])
         return self.maxWrite
 
+    def sendmsg(self, buffers):
+        buf = bytearray()
+        for i in buffers:
+            buf += i
+        return self.send(buf)
+
     def close(self):
         self.closed = True
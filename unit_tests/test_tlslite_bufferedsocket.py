@@ -58,6 +58,33 @@ class TestBufferedSocket(unittest.TestCase):
         self.raw_sock.sendall.assert_not_called()
         self.assertIsNone(ret)
 
+    def test_sendmsg(self):
+        data = [bytearray(b'abc'), bytearray(b'de')]
+        ret = self.sock.sendmsg(data)
+
+        self.raw_sock.sendmsg.assert_called_once_with(data)
+        self.assertIs(ret, self.raw_sock.sendmsg.return_value)
+
+    def test_sendmsg_with_socket_without_sendmsg(self):
+        self.raw_sock = mock.MagicMock(spec=['send'])
+        self.sock = BufferedSocket(self.raw_sock)
+
+        ret = self.sock.sendmsg([bytearray(b'abc'), bytearray(b'de')])
+
+        self.raw_sock.send.assert_called_once_with(bytearray(b'abcde'))
+        self.assertIs(ret, self.raw_sock.send.return_value)
+
+    def test_sendmsg_with_buffering(self):
+        self.sock.buffer_writes = True
+
+        ret = self.sock.sendmsg([bytearray(b'abc'), bytearray(b'de')])
+
+        self.assertEqual(ret, 5)
+        self.raw_sock.sendmsg.assert_not_called()
+
+        self.sock.flush()
+        self.raw_sock.sendall.assert_called_once_with(bytearray(b'abcde'))
+
     def test_flush(self):
         self.sock.flush()
         self.raw_sock.sendall.assert_not_called()
@@ -95,6 +122,25 @@ class TestBufferedSocket(unittest.TestCase):
         self.raw_sock.recv.assert_called_once_with(value)
         self.assertIs(ret, self.raw_sock.recv.return_value)
 
+    def test_recv_into(self):
+        buf = bytearray(10)
+        ret = self.sock.recv_into(buf)
+
+        self.raw_sock.recv_into.assert_called_once_with(buf)
+        self.assertIs(ret, self.raw_sock.recv_into.return_value)
+
+    def test_recv_into_with_socket_without_recv_into(self):
+        self.raw_sock = mock.MagicMock(spec=['recv'])
+        self.raw_sock.recv.return_value = bytearray(b'abc')
+        self.sock = BufferedSocket(self.raw_sock)
+        buf = bytearray(10)
+
+        ret = self.sock.recv_into(buf)
+
+        self.raw_sock.recv.assert_called_once_with(10)
+        self.assertEqual(ret, 3)
+        self.assertEqual(buf, bytearray(b'abc' + b'\x00' * 7))
+
     def test_getsockname(self):
         ret = self.sock.getsockname()
 
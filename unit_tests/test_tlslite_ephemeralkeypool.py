@@ -0,0 +1,163 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import os
+import time
+
+from tlslite.ephemeralkeypool import EphemeralKeyPool, generateECDHKey, \
+        generateDHKey
+from tlslite.constants import GroupName
+from tlslite.mathtls import goodGroupParameters
+from tlslite.utils.ecc import getCurveByName, encodeX962Point
+
+
+class TestGenerateKeys(unittest.TestCase):
+    def test_generateECDHKey(self):
+        private, public = generateECDHKey(GroupName.secp256r1)
+
+        generator = getCurveByName('secp256r1').generator
+        self.assertEqual(public, encodeX962Point(generator * private))
+
+    def test_generateDHKey(self):
+        g, p = goodGroupParameters[0]
+
+        private, public = generateDHKey((g, p), 256)
+
+        self.assertLess(private, 2**256)
+        self.assertEqual(public, pow(g, private, p))
+
+
+class TestEphemeralKeyPool(unittest.TestCase):
+    def setUp(self):
+        self.group = goodGroupParameters[0]
+        self.pool = EphemeralKeyPool(curves=[GroupName.secp256r1],
+                                     dhGroups=[self.group], poolSize=3,
+                                     start=False)
+        self.addCleanup(self.pool.close)
+
+    def test_empty_pool(self):
+        self.assertIsNone(self.pool.getECDHKey(GroupName.secp256r1))
+        self.assertIsNone(self.pool.getDHKey(*self.group))
+
+    def test_fill(self):
+        self.pool.fill()
+
+        shares = [self.pool.getECDHKey(GroupName.secp256r1)
+                  for _ in range(4)]
+
+        self.assertIsNone(shares[-1])
+        # shares are never returned twice
+        self.assertEqual(len(set(i[0] for i in shares[:3])), 3)
+        generator = getCurveByName('secp256r1').generator
+        for private, public in shares[:3]:
+            self.assertEqual(public, encodeX962Point(generator * private))
+
+        shares = [self.pool.getDHKey(*self.group) for _ in range(3)]
+
+        self.assertEqual(len(set(i[0] for i in shares)), 3)
+        g, p = self.group
+        for private, public in shares:
+            self.assertEqual(public, pow(g, private, p))
+            self.assertLess(private, 2**320)
+
+    def test_not_pooled_groups(self):
+        self.pool.fill()
+
+        self.assertIsNone(self.pool.getECDHKey(GroupName.secp384r1))
+        self.assertIsNone(self.pool.getDHKey(*goodGroupParameters[1]))
+
+    def test_close(self):
+        self.pool.fill()
+
+        self.pool.close()
+
+        self.assertIsNone(self.pool.getECDHKey(GroupName.secp256r1))
+        self.pool.fill()
+        self.assertIsNone(self.pool.getDHKey(*self.group))
+
+    def test_default_curves(self):
+        pool = EphemeralKeyPool(start=False)
+
+        self.assertEqual(pool.curves, [GroupName.secp256r1])
+        self.assertEqual(pool.dhGroups, [])
+
+    @unittest.skipIf(not hasattr(os, "fork"), "requires os.fork()")
+    def test_fork_drops_shares(self):
+        self.pool.fill()
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                if self.pool.getECDHKey(GroupName.secp256r1) is None and \
+                        self.pool.getDHKey(*self.group) is None:
+                    status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(0, status)
+        # the parent keeps its own shares
+        self.assertIsNotNone(self.pool.getECDHKey(GroupName.secp256r1))
+
+
+class TestEphemeralKeyPoolThread(unittest.TestCase):
+    def test_background_refill(self):
+        pool = EphemeralKeyPool(curves=[GroupName.secp256r1], poolSize=2)
+        self.addCleanup(pool.close)
+
+        seen = set()
+        for _ in range(5):
+            share = None
+            while share is None:
+                share = pool.getECDHKey(GroupName.secp256r1)
+            self.assertNotIn(share[0], seen)
+            seen.add(share[0])
+
+    def test_close_stops_thread(self):
+        pool = EphemeralKeyPool(curves=[GroupName.secp256r1], poolSize=1)
+        thread = pool._thread
+
+        pool.close()
+
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(pool._thread)
+
+    @unittest.skipIf(not hasattr(os, "fork"), "requires os.fork()")
+    def test_fork_restarts_thread(self):
+        pool = EphemeralKeyPool(curves=[GroupName.secp256r1], poolSize=2)
+        self.addCleanup(pool.close)
+        key = ('ecdh', GroupName.secp256r1)
+        while len(pool._pools[key]) < 2:
+            time.sleep(0.01)
+        parentShares = set(i[0] for i in pool._pools[key])
+        parentThread = pool._thread
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                share = None
+                deadline = time.time() + 30
+                while share is None and time.time() < deadline:
+                    share = pool.getECDHKey(GroupName.secp256r1)
+                if share is not None and share[0] not in parentShares and \
+                        pool._thread is not parentThread and \
+                        pool._thread.is_alive():
+                    status = 0
+            finally:
+                os._exit(status)
+        _, status = os.waitpid(pid, 0)
+
+        self.assertEqual(0, status)
+        self.assertIs(parentThread, pool._thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,8 @@ except ImportError:
 from tlslite.extensions import TLSExtension, SNIExtension, NPNExtension,\
         SRPExtension, ClientCertTypeExtension, ServerCertTypeExtension,\
         TACKExtension, SupportedGroupsExtension, ECPointFormatsExtension,\
-        SignatureAlgorithmsExtension, PaddingExtension, VarListExtension
+        SignatureAlgorithmsExtension, PaddingExtension, VarListExtension, \
+        SessionTicketExtension
 from tlslite.utils.codec import Parser
 from tlslite.constants import NameType, ExtensionType, GroupName,\
         ECPointFormat, HashAlgorithm, SignatureAlgorithm
@@ -1424,5 +1425,45 @@ class TestPaddingExtension(unittest.TestCase):
 
         self.assertEqual(bytearray(b'\x00\x00\x00\x00'), ext.paddingData)
 
+class TestSessionTicketExtension(unittest.TestCase):
+    def test___init__(self):
+        ext = SessionTicketExtension()
+
+        self.assertEqual(ext.extType, 35)
+        self.assertEqual(ext.ticket, bytearray(0))
+
+    def test_create(self):
+        ext = SessionTicketExtension().create(bytearray(b'\xc0\xfe'))
+
+        self.assertEqual(ext.ticket, bytearray(b'\xc0\xfe'))
+
+    def test_create_empty(self):
+        ext = SessionTicketExtension().create()
+
+        self.assertEqual(ext.ticket, bytearray(0))
+
+    def test_write(self):
+        ext = SessionTicketExtension().create(bytearray(b'\xc0\xfe'))
+
+        self.assertEqual(bytearray(
+            b'\x00\x23' +           # type of extension
+            b'\x00\x02' +           # overall length of extension
+            b'\xc0\xfe'             # ticket
+            ), ext.write())
+
+    def test_parse_with_empty_data(self):
+        ext = SessionTicketExtension().parse(Parser(bytearray(0)))
+
+        self.assertEqual(ext.ticket, bytearray(0))
+
+    def test_parse_from_TLSExtension(self):
+        ext = TLSExtension().parse(Parser(bytearray(
+            b'\x00\x23' +           # type of extension
+            b'\x00\x02' +           # overall length of extension
+            b'\xc0\xfe')))          # ticket
+
+        self.assertIsInstance(ext, SessionTicketExtension)
+        self.assertEqual(ext.ticket, bytearray(b'\xc0\xfe'))
+
 if __name__ == '__main__':
     unittest.main()
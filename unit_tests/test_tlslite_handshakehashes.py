@@ -9,6 +9,8 @@ try:
 except ImportError:
     import unittest
 
+import hashlib
+
 from tlslite.handshakehashes import HandshakeHashes
 
 class TestHandshakeHashes(unittest.TestCase):
@@ -114,3 +116,85 @@ class TestHandshakeHashes(unittest.TestCase):
         hh.update(b'ext')
 
         self.assertEqual(hh.digest('sha256'), hh.digest('sha256'))
+
+    def test_update_does_not_create_hashes(self):
+        hh = HandshakeHashes()
+        hh.update(b'text')
+
+        self.assertEqual({}, hh._hashes)
+
+    def test_digest_creates_only_requested_hash(self):
+        hh = HandshakeHashes()
+        hh.update(b'text')
+
+        hh.digest('sha256')
+
+        self.assertEqual(['sha256'], list(hh._hashes.keys()))
+
+    def test_digest_with_hash_created_in_the_middle(self):
+        hh = HandshakeHashes()
+        hh.update(b'some ')
+
+        self.assertEqual(hashlib.sha384(b'some ').digest(),
+                         hh.digest('sha384'))
+
+        hh.update(b'text')
+
+        self.assertEqual(hashlib.sha384(b'some text').digest(),
+                         hh.digest('sha384'))
+        self.assertEqual(hashlib.sha1(b'some text').digest(),
+                         hh.digest('sha1'))
+
+    def test_copy_is_independent(self):
+        hh = HandshakeHashes()
+        hh.update(b'some ')
+        hh.digest('sha256')
+
+        hh2 = hh.copy()
+        hh2.update(b'text')
+
+        self.assertEqual(hashlib.sha256(b'some ').digest(),
+                         hh.digest('sha256'))
+        self.assertEqual(hashlib.sha256(b'some text').digest(),
+                         hh2.digest('sha256'))
+        self.assertEqual(hashlib.sha512(b'some ').digest(),
+                         hh.digest('sha512'))
+        self.assertEqual(hashlib.sha512(b'some text').digest(),
+                         hh2.digest('sha512'))
+
+    def test_selectHashes(self):
+        hh = HandshakeHashes()
+        hh.update(b'some ')
+
+        hh.selectHashes(['sha256', 'sha384'])
+        hh.update(b'text')
+
+        self.assertIsNone(hh._transcript)
+        self.assertEqual(hashlib.sha256(b'some text').digest(),
+                         hh.digest('sha256'))
+        self.assertEqual(hashlib.sha384(b'some text').digest(),
+                         hh.digest('sha384'))
+
+    def test_digest_of_not_selected_hash(self):
+        hh = HandshakeHashes()
+        hh.update(b'text')
+        hh.selectHashes(['sha256'])
+
+        with self.assertRaises(ValueError):
+            hh.digest('sha1')
+
+    def test_copy_after_selectHashes(self):
+        hh = HandshakeHashes()
+        hh.update(b'some ')
+        hh.selectHashes(['md5', 'sha1'])
+
+        hh2 = hh.copy()
+        hh2.update(b'text')
+
+        self.assertIsNone(hh2._transcript)
+        self.assertEqual(hashlib.md5(b'some ').digest() +
+                         hashlib.sha1(b'some ').digest(),
+                         hh.digest())
+        self.assertEqual(hashlib.md5(b'some text').digest() +
+                         hashlib.sha1(b'some text').digest(),
+                         hh2.digest())
@@ -260,5 +260,20 @@ class TestHandshakeSettings(unittest.TestCase):
         with self.assertRaises(ValueError):
             hs.validate()
 
+    def test_useSessionTickets(self):
+        hs = HandshakeSettings()
+        self.assertTrue(hs.useSessionTickets)
+
+        hs.useSessionTickets = False
+        n_hs = hs.validate()
+
+        self.assertFalse(n_hs.useSessionTickets)
+
+    def test_invalid_useSessionTickets(self):
+        hs = HandshakeSettings()
+        hs.useSessionTickets = None
+        with self.assertRaises(ValueError):
+            hs.validate()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,151 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import socket
+
+try:
+    import asyncio
+    from tlslite.integration.tlsasyncioprotocol import TLSAsyncioProtocol, \
+            open_tls_connection, start_tls_server
+except ImportError:
+    asyncio = None
+
+from tlslite.errors import TLSLocalAlert
+from tlslite.handshakesettings import HandshakeSettings
+from tlslite.x509 import X509
+from tlslite.x509certchain import X509CertChain
+from tlslite.utils.keyfactory import parsePEMKey
+from unit_tests.test_tlslite_tlsconnection import srv_raw_key, \
+        srv_raw_certificate
+
+
+class TestIntegrationPackage(unittest.TestCase):
+    def test_import_all(self):
+        namespace = {}
+        exec("from tlslite.integration import *", namespace)
+
+        self.assertIn("tlssocketservermixin", namespace)
+        self.assertEqual("tlsasyncioprotocol" in namespace,
+                         asyncio is not None)
+
+
+@unittest.skipIf(asyncio is None, "requires asyncio")
+class TestTLSAsyncioProtocol(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(None)
+        self.addCleanup(self.loop.close)
+
+        x509 = X509()
+        x509.parse(srv_raw_certificate)
+        self.certChain = X509CertChain([x509])
+        self.privateKey = parsePEMKey(srv_raw_key, private=True)
+
+    def start_echo_server(self, size=11, **kwargs):
+        """Start server that echoes size bytes and closes connection"""
+        tasks = []
+
+        def echo(reader, writer):
+            def received(future):
+                writer.write(future.result())
+                writer.close()
+
+            task = asyncio.ensure_future(reader.readexactly(size),
+                                         loop=self.loop)
+            task.add_done_callback(received)
+            tasks.append(task)
+
+        server = self.loop.run_until_complete(
+            start_tls_server(echo, '127.0.0.1', 0, loop=self.loop,
+                             certChain=self.certChain,
+                             privateKey=self.privateKey,
+                             **kwargs))
+        self.addCleanup(self.loop.run_until_complete, server.wait_closed())
+        self.addCleanup(server.close)
+        return server.sockets[0].getsockname()[1], tasks
+
+    def test_echo(self):
+        port, tasks = self.start_echo_server()
+
+        reader, writer = self.loop.run_until_complete(
+            open_tls_connection('127.0.0.1', port, loop=self.loop))
+
+        tlsConnection = writer.get_extra_info('tlsConnection')
+        self.assertIsNotNone(tlsConnection.session)
+        self.assertIs(writer.get_extra_info('session'),
+                      tlsConnection.session)
+        self.assertEqual(writer.get_extra_info('peername')[1], port)
+
+        writer.write(b'hello world')
+        data = self.loop.run_until_complete(reader.read())
+
+        self.assertEqual(data, b'hello world')
+        self.assertTrue(reader.at_eof())
+        self.assertTrue(tlsConnection.closed)
+        self.assertEqual(len(tasks), 1)
+        writer.close()
+
+    def test_echo_with_large_data(self):
+        port, tasks = self.start_echo_server(size=40000)
+
+        reader, writer = self.loop.run_until_complete(
+            open_tls_connection('127.0.0.1', port, loop=self.loop))
+
+        writer.write(b'a' * 20000)
+        writer.write(b'b' * 20000)
+        data = self.loop.run_until_complete(reader.read())
+
+        self.assertEqual(data, b'a' * 20000 + b'b' * 20000)
+
+    def test_handshake_failure(self):
+        settings = HandshakeSettings()
+        settings.maxVersion = (3, 2)
+        port, tasks = self.start_echo_server(settings=settings)
+
+        settings = HandshakeSettings()
+        settings.minVersion = (3, 3)
+        with self.assertRaises(TLSLocalAlert):
+            self.loop.run_until_complete(
+                open_tls_connection('127.0.0.1', port, loop=self.loop,
+                                    settings=settings))
+
+        self.assertEqual(tasks, [])
+
+    def test_connection_refused(self):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        with self.assertRaises(OSError):
+            self.loop.run_until_complete(
+                open_tls_connection('127.0.0.1', port, loop=self.loop))
+
+    def test_protocol_with_failing_handshaker(self):
+        waiter = asyncio.Future(loop=self.loop)
+        appProtocol = asyncio.Protocol()
+
+        def handshaker(tlsConnection):
+            raise ValueError("bad parameters")
+
+        protocol = TLSAsyncioProtocol(appProtocol, handshaker, waiter,
+                                      self.loop)
+
+        class Transport(asyncio.Transport):
+            def close(self):
+                protocol.connection_lost(None)
+
+        protocol.connection_made(Transport())
+
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(waiter)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,9 +10,12 @@ except ImportError:
         import unittest
 
 from tlslite.mathtls import PRF_1_2, calcMasterSecret, calcFinished, \
-        calcExtendedMasterSecret
+        calcExtendedMasterSecret, PRF_1_2_SHA384, PRF, PRF_SSL, P_hash, \
+        P_hashName
+from tlslite.utils.compat import a2b_hex
 from tlslite.handshakehashes import HandshakeHashes
 from tlslite.constants import CipherSuite
+from tlslite.utils.cryptomath import HMAC_SHA1, HMAC_SHA256
 
 class TestCalcMasterSecret(unittest.TestCase):
     def test_with_empty_values(self):
@@ -76,6 +79,83 @@ class TestPRF1_2(unittest.TestCase):
 
         self.assertEqual(bytearray(b'S\xb5\xdb\xc8T }u)BxuB\xe4\xeb\xeb'), ret)
 
+    def test_with_test_vector(self):
+        ret = PRF_1_2(a2b_hex('9bbe436ba940f017b17652849a71db35'),
+                      b"test label",
+                      a2b_hex('a0ba9f936cda311827a6f796ffd5198c'),
+                      100)
+
+        self.assertEqual(a2b_hex(
+            'e3f229ba727be17b8d122620557cd453c2aab21d07c3d495329b52d4e61edb5a'
+            '6b301791e90d35c9c9a46b4e14baf9af0fa022f7077def17abfd3797c0564bab'
+            '4fbc91666e9def9b97fce34f796789baa48082d122ee42c5a72e5a5110fff701'
+            '87347b66'), ret)
+
+    def test_with_zero_length(self):
+        self.assertEqual(bytearray(0),
+                         PRF_1_2(bytearray(48), b"key expansion",
+                                 bytearray(64), 0))
+
+class TestPRF1_2_SHA384(unittest.TestCase):
+    def test_with_test_vector(self):
+        ret = PRF_1_2_SHA384(a2b_hex('b80b733d6ceefcdc71566ea48e5567df'),
+                             b"test label",
+                             a2b_hex('cd665cf6a8447dd6ff8b27555edb7465'),
+                             148)
+
+        self.assertEqual(a2b_hex(
+            '7b0c18e9ced410ed1804f2cfa34a336a1c14dffb4900bb5fd7942107e81c83cd'
+            'e9ca0faa60be9fe34f82b1233c9146a0e534cb400fed2700884f9dc236f80edd'
+            '8bfa961144c9e8d792eca722a7b32fc3d416d473ebc2c5fd4abfdad05d918425'
+            '9b5bf8cd4d90fa0d31e2dec479e4f1a26066f2eea9a69236a3e52655c9e9aee6'
+            '91c8f3a26854308d5eaa3be85e0990703d73e56f'), ret)
+
+class TestPRF(unittest.TestCase):
+    def test_with_odd_secret_length(self):
+        secret = bytearray(range(47))
+        seed = bytearray(b'\x01' * 64)
+
+        ret = PRF(secret, b"key expansion", seed, 104)
+
+        # left and right half share the middle byte
+        expected = bytearray(
+            a ^ b for a, b in
+            zip(P_hashName('md5', secret[:24], b"key expansion" + seed, 104),
+                P_hashName('sha1', secret[23:], b"key expansion" + seed, 104)))
+        self.assertEqual(expected, ret)
+        self.assertEqual(104, len(ret))
+
+class TestP_hash(unittest.TestCase):
+    def test_with_HMAC_function(self):
+        ret = P_hash(HMAC_SHA256, bytearray(48), bytearray(b'\x01' * 64), 100)
+
+        self.assertEqual(P_hashName('sha256', bytearray(48),
+                                    bytearray(b'\x01' * 64), 100), ret)
+
+    def test_with_custom_function(self):
+        def macFunc(k, b):
+            return HMAC_SHA1(k, b)
+
+        ret = P_hash(macFunc, bytearray(48), bytearray(b'\x01' * 64), 50)
+
+        self.assertEqual(50, len(ret))
+        self.assertEqual(P_hashName('sha1', bytearray(48),
+                                    bytearray(b'\x01' * 64), 50), ret)
+
+class TestPRF_SSL(unittest.TestCase):
+    def test_length(self):
+        ret = PRF_SSL(bytearray(48), bytearray(64), 104)
+
+        self.assertEqual(104, len(ret))
+        self.assertEqual(ret[:20], PRF_SSL(bytearray(48), bytearray(64), 20))
+
+    def test_length_over_defined_blocks(self):
+        ret = PRF_SSL(bytearray(48), bytearray(64), 420)
+
+        self.assertEqual(420, len(ret))
+        self.assertEqual(ret[:416], PRF_SSL(bytearray(48), bytearray(64), 416))
+        self.assertEqual(bytearray(4), ret[416:])
+
 class TestCalcFinished(unittest.TestCase):
     def setUp(self):
         self.hhashes = HandshakeHashes()
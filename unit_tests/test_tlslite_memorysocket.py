@@ -0,0 +1,103 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+import errno
+import socket
+
+from tlslite.memorysocket import MemorySocket
+
+
+class TestMemorySocket(unittest.TestCase):
+    def test___init__(self):
+        sock = MemorySocket()
+
+        self.assertIsNotNone(sock)
+        self.assertFalse(sock.eof)
+        self.assertFalse(sock.closed)
+        self.assertEqual(sock.pendingLength, 0)
+
+    def test_recv_with_no_data(self):
+        sock = MemorySocket()
+
+        with self.assertRaises(socket.error) as exc:
+            sock.recv(10)
+
+        self.assertEqual(exc.exception.args[0], errno.EWOULDBLOCK)
+
+    def test_recv(self):
+        sock = MemorySocket()
+        sock.feed(b'abc')
+        sock.feed(bytearray(b'def'))
+
+        self.assertEqual(sock.pendingLength, 6)
+        self.assertEqual(sock.recv(4), bytearray(b'abcd'))
+        self.assertEqual(sock.recv(4), bytearray(b'ef'))
+        self.assertEqual(sock.pendingLength, 0)
+
+    def test_recv_after_eof(self):
+        sock = MemorySocket()
+        sock.feed(b'abc')
+        sock.feed(b'')
+
+        self.assertTrue(sock.eof)
+        self.assertEqual(sock.recv(10), bytearray(b'abc'))
+        self.assertEqual(sock.recv(10), bytearray(b''))
+
+    def test_recv_into(self):
+        sock = MemorySocket()
+        sock.feed(b'abcdef')
+        buf = bytearray(4)
+
+        self.assertEqual(sock.recv_into(memoryview(buf)), 4)
+        self.assertEqual(buf, bytearray(b'abcd'))
+        self.assertEqual(sock.recv_into(buf), 2)
+        self.assertEqual(buf, bytearray(b'efcd'))
+
+    def test_recv_into_with_no_data(self):
+        sock = MemorySocket()
+
+        with self.assertRaises(socket.error) as exc:
+            sock.recv_into(bytearray(10))
+
+        self.assertEqual(exc.exception.args[0], errno.EWOULDBLOCK)
+
+    def test_send(self):
+        sock = MemorySocket()
+
+        self.assertEqual(sock.send(bytearray(b'abc')), 3)
+        sock.sendall(b'def')
+        self.assertEqual(sock.sendmsg([b'gh', bytearray(b'i')]), 3)
+
+        self.assertEqual(sock.dataToSend(), bytearray(b'abcdefghi'))
+        self.assertEqual(sock.dataToSend(), bytearray(b''))
+
+    def test_send_copies_data(self):
+        sock = MemorySocket()
+        data = bytearray(b'abc')
+
+        sock.send(data)
+        data[0] = ord('x')
+
+        self.assertEqual(sock.dataToSend(), bytearray(b'abc'))
+
+    def test_send_after_close(self):
+        sock = MemorySocket()
+        sock.send(b'abc')
+        sock.close()
+
+        with self.assertRaises(socket.error):
+            sock.send(b'def')
+        with self.assertRaises(socket.error):
+            sock.sendmsg([b'def'])
+
+        self.assertEqual(sock.dataToSend(), bytearray(b'abc'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,12 +10,12 @@ except ImportError:
 from tlslite.messages import ClientHello, ServerHello, RecordHeader3, Alert, \
         RecordHeader2, Message, ClientKeyExchange, ServerKeyExchange, \
         CertificateRequest, CertificateVerify, ServerHelloDone, ServerHello2, \
-        ClientMasterKey, ClientFinished, ServerFinished
+        ClientMasterKey, ClientFinished, ServerFinished, NewSessionTicket
 from tlslite.utils.codec import Parser
 from tlslite.constants import CipherSuite, CertificateType, ContentType, \
         AlertLevel, AlertDescription, ExtensionType, ClientCertificateType, \
         HashAlgorithm, SignatureAlgorithm, ECCurveType, GroupName, \
-        SSL2HandshakeType
+        SSL2HandshakeType, HandshakeType
 from tlslite.extensions import SNIExtension, ClientCertTypeExtension, \
     SRPExtension, TLSExtension
 from tlslite.errors import TLSInternalError
@@ -2243,5 +2243,62 @@ class TestServerFinished(unittest.TestCase):
         self.assertEqual(fin.verify_data, bytearray(b'\xc0\xfe'))
         self.assertEqual(fin.handshakeType, SSL2HandshakeType.server_finished)
 
+class TestNewSessionTicket(unittest.TestCase):
+    def test___init__(self):
+        nst = NewSessionTicket()
+
+        self.assertIsNotNone(nst)
+        self.assertEqual(nst.handshakeType, HandshakeType.new_session_ticket)
+        self.assertEqual(nst.ticket_lifetime_hint, 0)
+        self.assertEqual(nst.ticket, bytearray(0))
+
+    def test_create(self):
+        nst = NewSessionTicket()
+        nst = nst.create(7200, bytearray(b'\xc0\xfe'))
+
+        self.assertEqual(nst.ticket_lifetime_hint, 7200)
+        self.assertEqual(nst.ticket, bytearray(b'\xc0\xfe'))
+
+    def test_write(self):
+        nst = NewSessionTicket().create(7200, bytearray(b'\xc0\xfe'))
+
+        self.assertEqual(bytearray(
+            b'\x04' +               # message type
+            b'\x00\x00\x08' +       # message length
+            b'\x00\x00\x1c\x20' +   # ticket lifetime hint
+            b'\x00\x02' +           # ticket length
+            b'\xc0\xfe'             # ticket
+            ), nst.write())
+
+    def test_parse(self):
+        parser = Parser(bytearray(
+            # type is handled by higher protocol level
+            b'\x00\x00\x08' +       # message length
+            b'\x00\x00\x1c\x20' +   # ticket lifetime hint
+            b'\x00\x02' +           # ticket length
+            b'\xc0\xfe'))           # ticket
+
+        nst = NewSessionTicket().parse(parser)
+
+        self.assertEqual(nst.ticket_lifetime_hint, 7200)
+        self.assertEqual(nst.ticket, bytearray(b'\xc0\xfe'))
+
+    def test_parse_with_trailing_data(self):
+        parser = Parser(bytearray(
+            b'\x00\x00\x09' +       # message length
+            b'\x00\x00\x1c\x20' +   # ticket lifetime hint
+            b'\x00\x02' +           # ticket length
+            b'\xc0\xfe' +           # ticket
+            b'\x00'))
+
+        with self.assertRaises(SyntaxError):
+            NewSessionTicket().parse(parser)
+
+    def test___repr__(self):
+        nst = NewSessionTicket().create(7200, bytearray(b'\xc0'))
+
+        self.assertEqual("NewSessionTicket(ticket_lifetime_hint=7200, "
+                         "ticket=bytearray(b'\\xc0'))", repr(nst))
+
 if __name__ == '__main__':
     unittest.main()
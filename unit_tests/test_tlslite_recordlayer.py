@@ -109,6 +109,7 @@ class TestRecordSocket(unittest.TestCase):
     def test_send_with_errored_out_socket(self):
         mockSock = mock.MagicMock()
         mockSock.send.side_effect = socket.error(errno.ETIMEDOUT)
+        mockSock.sendmsg.side_effect = socket.error(errno.ETIMEDOUT)
 
         sock = RecordSocket(mockSock)
 
@@ -119,6 +120,118 @@ class TestRecordSocket(unittest.TestCase):
         with self.assertRaises(socket.error):
             next(gen)
 
+    def test_send_uses_sendmsg(self):
+        mockSock = mock.MagicMock()
+        mockSock.sendmsg.return_value = 15
+        sock = RecordSocket(mockSock)
+        sock.version = (3, 3)
+
+        msg = Message(ContentType.handshake, bytearray(10))
+
+        for result in sock.send(msg):
+            if result in (0, 1):
+                self.assertTrue(False, "Blocking socket")
+            else: break
+
+        mockSock.send.assert_not_called()
+        mockSock.sendmsg.assert_called_once_with([
+            bytearray(b'\x16\x03\x03\x00\x0a'),
+            bytearray(10)])
+
+    def test_sendRecords(self):
+        mockSock = mock.MagicMock()
+        mockSock.sendmsg.return_value = 5 + 2 + 5 + 3
+        sock = RecordSocket(mockSock)
+        sock.version = (3, 3)
+
+        msgs = [Message(ContentType.application_data, bytearray(b'ab')),
+                Message(ContentType.application_data, bytearray(b'cde'))]
+
+        for result in sock.sendRecords(msgs):
+            if result in (0, 1):
+                self.assertTrue(False, "Blocking socket")
+            else: break
+
+        mockSock.sendmsg.assert_called_once_with([
+            bytearray(b'\x17\x03\x03\x00\x02'),
+            bytearray(b'ab'),
+            bytearray(b'\x17\x03\x03\x00\x03'),
+            bytearray(b'cde')])
+
+    def test_sendRawRecords(self):
+        mockSock = mock.MagicMock()
+        mockSock.sendmsg.return_value = 7 + 8
+        sock = RecordSocket(mockSock)
+        sock.version = (3, 3)
+
+        records = [bytearray(b'\x17\x03\x03\x00\x02ab'),
+                   bytearray(b'\x17\x03\x03\x00\x03cde')]
+
+        for result in sock.sendRawRecords(records):
+            if result in (0, 1):
+                self.assertTrue(False, "Blocking socket")
+            else: break
+
+        mockSock.sendmsg.assert_called_once_with(records)
+
+    def test_sendRecords_with_partial_writes(self):
+        mockSock = MockSocket(bytearray(0), maxWrite=4, blockEveryOther=True)
+        mockSock.sendmsg = mock.Mock(wraps=mockSock.sendmsg)
+        sock = RecordSocket(mockSock)
+        sock.version = (3, 3)
+
+        msgs = [Message(ContentType.application_data, bytearray(b'ab')),
+                Message(ContentType.application_data, bytearray(b'cde'))]
+
+        gotRetry = False
+        for result in sock.sendRecords(msgs):
+            if result in (0, 1):
+                gotRetry = True
+            else: break
+
+        self.assertTrue(gotRetry)
+        self.assertEqual(bytearray(b'\x17\x03\x03\x00\x02ab'
+                                   b'\x17\x03\x03\x00\x03cde'),
+                         bytearray(bytearray().join(mockSock.sent)))
+        self.assertTrue(all(len(i) <= 4 for i in mockSock.sent))
+
+    def test_sendRecords_with_socket_without_sendmsg(self):
+        mockSock = mock.MagicMock(spec=['send'])
+        mockSock.send.return_value = 15
+        sock = RecordSocket(mockSock)
+        sock.version = (3, 3)
+
+        msgs = [Message(ContentType.application_data, bytearray(b'ab')),
+                Message(ContentType.application_data, bytearray(b'cde'))]
+
+        for result in sock.sendRecords(msgs):
+            if result in (0, 1):
+                self.assertTrue(False, "Blocking socket")
+            else: break
+
+        mockSock.send.assert_called_once_with(
+            bytearray(b'\x17\x03\x03\x00\x02ab\x17\x03\x03\x00\x03cde'))
+
+    def test_sendRecords_with_more_buffers_than_iov_max(self):
+        mockSock = MockSocket(bytearray(0))
+        mockSock.sendmsg = mock.Mock(wraps=mockSock.sendmsg)
+        sock = RecordSocket(mockSock)
+        sock.version = (3, 3)
+        sock._iovMax = 4
+
+        msgs = [Message(ContentType.application_data, bytearray([i]))
+                for i in range(5)]
+
+        for result in sock.sendRecords(msgs):
+            if result in (0, 1):
+                self.assertTrue(False, "Blocking socket")
+            else: break
+
+        self.assertEqual(3, mockSock.sendmsg.call_count)
+        self.assertEqual(bytearray(bytearray().join(
+            b'\x17\x03\x03\x00\x01' + bytearray([i]) for i in range(5))),
+            bytearray(bytearray().join(mockSock.sent)))
+
     def test_recv(self):
         mockSock = MockSocket(bytearray(
             b'\x16' +           # type - handshake
@@ -354,6 +467,376 @@ class TestRecordSocket(unittest.TestCase):
 
         self.assertEqual(bytearray(b'\xaa'*4), data)
 
+class TestRecordSocketRecvInto(unittest.TestCase):
+    def test___init__(self):
+        sock = RecordSocket(-42)
+
+        self.assertFalse(sock.recvInto)
+        self.assertEqual(sock.bufferedLength, 0)
+
+    def test_recv(self):
+        mockSock = MockSocket(bytearray(
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x04' +       # length
+            b'\x01\x02\x03\x04'
+            ))
+        mockSock.recv = mock.Mock(wraps=mockSock.recv)
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+
+        self.assertEqual(data, bytearray(b'\x01\x02\x03\x04'))
+        self.assertIsInstance(data, bytearray)
+        self.assertEqual(header.type, ContentType.handshake)
+        self.assertEqual(header.version, (3, 3))
+        self.assertEqual(header.length, 4)
+        # one call for header, one for payload
+        self.assertEqual(mockSock.recv.call_count, 2)
+        self.assertEqual(sock.bufferedLength, 0)
+
+    def test_recv_multiple_records(self):
+        mockSock = MockSocket(bytearray(
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x02' +       # length
+            b'\xaa\xbb' +
+            b'\x17' +           # type - application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x03' +       # length
+            b'\xcc\xdd\xee'
+            ))
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+        self.assertEqual(header.type, ContentType.handshake)
+        self.assertEqual(data, bytearray(b'\xaa\xbb'))
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+        self.assertEqual(header.type, ContentType.application_data)
+        self.assertEqual(data, bytearray(b'\xcc\xdd\xee'))
+
+    def test_recv_does_not_read_past_record(self):
+        mockSock = MockSocket(bytearray(
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x02' +       # length
+            b'\xaa\xbb' +
+            b'\x17'))
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        self.assertEqual(mockSock.index, 7)
+        self.assertEqual(sock.bufferedLength, 0)
+
+    def test_recv_with_slow_socket(self):
+        mockSock = MockSocket(bytearray(
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x04' +       # length
+            b'\x00'*4
+            ), maxRet=1, blockEveryOther=True)
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        gotRetry = False
+        for result in sock.recv():
+            if result in (0, 1):
+                gotRetry = True
+            else: break
+
+        header, data = result
+
+        self.assertTrue(gotRetry)
+        self.assertEqual(bytearray(4), data)
+
+    def test_recv_with_empty_socket(self):
+        mockSock = mock.MagicMock()
+        mockSock.recv_into.side_effect = [0]
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        gen = sock.recv()
+
+        with self.assertRaises(TLSAbruptCloseError):
+            next(gen)
+
+    def test_recv_with_errored_out_socket(self):
+        mockSock = mock.MagicMock()
+        mockSock.recv_into.side_effect = socket.error(errno.ETIMEDOUT)
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        gen = sock.recv()
+
+        with self.assertRaises(socket.error):
+            next(gen)
+
+    def test_recv_with_socket_without_recv_into(self):
+        mockSock = mock.MagicMock(spec=['recv'])
+        mockSock.recv.side_effect = [bytearray(b'\x16\x03\x03\x00\x01'),
+                                     bytearray(b'\x0a')]
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+        self.assertEqual(header.length, 1)
+        self.assertEqual(data, bytearray(b'\x0a'))
+
+    def test_recv_with_too_big_record(self):
+        mockSock = MockSocket(bytearray(
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\xff\xff' +       # length
+            b'\x00'*65536))
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        gen = sock.recv()
+
+        with self.assertRaises(TLSRecordOverflow):
+            next(gen)
+
+    def test_recv_with_malformed_SSL2_record(self):
+        mockSock = MockSocket(bytearray(
+            b'\x40' +           # security escape data
+            b'\x04' +           # length
+            b'\x05' +           # padding length, longer than data
+            b'\xaa'*4))
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        gen = sock.recv()
+
+        with self.assertRaises(TLSIllegalParameterException):
+            next(gen)
+
+    def test_recv_with_SSL2_record(self):
+        mockSock = MockSocket(bytearray(
+            b'\x80' +           # tag
+            b'\x04' +           # length
+            b'\x00\x01\x02\x03' +
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x01' +       # length
+            b'\xff'))
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+
+        self.assertTrue(header.ssl2)
+        self.assertEqual(4, header.length)
+        self.assertEqual(bytearray(b'\x00\x01\x02\x03'), data)
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+
+        self.assertFalse(header.ssl2)
+        self.assertEqual(bytearray(b'\xff'), data)
+
+    def test_recv_with_long_SSL2_header(self):
+        mockSock = MockSocket(bytearray(
+            b'\x40' +  # security escape data
+            b'\x04' +  # length
+            b'\x00' +  # padding length
+            b'\xaa'*4))
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+
+        self.assertTrue(header.ssl2)
+        self.assertTrue(header.securityEscape)
+        self.assertEqual(4, header.length)
+        self.assertEqual(bytearray(b'\xaa'*4), data)
+
+    def test_recv_with_short_SSL2_record_at_end_of_stream(self):
+        # whole record is shorter than SSLv3 header
+        mockSock = MockSocket(bytearray(
+            b'\x80' +  # tag
+            b'\x02' +  # length
+            b'\xaa\xbb'))
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+
+        self.assertTrue(header.ssl2)
+        self.assertEqual(2, header.length)
+        self.assertEqual(bytearray(b'\xaa\xbb'), data)
+        self.assertEqual(0, sock.bufferedLength)
+
+    def test_recv_without_memoryview(self):
+        mockSock = MockSocket(bytearray(
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x02' +       # length
+            b'\xaa\xbb' +
+            b'\x17' +           # type - application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x03' +       # length
+            b'\xcc\xdd\xee'))
+        mockSock.recv_into = mock.Mock(wraps=mockSock.recv_into)
+
+        with mock.patch('tlslite.recordlayer.compatMemoryview',
+                        lambda data: data):
+            sock = RecordSocket(mockSock)
+            sock.readAhead = 4096
+
+            records = []
+            for _ in range(2):
+                for result in sock.recv():
+                    if result in (0, 1):
+                        self.assertTrue(False, "blocking socket")
+                    else: break
+                records.append(result)
+
+        self.assertEqual(ContentType.handshake, records[0][0].type)
+        self.assertEqual(bytearray(b'\xaa\xbb'), records[0][1])
+        self.assertEqual(ContentType.application_data, records[1][0].type)
+        self.assertEqual(bytearray(b'\xcc\xdd\xee'), records[1][1])
+        self.assertFalse(mockSock.recv_into.called)
+        self.assertEqual(0, sock.bufferedLength)
+
+    def test_recv_reuses_buffer(self):
+        record = bytearray(b'\x17\x03\x03\x40\x00') + bytearray(2**14)
+        mockSock = MockSocket(record * 3, maxRet=1000)
+
+        sock = RecordSocket(mockSock)
+        sock.recvInto = True
+
+        buffers = set()
+        for _ in range(3):
+            for result in sock.recv():
+                if result in (0, 1):
+                    self.assertTrue(False, "blocking socket")
+                else: break
+            header, data = result
+            self.assertEqual(2**14, len(data))
+            buffers.add(id(sock._recvBuffer))
+
+        self.assertEqual(1, len(buffers))
+
+    def test_recv_with_readAhead(self):
+        mockSock = MockSocket(bytearray(
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x02' +       # length
+            b'\xaa\xbb' +
+            b'\x17' +           # type - application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x03' +       # length
+            b'\xcc\xdd\xee' +
+            b'\x17' +           # type - application data
+            b'\x03\x03'))       # incomplete header
+        mockSock.recv = mock.Mock(wraps=mockSock.recv)
+        sock = RecordSocket(mockSock)
+        sock.readAhead = 4096
+
+        self.assertIsNone(sock.bufferedRecordType())
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+        self.assertEqual(header.type, ContentType.handshake)
+        self.assertEqual(data, bytearray(b'\xaa\xbb'))
+        self.assertEqual(mockSock.recv.call_count, 1)
+        self.assertEqual(sock.bufferedLength, 11)
+        self.assertEqual(sock.bufferedRecordType(),
+                         ContentType.application_data)
+
+        for result in sock.recv():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+        self.assertEqual(header.type, ContentType.application_data)
+        self.assertEqual(data, bytearray(b'\xcc\xdd\xee'))
+        self.assertEqual(mockSock.recv.call_count, 1)
+        self.assertEqual(sock.bufferedLength, 3)
+        self.assertIsNone(sock.bufferedRecordType())
+
+        gen = sock.recv()
+        self.assertEqual(0, next(gen))
+
+    def test_recv_with_readAhead_and_records_spanning_reads(self):
+        record = bytearray(b'\x17\x03\x03\x40\x00') + bytearray(2**14)
+        mockSock = MockSocket(record * 5, maxRet=10000)
+
+        sock = RecordSocket(mockSock)
+        sock.readAhead = 20000
+
+        for _ in range(5):
+            for result in sock.recv():
+                if result in (0, 1):
+                    self.assertTrue(False, "blocking socket")
+                else: break
+            header, data = result
+            self.assertEqual(2**14, header.length)
+            self.assertEqual(bytearray(2**14), data)
+
+        self.assertEqual(0, sock.bufferedLength)
+
 class TestConnectionState(unittest.TestCase):
     def test___init__(self):
         connState = ConnectionState()
@@ -399,6 +882,45 @@ class TestRecordLayer(unittest.TestCase):
 
         self.assertEqual(len(sock.sent), 1)
 
+    def test_sendRecords(self):
+        sock = MockSocket(bytearray(0))
+        sock.sendmsg = mock.Mock(wraps=sock.sendmsg)
+
+        recordLayer = RecordLayer(sock)
+        recordLayer.version = (3, 3)
+        recordLayer.calcPendingStates(
+                CipherSuite.TLS_RSA_WITH_AES_128_GCM_SHA256,
+                bytearray(48), # master secret
+                bytearray(32), # client random
+                bytearray(32), # server random
+                None)
+        recordLayer.changeWriteState()
+
+        msgs = [ApplicationData().create(bytearray(b'test')),
+                ApplicationData().create(bytearray(b'test'))]
+
+        for result in recordLayer.sendRecords(msgs):
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        sock.sendmsg.assert_called_once()
+        self.assertEqual(len(sock.sent), 1)
+        # same as in test_sendRecord_with_AES128GCM
+        self.assertEqual(sock.sent[0][:33], bytearray(
+            b'\x17' +           # application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x1c' +       # length
+            b'\x00\x00\x00\x00\x00\x00\x00\x00Fy\xc0\x91' +
+            b'A\x85\x82\xffk\x95\x8a51\x1e\xfb\x93e\xdd\xc1\xc7'))
+        # second record uses next sequence number
+        self.assertEqual(sock.sent[0][33:46], bytearray(
+            b'\x17' +           # application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x1c' +       # length
+            b'\x00\x00\x00\x00\x00\x00\x00\x01'))
+        self.assertEqual(2, recordLayer._writeState.seqnum)
+
     def test_shutdown(self):
         sock = MockSocket(bytearray(0))
 
@@ -767,6 +1289,34 @@ class TestRecordLayer(unittest.TestCase):
             b'\x00\x00\x00\x00\x00\x00\x00\x00Fy\xc0\x91' +
             b'A\x85\x82\xffk\x95\x8a51\x1e\xfb\x93e\xdd\xc1\xc7'))
 
+    def test_sendRecord_with_AES128GCM_uses_single_buffer(self):
+        sock = MockSocket(bytearray(0))
+        sock.sendmsg = mock.Mock(wraps=sock.sendmsg)
+
+        recordLayer = RecordLayer(sock)
+        recordLayer.version = (3, 3)
+
+        recordLayer.calcPendingStates(CipherSuite.TLS_RSA_WITH_AES_128_GCM_SHA256,
+                                      bytearray(48), # master secret
+                                      bytearray(32), # client random
+                                      bytearray(32), # server random
+                                      None)
+        recordLayer.changeWriteState()
+
+        app_data = ApplicationData().create(bytearray(b'test'))
+
+        for result in recordLayer.sendRecord(app_data):
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        # header, explicit nonce, ciphertext and tag in a single buffer
+        self.assertEqual(1, len(sock.sendmsg.call_args[0][0]))
+        self.assertEqual(sock.sent[0], bytearray(
+            b'\x17\x03\x03\x00\x1c'
+            b'\x00\x00\x00\x00\x00\x00\x00\x00Fy\xc0\x91' +
+            b'A\x85\x82\xffk\x95\x8a51\x1e\xfb\x93e\xdd\xc1\xc7'))
+
     def test_recvRecord_with_AES128GCM(self):
         sock = MockSocket(bytearray(
             b'\x17' +
@@ -798,6 +1348,180 @@ class TestRecordLayer(unittest.TestCase):
         self.assertEqual(head.type, ContentType.application_data)
         self.assertEqual(bytearray(b'test'), parser.bytes)
 
+    def test_recvRecord_with_AES128GCM_without_memoryview(self):
+        # as on Python 2.6
+        with mock.patch('tlslite.recordlayer.compatMemoryview',
+                        lambda data: data):
+            self.test_recvRecord_with_AES128GCM()
+
+    @staticmethod
+    def _encryptRecords(messages, cipherSuite, version=(3, 3)):
+        sock = MockSocket(bytearray(0))
+        recordLayer = RecordLayer(sock)
+        recordLayer.version = version
+        recordLayer.calcPendingStates(cipherSuite,
+                                      bytearray(48), # master secret
+                                      bytearray(32), # client random
+                                      bytearray(32), # server random
+                                      None)
+        recordLayer.changeWriteState()
+        for msg in messages:
+            for result in recordLayer.sendRecord(msg):
+                pass
+        return bytearray(bytearray().join(sock.sent))
+
+    def test_recvRecord_with_readAhead(self):
+        cipherSuite = CipherSuite.TLS_RSA_WITH_AES_128_GCM_SHA256
+        data = self._encryptRecords(
+            [ApplicationData().create(bytearray([i]) * 10) for i in range(5)],
+            cipherSuite)
+        sock = MockSocket(data)
+        sock.recv = mock.Mock(wraps=sock.recv)
+
+        recordLayer = RecordLayer(sock)
+        recordLayer.version = (3, 3)
+        recordLayer.client = False
+        recordLayer.readAhead = 4096
+        self.assertEqual(4096, recordLayer.readAhead)
+        recordLayer.calcPendingStates(cipherSuite,
+                                      bytearray(48), # master secret
+                                      bytearray(32), # client random
+                                      bytearray(32), # server random
+                                      None)
+        recordLayer.changeReadState()
+
+        for i in range(5):
+            for result in recordLayer.recvRecord():
+                if result in (0, 1):
+                    self.assertTrue(False, "blocking socket")
+                else:
+                    break
+
+            head, parser = result
+            self.assertEqual(head.type, ContentType.application_data)
+            self.assertEqual(bytearray([i]) * 10, parser.bytes)
+
+        self.assertEqual(1, sock.recv.call_count)
+        self.assertEqual(5, recordLayer._readState.seqnum)
+
+    def test_bufferedLength_with_readAhead(self):
+        cipherSuite = CipherSuite.TLS_RSA_WITH_AES_128_GCM_SHA256
+        data = self._encryptRecords(
+            [ApplicationData().create(bytearray([i]) * 10) for i in range(3)],
+            cipherSuite)
+        sock = MockSocket(data)
+
+        recordLayer = RecordLayer(sock)
+        recordLayer.version = (3, 3)
+        recordLayer.client = False
+        recordLayer.readAhead = 4096
+        recordLayer.calcPendingStates(cipherSuite,
+                                      bytearray(48), # master secret
+                                      bytearray(32), # client random
+                                      bytearray(32), # server random
+                                      None)
+        recordLayer.changeReadState()
+        self.assertEqual(0, recordLayer.bufferedLength)
+
+        for result in recordLayer.recvRecord():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else:
+                break
+
+        # all records are decrypted, the socket wrapper has nothing left
+        self.assertEqual(0, recordLayer._recordSocket.bufferedLength)
+        self.assertEqual(20, recordLayer.bufferedLength)
+
+        for _ in range(2):
+            for result in recordLayer.recvRecord():
+                if result in (0, 1):
+                    self.assertTrue(False, "blocking socket")
+                else:
+                    break
+
+        self.assertEqual(0, recordLayer.bufferedLength)
+
+    def test_recvRecord_with_readAhead_stops_on_handshake(self):
+        cipherSuite = CipherSuite.TLS_RSA_WITH_AES_128_GCM_SHA256
+        data = self._encryptRecords(
+            [ApplicationData().create(bytearray(b'first')),
+             Message(ContentType.handshake, bytearray(b'\x00\x00\x00\x00')),
+             ApplicationData().create(bytearray(b'second'))],
+            cipherSuite)
+        sock = MockSocket(data)
+
+        recordLayer = RecordLayer(sock)
+        recordLayer.version = (3, 3)
+        recordLayer.client = False
+        recordLayer.readAhead = 4096
+        recordLayer.calcPendingStates(cipherSuite,
+                                      bytearray(48), # master secret
+                                      bytearray(32), # client random
+                                      bytearray(32), # server random
+                                      None)
+        recordLayer.changeReadState()
+
+        for result in recordLayer.recvRecord():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else:
+                break
+
+        head, parser = result
+        self.assertEqual(bytearray(b'first'), parser.bytes)
+        # the handshake record must not be decrypted before it's requested
+        self.assertEqual(1, recordLayer._readState.seqnum)
+
+        for result in recordLayer.recvRecord():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else:
+                break
+
+        head, parser = result
+        self.assertEqual(ContentType.handshake, head.type)
+        self.assertEqual(2, recordLayer._readState.seqnum)
+
+    def test_recvRecord_with_readAhead_and_invalid_record(self):
+        cipherSuite = CipherSuite.TLS_RSA_WITH_AES_128_GCM_SHA256
+        data = self._encryptRecords(
+            [ApplicationData().create(bytearray(b'first')),
+             ApplicationData().create(bytearray(b'second')),
+             ApplicationData().create(bytearray(b'third'))],
+            cipherSuite)
+        # modify the last byte of tag of the second record (third one is
+        # 34 bytes long)
+        data[-35] ^= 0xff
+        sock = MockSocket(data)
+
+        recordLayer = RecordLayer(sock)
+        recordLayer.version = (3, 3)
+        recordLayer.client = False
+        recordLayer.readAhead = 4096
+        recordLayer.calcPendingStates(cipherSuite,
+                                      bytearray(48), # master secret
+                                      bytearray(32), # client random
+                                      bytearray(32), # server random
+                                      None)
+        recordLayer.changeReadState()
+
+        for result in recordLayer.recvRecord():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else:
+                break
+
+        head, parser = result
+        self.assertEqual(bytearray(b'first'), parser.bytes)
+
+        with self.assertRaises(TLSBadRecordMAC):
+            for result in recordLayer.recvRecord():
+                if result in (0, 1):
+                    self.assertTrue(False, "blocking socket")
+                else:
+                    break
+
     def test_recvRecord_with_AES128GCM_too_short_data(self):
         sock = MockSocket(bytearray(
             b'\x17' +
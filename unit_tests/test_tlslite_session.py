@@ -5,7 +5,28 @@ try:
 except ImportError:
     import unittest
 
+import gc
+import pickle
+
 from tlslite.session import Session
+from tlslite.x509 import X509
+from tlslite.x509certchain import X509CertChain
+
+srv_raw_certificate = str(
+    "-----BEGIN CERTIFICATE-----\n"\
+    "MIIB9jCCAV+gAwIBAgIJAMyn9DpsTG55MA0GCSqGSIb3DQEBCwUAMBQxEjAQBgNV\n"\
+    "BAMMCWxvY2FsaG9zdDAeFw0xNTAxMjExNDQzMDFaFw0xNTAyMjAxNDQzMDFaMBQx\n"\
+    "EjAQBgNVBAMMCWxvY2FsaG9zdDCBnzANBgkqhkiG9w0BAQEFAAOBjQAwgYkCgYEA\n"\
+    "0QkEeakSyV/LMtTeARdRtX5pdbzVuUuqOIdz3lg7YOyRJ/oyLTPzWXpKxr//t4FP\n"\
+    "QvYsSJiVOlPk895FNu6sNF/uJQyQGfFWYKkE6fzFifQ6s9kssskFlL1DVI/dD/Zn\n"\
+    "7sgzua2P1SyLJHQTTs1MtMb170/fX2EBPkDz+2kYKN0CAwEAAaNQME4wHQYDVR0O\n"\
+    "BBYEFJtvXbRmxRFXYVMOPH/29pXCpGmLMB8GA1UdIwQYMBaAFJtvXbRmxRFXYVMO\n"\
+    "PH/29pXCpGmLMAwGA1UdEwQFMAMBAf8wDQYJKoZIhvcNAQELBQADgYEAkOgC7LP/\n"\
+    "Rd6uJXY28HlD2K+/hMh1C3SRT855ggiCMiwstTHACGgNM+AZNqt6k8nSfXc6k1gw\n"\
+    "5a7SGjzkWzMaZC3ChBeCzt/vIAGlMyXeqTRhjTCdc/ygRv3NPrhUKKsxUYyXRk5v\n"\
+    "g/g6MwxzXfQP3IyFu3a9Jia/P89Z1rQCNRY=\n"\
+    "-----END CERTIFICATE-----\n"\
+    )
 
 class TestSession(unittest.TestCase):
 
@@ -52,3 +73,157 @@ class TestSession(unittest.TestCase):
         self.assertEqual(session.encryptThenMAC, 10)
         self.assertEqual(session.extendedMasterSecret, 11)
 
+    def test_valid_with_ticket(self):
+        session = Session()
+        session.create(bytearray(48), bytearray(0), 3, None, None, None,
+                       None, False, None)
+        self.assertFalse(session.valid())
+
+        session.ticket = bytearray(b'\x01')
+
+        self.assertTrue(session.valid())
+
+    def test_serialize(self):
+        session = Session()
+        session.create(bytearray(b'\x01' * 48), bytearray(b'\x02' * 32),
+                       0x002f, "user", None, None, None, True, "example.com",
+                       encryptThenMAC=True, extendedMasterSecret=False)
+        session.ticket = bytearray(b'\x03' * 100)
+        session.ticketLifetimeHint = 7200
+
+        ret = Session.deserialize(session.serialize())
+
+        self.assertEqual(ret.masterSecret, session.masterSecret)
+        self.assertEqual(ret.sessionID, bytearray(b'\x02' * 32))
+        self.assertEqual(ret.cipherSuite, 0x002f)
+        self.assertEqual(ret.srpUsername, "user")
+        self.assertEqual(ret.serverName, "example.com")
+        self.assertTrue(ret.tackInHelloExt)
+        self.assertTrue(ret.encryptThenMAC)
+        self.assertFalse(ret.extendedMasterSecret)
+        self.assertTrue(ret.resumable)
+        self.assertEqual(ret.ticket, bytearray(b'\x03' * 100))
+        self.assertEqual(ret.ticketLifetimeHint, 7200)
+        self.assertIsNone(ret.clientCertChain)
+        self.assertIsNone(ret.serverCertChain)
+        self.assertTrue(ret.valid())
+
+    def test_serialize_with_defaults(self):
+        ret = Session.deserialize(Session().serialize())
+
+        self.assertEqual(ret.masterSecret, bytearray(0))
+        self.assertEqual(ret.sessionID, bytearray(0))
+        self.assertEqual(ret.srpUsername, "")
+        self.assertEqual(ret.serverName, "")
+        self.assertIsNone(ret.ticket)
+        self.assertFalse(ret.resumable)
+
+    def test_serialize_with_absent_names(self):
+        session = Session()
+        session.create(bytearray(48), bytearray(32), 0x002f, None, None,
+                       None, None, False, None)
+
+        ret = Session.deserialize(session.serialize())
+
+        self.assertIsNone(ret.srpUsername)
+        self.assertIsNone(ret.serverName)
+
+        session.serverName = ""
+
+        ret = Session.deserialize(session.serialize())
+
+        self.assertIsNone(ret.srpUsername)
+        self.assertEqual(ret.serverName, "")
+
+    def test_serialize_with_cert_chains(self):
+        serverChain = X509CertChain([X509().parse(srv_raw_certificate)])
+        clientChain = X509CertChain([X509().parse(srv_raw_certificate)])
+        session = Session()
+        session.create(bytearray(48), bytearray(32), 0x002f, None,
+                       clientChain, serverChain, None, False, None)
+
+        ret = Session.deserialize(session.serialize())
+
+        self.assertIs(ret.serverCertChain, serverChain)
+        self.assertIsNot(ret.clientCertChain, clientChain)
+        self.assertEqual(ret.clientCertChain.x509List[0].bytes,
+                         clientChain.x509List[0].bytes)
+
+    def test_deserialize_with_unknown_server_cert_chain(self):
+        session = Session()
+        session.serverCertChain = X509CertChain(
+            [X509().parse(srv_raw_certificate)])
+        data = session.serialize()
+        del session
+        gc.collect()
+
+        ret = Session.deserialize(data)
+
+        self.assertIsNone(ret.serverCertChain)
+
+        serverChain = X509CertChain([X509().parse(srv_raw_certificate)])
+        ret = Session.deserialize(data, [serverChain])
+
+        self.assertIs(ret.serverCertChain, serverChain)
+
+    def test_serverCertChain_shared_between_sessions(self):
+        first = Session()
+        first.serverCertChain = X509CertChain(
+            [X509().parse(srv_raw_certificate)])
+        second = Session()
+        second.serverCertChain = X509CertChain(
+            [X509().parse(srv_raw_certificate)])
+
+        self.assertIs(first.serverCertChain, second.serverCertChain)
+
+    def test_deserialize_with_truncated_data(self):
+        data = Session().serialize()
+
+        with self.assertRaises(ValueError):
+            Session.deserialize(data[:-1])
+
+    def test_deserialize_with_trailing_data(self):
+        data = Session().serialize()
+
+        with self.assertRaises(ValueError):
+            Session.deserialize(data + bytearray(1))
+
+    def test_deserialize_with_unknown_version(self):
+        data = Session().serialize()
+        data[0] = 2
+
+        with self.assertRaises(ValueError):
+            Session.deserialize(data)
+
+    def test_slots(self):
+        session = Session()
+
+        with self.assertRaises(AttributeError):
+            session.unknownAttribute = 1
+
+    def test__clone(self):
+        session = Session()
+        session.create(bytearray(48), bytearray(32), 0x002f, None, None,
+                       None, None, False, None, extendedMasterSecret=True)
+        session.ticket = bytearray(b'\x01')
+
+        other = session._clone()
+
+        self.assertIsNot(other, session)
+        for name in Session.__slots__:
+            self.assertEqual(getattr(other, name), getattr(session, name))
+
+    def test_pickle(self):
+        session = Session()
+        session.create(bytearray(b'\x01' * 48), bytearray(b'\x02' * 32),
+                       0x002f, None, None, None, None, False,
+                       "example.com", encryptThenMAC=True)
+        session.ticket = bytearray(b'\x03' * 10)
+
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            other = pickle.loads(pickle.dumps(session, protocol))
+
+            self.assertIsNot(other, session)
+            for name in Session.__slots__:
+                self.assertEqual(getattr(other, name),
+                                 getattr(session, name))
@@ -5,7 +5,15 @@ try:
 except ImportError:
     import unittest
 
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import threading
+
 from tlslite.sessioncache import SessionCache
+from tlslite.session import Session
 
 class TestGetAttributeAfterPurge(unittest.TestCase):
     """
@@ -40,6 +48,194 @@ class TestFillLinkedList(unittest.TestCase):
             key = bytearray(b'prefill-') + bytearray(str(i), "ascii")
             self.session_cache[key] = "forty-two"
 
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.time = 1000.0
+        patcher = mock.patch('tlslite.sessioncache.time.time',
+                             lambda: self.time)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def new_session(sessionID):
+        session = Session()
+        session.sessionID = sessionID
+        session.resumable = True
+        return session
+
+    def test_get(self):
+        cache = SessionCache()
+        session = self.new_session(bytearray(b'abc'))
+        cache[bytearray(b'abc')] = session
+
+        self.assertIs(cache[bytearray(b'abc')], session)
+        self.assertIs(cache[b'abc'], session)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 0)
+
+    def test_get_missing(self):
+        cache = SessionCache()
+
+        with self.assertRaises(KeyError):
+            cache[bytearray(b'abc')]
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 1)
+
+    def test_get_invalid_session(self):
+        cache = SessionCache()
+        session = self.new_session(bytearray(b'abc'))
+        cache[bytearray(b'abc')] = session
+        session.resumable = False
+
+        with self.assertRaises(KeyError):
+            cache[bytearray(b'abc')]
+        self.assertEqual(cache.misses, 1)
+
+    def test_expiry(self):
+        cache = SessionCache(maxAge=10)
+        cache[b'abc'] = self.new_session(bytearray(b'abc'))
+
+        self.time += 10
+        self.assertIsNotNone(cache[b'abc'])
+        self.time += 0.5
+        with self.assertRaises(KeyError):
+            cache[b'abc']
+
+    def test_put_with_maxAge(self):
+        cache = SessionCache(maxAge=10)
+        cache.put(b'abc', self.new_session(bytearray(b'abc')), maxAge=100)
+        cache.put(b'def', self.new_session(bytearray(b'def')))
+
+        self.time += 50
+
+        self.assertIsNotNone(cache[b'abc'])
+        with self.assertRaises(KeyError):
+            cache[b'def']
+
+    def test_least_recently_used_eviction(self):
+        cache = SessionCache(maxEntries=3, shards=1)
+        for i in range(3):
+            key = bytearray([i])
+            cache[key] = self.new_session(key)
+        cache[bytearray([0])]
+
+        cache[bytearray([3])] = self.new_session(bytearray([3]))
+
+        self.assertEqual(cache.evictions, 1)
+        with self.assertRaises(KeyError):
+            cache[bytearray([1])]
+        for i in (0, 2, 3):
+            self.assertEqual(cache[bytearray([i])].sessionID,
+                             bytearray([i]))
+
+    def test_repeated_hits_keep_order_bounded(self):
+        cache = SessionCache(maxEntries=3, shards=1)
+        for i in range(3):
+            key = bytearray([i])
+            cache[key] = self.new_session(key)
+
+        for _ in range(1000):
+            cache[bytearray([0])]
+        cache[bytearray([3])] = self.new_session(bytearray([3]))
+
+        self.assertLess(len(cache._shards[0]._order), 30)
+        with self.assertRaises(KeyError):
+            cache[bytearray([1])]
+        self.assertIsNotNone(cache[bytearray([0])])
+
+    def test_expired_entries_purged_on_insert(self):
+        cache = SessionCache(maxEntries=3, maxAge=10, shards=1)
+        cache[b'a'] = self.new_session(bytearray(b'a'))
+        cache[b'b'] = self.new_session(bytearray(b'b'))
+        cache[b'c'] = self.new_session(bytearray(b'c'))
+
+        self.time += 20
+        cache[b'd'] = self.new_session(bytearray(b'd'))
+
+        # expired entries are deleted, not evicted
+        self.assertEqual(cache.evictions, 0)
+        self.assertEqual(len(cache._shards[0].entries), 2)
+
+    def test_replace_session(self):
+        cache = SessionCache(maxEntries=2, shards=1)
+        cache[b'a'] = self.new_session(bytearray(b'a'))
+        session = self.new_session(bytearray(b'a'))
+        cache[b'a'] = session
+
+        self.assertIs(cache[b'a'], session)
+        self.assertEqual(cache.evictions, 0)
+
+    def test_shard_sizes(self):
+        cache = SessionCache(maxEntries=10, shards=4)
+
+        self.assertEqual([i.maxEntries for i in cache._shards], [3, 3, 2, 2])
+
+    def test_more_shards_than_entries(self):
+        cache = SessionCache(maxEntries=2, shards=16)
+
+        self.assertEqual([i.maxEntries for i in cache._shards], [1, 1])
+
+    def test_get_method(self):
+        cache = SessionCache()
+        session = self.new_session(bytearray(b'abc'))
+        cache[b'abc'] = session
+
+        self.assertIs(cache.get(bytearray(b'abc')), session)
+        self.assertIsNone(cache.get(b'def'))
+
+    def test_delete(self):
+        cache = SessionCache()
+        cache[b'abc'] = self.new_session(bytearray(b'abc'))
+
+        cache.delete(bytearray(b'abc'))
+        cache.delete(b'def')
+
+        self.assertIsNone(cache.get(b'abc'))
+
+    def test_touch(self):
+        cache = SessionCache(maxAge=10)
+        cache[b'abc'] = self.new_session(bytearray(b'abc'))
+
+        self.time += 8
+        self.assertTrue(cache.touch(b'abc'))
+        self.time += 8
+
+        self.assertIsNotNone(cache.get(b'abc'))
+        self.assertFalse(cache.touch(b'def'))
+
+    def test_touch_expired(self):
+        cache = SessionCache(maxAge=10)
+        cache[b'abc'] = self.new_session(bytearray(b'abc'))
+
+        self.time += 11
+
+        self.assertFalse(cache.touch(b'abc', maxAge=100))
+        self.assertIsNone(cache.get(b'abc'))
+
+    def test_empty_cache_is_true(self):
+        # the server checks "if sessionCache" to decide if sessions are
+        # cached at all
+        self.assertTrue(SessionCache())
+
+    def test_concurrent_access(self):
+        cache = SessionCache()
+
+        def worker(name):
+            for i in range(200):
+                key = bytearray([name, i])
+                cache[key] = self.new_session(key)
+                self.assertIsNotNone(cache[key])
+
+        threads = [threading.Thread(target=worker, args=(i,))
+                   for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(cache.hits, 800)
+        self.assertEqual(sum(len(i.entries) for i in cache._shards), 800)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,71 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from tlslite.sessionstore import SessionStore
+
+
+class DictSessionStore(SessionStore):
+    def __init__(self):
+        self.sessions = {}
+        self.puts = []
+
+    def get(self, sessionID):
+        return self.sessions.get(bytes(sessionID))
+
+    def put(self, sessionID, session, maxAge=None):
+        self.puts.append((bytes(sessionID), maxAge))
+        self.sessions[bytes(sessionID)] = session
+
+    def delete(self, sessionID):
+        self.sessions.pop(bytes(sessionID), None)
+
+
+class TestSessionStore(unittest.TestCase):
+    def test_abstract_methods(self):
+        store = SessionStore()
+
+        with self.assertRaises(NotImplementedError):
+            store.get(b'abc')
+        with self.assertRaises(NotImplementedError):
+            store.put(b'abc', None)
+        with self.assertRaises(NotImplementedError):
+            store.delete(b'abc')
+        with self.assertRaises(NotImplementedError):
+            store.touch(b'abc')
+
+    def test_flush(self):
+        self.assertIsNone(SessionStore().flush())
+
+    def test_item_access(self):
+        store = DictSessionStore()
+
+        store[bytearray(b'abc')] = "session"
+
+        self.assertEqual(store[b'abc'], "session")
+        self.assertEqual(store.puts, [(b'abc', None)])
+        del store[b'abc']
+        with self.assertRaises(KeyError):
+            store[b'abc']
+
+    def test_putMany(self):
+        store = DictSessionStore()
+
+        store.putMany([(b'abc', "first"), (b'def', "second")], maxAge=10)
+
+        self.assertEqual(store.puts, [(b'abc', 10), (b'def', 10)])
+        self.assertEqual(store.get(b'def'), "second")
+
+    def test_empty_store_is_true(self):
+        # the server checks "if sessionCache" to decide if sessions are
+        # cached at all
+        self.assertTrue(DictSessionStore())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import os
+import signal
+import time
+
+from tlslite.sharedsessioncache import SharedSessionCache, _SEQUENCE
+from tlslite.session import Session
+
+
+def new_session(sessionID, serverName="example.com"):
+    session = Session()
+    session.create(bytearray(range(48)), sessionID, 0x002f, "user",
+                   None, None, None, False, serverName,
+                   encryptThenMAC=True)
+    return session
+
+
+class TestSharedSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.time = 1000.0
+        patcher = mock.patch('tlslite.sharedsessioncache.time.time',
+                             lambda: self.time)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = SharedSessionCache(maxEntries=8, maxAge=10,
+                                        bucketSize=2)
+
+    def test_get(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache[session.sessionID] = session
+
+        ret = self.cache[bytearray(b'\x01' * 32)]
+
+        self.assertIsNot(ret, session)
+        self.assertEqual(ret.sessionID, session.sessionID)
+        self.assertEqual(ret.masterSecret, session.masterSecret)
+        self.assertEqual(ret.cipherSuite, 0x002f)
+        self.assertEqual(ret.srpUsername, "user")
+        self.assertEqual(ret.serverName, "example.com")
+        self.assertTrue(ret.encryptThenMAC)
+        self.assertFalse(ret.extendedMasterSecret)
+        self.assertFalse(ret.tackInHelloExt)
+        self.assertIsNone(ret.serverCertChain)
+        self.assertTrue(ret.valid())
+
+    def test_get_missing(self):
+        with self.assertRaises(KeyError):
+            self.cache[bytearray(b'\x01' * 32)]
+
+    def test_get_expired(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache[session.sessionID] = session
+
+        self.time += 11
+
+        with self.assertRaises(KeyError):
+            self.cache[session.sessionID]
+
+    def test_replace(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache[session.sessionID] = session
+        session = new_session(bytearray(b'\x01' * 32), "example.org")
+        self.cache[session.sessionID] = session
+
+        self.assertEqual(self.cache[session.sessionID].serverName,
+                         "example.org")
+
+    def test_full_bucket(self):
+        cache = SharedSessionCache(maxEntries=2, maxAge=10, bucketSize=2)
+        sessions = [new_session(bytearray([i]) * 32) for i in range(3)]
+        for session in sessions:
+            cache[session.sessionID] = session
+            self.time += 1
+
+        # the session expiring first was replaced
+        with self.assertRaises(KeyError):
+            cache[sessions[0].sessionID]
+        self.assertIsNotNone(cache[sessions[1].sessionID])
+        self.assertIsNotNone(cache[sessions[2].sessionID])
+
+    def test_expired_slot_is_reused(self):
+        cache = SharedSessionCache(maxEntries=2, maxAge=10, bucketSize=2)
+        sessions = [new_session(bytearray([i]) * 32) for i in range(3)]
+        cache[sessions[0].sessionID] = sessions[0]
+        self.time += 5
+        cache[sessions[1].sessionID] = sessions[1]
+        self.time += 6
+        cache[sessions[2].sessionID] = sessions[2]
+
+        self.assertIsNotNone(cache[sessions[1].sessionID])
+        self.assertIsNotNone(cache[sessions[2].sessionID])
+
+    def test_session_too_big(self):
+        session = new_session(bytearray(b'\x01' * 32), "a" * 250)
+        self.cache[session.sessionID] = session
+
+        with self.assertRaises(KeyError):
+            self.cache[session.sessionID]
+
+    def test_slot_being_modified(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache[session.sessionID] = session
+        bucket = self.cache._bucket(bytes(session.sessionID))
+        for slot in range(2):
+            offset = (bucket * 2 + slot) * self.cache.slotSize
+            _SEQUENCE.pack_into(self.cache._map, offset, 1)
+
+        with self.assertRaises(KeyError):
+            self.cache[session.sessionID]
+
+    def test_get_method(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache[session.sessionID] = session
+
+        self.assertEqual(self.cache.get(session.sessionID).masterSecret,
+                         session.masterSecret)
+        self.assertIsNone(self.cache.get(bytearray(b'\x02' * 32)))
+
+    def test_put_with_maxAge(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache.put(session.sessionID, session, maxAge=100)
+
+        self.time += 50
+
+        self.assertIsNotNone(self.cache.get(session.sessionID))
+
+    def test_delete(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache[session.sessionID] = session
+
+        self.cache.delete(session.sessionID)
+        self.cache.delete(bytearray(b'\x02' * 32))
+
+        self.assertIsNone(self.cache.get(session.sessionID))
+        self.assertIsNone(self.cache._findEntry(
+            self.cache._bucket(bytes(session.sessionID)),
+            bytes(session.sessionID)))
+
+    def test_touch(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache[session.sessionID] = session
+
+        self.time += 8
+        self.assertTrue(self.cache.touch(session.sessionID))
+        self.time += 8
+
+        self.assertEqual(self.cache.get(session.sessionID).serverName,
+                         "example.com")
+        self.assertFalse(self.cache.touch(bytearray(b'\x02' * 32)))
+
+    def test_touch_expired(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.cache[session.sessionID] = session
+
+        self.time += 11
+
+        self.assertFalse(self.cache.touch(session.sessionID, maxAge=100))
+        self.assertIsNone(self.cache.get(session.sessionID))
+
+    def test_slot_size_too_small(self):
+        with self.assertRaises(ValueError):
+            SharedSessionCache(slotSize=64)
+
+    def test_empty_cache_is_true(self):
+        self.assertTrue(self.cache)
+
+    @unittest.skipIf(not hasattr(os, "fork"), "requires os.fork()")
+    def test_shared_with_child_process(self):
+        session = new_session(bytearray(b'\x02' * 32))
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                self.cache[session.sessionID] = session
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+
+        self.assertEqual(self.cache[session.sessionID].masterSecret,
+                         session.masterSecret)
+
+    @unittest.skipIf(not hasattr(os, "fork"), "requires os.fork()")
+    def test_child_process_with_lock_held_at_fork(self):
+        session = new_session(bytearray(b'\x02' * 32))
+        lock = self.cache._threadLock(
+            self.cache._bucket(bytes(session.sessionID)))
+
+        with lock:
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    self.cache[session.sessionID] = session
+                finally:
+                    os._exit(0)
+        for _ in range(1000):
+            if os.waitpid(pid, os.WNOHANG)[0]:
+                break
+            time.sleep(0.01)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.fail("child process deadlocked")
+
+        self.assertEqual(self.cache[session.sessionID].masterSecret,
+                         session.masterSecret)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,264 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from tlslite.sqlitesessionstore import SqliteSessionStore
+from tlslite.session import Session
+
+
+def new_session(sessionID, serverName="example.com"):
+    session = Session()
+    session.create(bytearray(range(48)), sessionID, 0x002f, "user",
+                   None, None, None, False, serverName,
+                   encryptThenMAC=True)
+    return session
+
+
+class TestSqliteSessionStore(unittest.TestCase):
+    def setUp(self):
+        self.time = 1000.0
+        patcher = mock.patch('tlslite.sqlitesessionstore.time.time',
+                             lambda: self.time)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = self.new_store(":memory:")
+
+    def new_store(self, path, **kwargs):
+        store = SqliteSessionStore(path, maxAge=10, **kwargs)
+        self.addCleanup(store._db.close)
+        return store
+
+    def stored_ids(self, store):
+        return sorted(bytes(row[0]) for row in
+                      store._db.execute("SELECT id FROM sessions"))
+
+    def test___init___with_zero_batchSize(self):
+        with self.assertRaises(ValueError):
+            SqliteSessionStore(":memory:", batchSize=0)
+
+    def test___init___without_sqlite3(self):
+        with mock.patch('tlslite.sqlitesessionstore.sqlite3', None):
+            with self.assertRaises(ValueError):
+                SqliteSessionStore(":memory:")
+
+    def test_get(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+
+        ret = self.store[bytearray(b'\x01' * 32)]
+
+        self.assertIsNot(ret, session)
+        self.assertEqual(ret.sessionID, session.sessionID)
+        self.assertEqual(ret.masterSecret, session.masterSecret)
+        self.assertEqual(ret.cipherSuite, 0x002f)
+        self.assertEqual(ret.serverName, "example.com")
+        self.assertTrue(ret.encryptThenMAC)
+        self.assertTrue(ret.valid())
+
+    def test_get_missing(self):
+        self.assertIsNone(self.store.get(b'\x01' * 32))
+        with self.assertRaises(KeyError):
+            self.store[b'\x01' * 32]
+
+    def test_get_after_flush(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+
+        self.store.flush()
+
+        self.assertEqual(self.stored_ids(self.store), [b'\x01' * 32])
+        self.assertEqual(self.store.get(session.sessionID).masterSecret,
+                         session.masterSecret)
+
+    def test_get_expired(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+        self.store.flush()
+
+        self.time += 11
+
+        self.assertIsNone(self.store.get(session.sessionID))
+
+    def test_get_not_resumable(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        session.resumable = False
+        self.store[session.sessionID] = session
+
+        self.assertIsNone(self.store.get(session.sessionID))
+
+    def test_get_malformed(self):
+        self.store._db.execute("INSERT INTO sessions VALUES (?, ?, ?)",
+                               (sqlite3.Binary(b'\x01' * 32), 2000.0,
+                                sqlite3.Binary(b'\xff')))
+
+        self.assertIsNone(self.store.get(b'\x01' * 32))
+
+    def test_put_with_maxAge(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store.put(session.sessionID, session, maxAge=100)
+        self.store.flush()
+
+        self.time += 50
+
+        self.assertIsNotNone(self.store.get(session.sessionID))
+
+    def test_writes_are_batched(self):
+        store = self.new_store(":memory:", batchSize=3, flushInterval=60)
+
+        store.putMany([(bytearray([i]) * 32, new_session(bytearray([i]) * 32))
+                       for i in range(2)])
+        self.assertEqual(self.stored_ids(store), [])
+        self.assertIsNotNone(store.get(b'\x01' * 32))
+
+        store.put(b'\x02' * 32, new_session(bytearray(b'\x02' * 32)))
+        self.assertEqual(self.stored_ids(store),
+                         [bytes(bytearray([i]) * 32) for i in range(3)])
+
+    def test_writes_are_saved_after_flushInterval(self):
+        store = self.new_store(":memory:", flushInterval=1.0)
+        store.put(b'\x01' * 32, new_session(bytearray(b'\x01' * 32)))
+
+        self.time += 0.5
+        store.get(b'\x01' * 32)
+        self.assertEqual(self.stored_ids(store), [])
+
+        self.time += 0.5
+        store.get(b'\x01' * 32)
+        self.assertEqual(self.stored_ids(store), [b'\x01' * 32])
+
+    def test_expired_sessions_are_removed_on_flush(self):
+        self.store.put(b'\x01' * 32, new_session(bytearray(b'\x01' * 32)))
+        self.store.flush()
+
+        self.time += 11
+        self.store.put(b'\x02' * 32, new_session(bytearray(b'\x02' * 32)))
+        self.store.flush()
+
+        self.assertEqual(self.stored_ids(self.store), [b'\x02' * 32])
+
+    def test_failed_flush_keeps_pending_writes(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+        db = self.store._db
+        self.store._db = mock.MagicMock()
+        self.store._db.executemany.side_effect = \
+            sqlite3.OperationalError("database is locked")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            self.store.flush()
+
+        self.store._db = db
+        self.assertIsNotNone(self.store.get(session.sessionID))
+        self.store.flush()
+        self.assertEqual(self.stored_ids(self.store), [b'\x01' * 32])
+
+    def test_delete(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+        self.store.flush()
+
+        del self.store[session.sessionID]
+
+        self.assertIsNone(self.store.get(session.sessionID))
+        self.store.flush()
+        self.assertEqual(self.stored_ids(self.store), [])
+
+    def test_delete_pending(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+
+        self.store.delete(session.sessionID)
+        self.store.flush()
+
+        self.assertIsNone(self.store.get(session.sessionID))
+        self.assertEqual(self.stored_ids(self.store), [])
+
+    def test_touch(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+        self.store.flush()
+
+        self.time += 8
+        self.assertTrue(self.store.touch(session.sessionID))
+        self.time += 8
+
+        self.assertIsNotNone(self.store.get(session.sessionID))
+        self.assertFalse(self.store.touch(b'\x02' * 32))
+
+    def test_touch_pending(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+
+        self.time += 8
+        self.assertTrue(self.store.touch(session.sessionID, maxAge=100))
+        self.store.flush()
+        self.time += 50
+
+        self.assertIsNotNone(self.store.get(session.sessionID))
+
+    def test_touch_expired(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+        self.store.flush()
+
+        self.time += 11
+
+        self.assertFalse(self.store.touch(session.sessionID))
+
+    def test_touch_deleted(self):
+        session = new_session(bytearray(b'\x01' * 32))
+        self.store[session.sessionID] = session
+        self.store.flush()
+        self.store.delete(session.sessionID)
+
+        self.assertFalse(self.store.touch(session.sessionID))
+
+    def test_empty_store_is_true(self):
+        self.assertTrue(self.store)
+
+    def test_sessions_persist_after_close(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "sessions.db")
+        session = new_session(bytearray(b'\x01' * 32))
+        store = SqliteSessionStore(path, flushInterval=60)
+        store[session.sessionID] = session
+        store.close()
+
+        store = self.new_store(path)
+
+        ret = store.get(session.sessionID)
+        self.assertEqual(ret.masterSecret, session.masterSecret)
+        self.assertEqual(ret.serverName, "example.com")
+
+    def test_shared_between_instances(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "sessions.db")
+        session = new_session(bytearray(b'\x01' * 32))
+        first = self.new_store(path, batchSize=1)
+        second = self.new_store(path)
+
+        first[session.sessionID] = session
+
+        self.assertEqual(second.get(session.sessionID).masterSecret,
+                         session.masterSecret)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from tlslite.ticketkeymanager import TicketKeyManager
+
+class TestTicketKeyManager(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch('tlslite.ticketkeymanager.time.time',
+                             return_value=36000)
+        self.time = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.keys = TicketKeyManager(secret=bytearray(32),
+                                     rotationInterval=3600,
+                                     ticketLifetime=7200)
+
+    def test___init__(self):
+        keys = TicketKeyManager()
+
+        self.assertEqual(keys.rotationInterval, 3600)
+        self.assertEqual(keys.ticketLifetime, 14400)
+
+    def test___init___with_short_secret(self):
+        with self.assertRaises(ValueError):
+            TicketKeyManager(secret=bytearray(15))
+
+    def test___init___with_wrong_key_size(self):
+        with self.assertRaises(ValueError):
+            TicketKeyManager(keySize=24)
+
+    def test___init___with_zero_rotation_interval(self):
+        with self.assertRaises(ValueError):
+            TicketKeyManager(rotationInterval=0)
+
+    def test_encrypt_and_decrypt(self):
+        ticket = self.keys.encrypt(b'state')
+
+        self.assertIsInstance(ticket, bytearray)
+        self.assertNotIn(b'state', bytes(ticket))
+        self.assertEqual(self.keys.decrypt(ticket), (b'state', False))
+
+    def test_encrypt_with_random_nonce(self):
+        self.assertNotEqual(self.keys.encrypt(b'state'),
+                            self.keys.encrypt(b'state'))
+
+    def test_encrypt_with_32_byte_keys(self):
+        keys = TicketKeyManager(keySize=32)
+
+        self.assertEqual(keys.decrypt(keys.encrypt(b'state')),
+                         (b'state', False))
+
+    def test_decrypt_with_same_secret(self):
+        other = TicketKeyManager(secret=bytearray(32),
+                                 rotationInterval=3600,
+                                 ticketLifetime=7200)
+
+        self.assertEqual(other.decrypt(self.keys.encrypt(b'state')),
+                         (b'state', False))
+
+    def test_decrypt_with_different_secret(self):
+        other = TicketKeyManager(secret=bytearray(b'\x01' * 32))
+
+        self.assertIsNone(other.decrypt(self.keys.encrypt(b'state')))
+
+    def test_decrypt_modified_ticket(self):
+        ticket = self.keys.encrypt(b'state')
+        ticket[-1] ^= 1
+
+        self.assertIsNone(self.keys.decrypt(ticket))
+
+    def test_decrypt_short_ticket(self):
+        self.assertIsNone(self.keys.decrypt(bytearray(43)))
+
+    def test_decrypt_after_rotation(self):
+        ticket = self.keys.encrypt(b'state')
+        self.time.return_value = 36000 + 3600
+
+        self.assertEqual(self.keys.decrypt(ticket), (b'state', True))
+        self.assertNotEqual(self.keys.encrypt(b'state')[:16], ticket[:16])
+
+    def test_decrypt_expired_ticket(self):
+        self.time.return_value = 36000 + 3599
+        ticket = self.keys.encrypt(b'state')
+
+        self.time.return_value = 36000 + 3599 + 7199
+        self.assertEqual(self.keys.decrypt(ticket), (b'state', True))
+
+        self.time.return_value = 36000 + 3599 + 7200
+        self.assertIsNone(self.keys.decrypt(ticket))
+
+    def test_old_keys_are_dropped(self):
+        ticket = self.keys.encrypt(b'state')
+        self.time.return_value = 36000 + 10 * 3600
+        self.keys.encrypt(b'state')
+
+        # keys of the two previous, current and next interval
+        self.assertEqual(len(self.keys._keys), 4)
+        self.assertIsNone(self.keys.decrypt(ticket))
+
+    def test_decrypt_ticket_from_server_with_clock_ahead(self):
+        other = TicketKeyManager(secret=bytearray(32), rotationInterval=3600,
+                                 ticketLifetime=7200)
+        self.time.return_value = 36000 + 3600
+        ticket = other.encrypt(b'state')
+
+        self.time.return_value = 36000 + 3590
+        self.assertEqual(self.keys.decrypt(ticket), (b'state', False))
+
+    def test_decrypt_ticket_from_server_with_clock_far_ahead(self):
+        other = TicketKeyManager(secret=bytearray(32), rotationInterval=3600,
+                                 ticketLifetime=7200)
+        self.time.return_value = 36000 + 2 * 3600
+        ticket = other.encrypt(b'state')
+
+        self.time.return_value = 36000
+        self.assertIsNone(self.keys.decrypt(ticket))
+
+if __name__ == '__main__':
+    unittest.main()
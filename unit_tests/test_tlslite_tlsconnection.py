@@ -9,16 +9,28 @@ try:
 except ImportError:
     import unittest
 
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
 from tlslite.recordlayer import RecordLayer
 from tlslite.messages import ServerHello, ClientHello, Alert, RecordHeader3
 from tlslite.constants import CipherSuite, AlertDescription, ContentType
 from tlslite.tlsconnection import TLSConnection
-from tlslite.errors import TLSLocalAlert, TLSRemoteAlert
+from tlslite.errors import TLSLocalAlert, TLSRemoteAlert, \
+        TLSAbruptCloseError
 from tlslite.x509 import X509
 from tlslite.x509certchain import X509CertChain
 from tlslite.utils.keyfactory import parsePEMKey
 from tlslite.handshakesettings import HandshakeSettings
 from tlslite.session import Session
+from tlslite.sessioncache import SessionCache
+from tlslite.sharedsessioncache import SharedSessionCache
+from tlslite.sqlitesessionstore import SqliteSessionStore
+from tlslite.ephemeralkeypool import EphemeralKeyPool
+from tlslite.mathtls import goodGroupParameters
+from tlslite.ticketkeymanager import TicketKeyManager
 
 from unit_tests.mocksock import MockSocket
 
@@ -320,5 +332,298 @@ class TestTLSConnection(unittest.TestCase):
                 bytearray(b'\x1f\xf8\x18\x01:\x9f\x15a\xd5x\xaa;Y>' +
                           b'\xafG\x92AH\xa4'))
 
+    @staticmethod
+    def _run_sans_io(first, firstOp, second, secondOp):
+        """Run operations on two connected sans-I/O connections"""
+        pending = [[first, second, firstOp, None],
+                   [second, first, secondOp, None]]
+        for _ in range(100):
+            for op in pending:
+                conn, peer, gen, _ = op
+                if gen is None:
+                    continue
+                for result in gen:
+                    if result == 0:
+                        break
+                    elif result != 1:
+                        op[3] = result
+                        op[2] = None
+                        break
+                else:
+                    op[2] = None
+                peer.feed(conn.data_to_send())
+            if pending[0][2] is None and pending[1][2] is None:
+                return pending[0][3], pending[1][3]
+        raise AssertionError("Operations did not finish")
+
+    def test_sans_io_connection(self):
+        client = TLSConnection()
+        server = TLSConnection()
+        self.assertTrue(client.sansIO)
+
+        x509 = X509()
+        x509.parse(srv_raw_certificate)
+        certChain = X509CertChain([x509])
+        privateKey = parsePEMKey(srv_raw_key, private=True)
+
+        self._run_sans_io(client, client.handshakeClientCert(async=True),
+                          server, server.handshakeServerAsync(
+                              certChain=certChain, privateKey=privateKey))
+
+        self.assertIsNotNone(client.session)
+        self.assertEqual(client.session.masterSecret,
+                         server.session.masterSecret)
+
+        _, data = self._run_sans_io(
+            client, client.writeAsync(bytearray(b'hello' * 5000)),
+            server, server.readAsync(min=25000))
+
+        self.assertEqual(data, bytearray(b'hello' * 5000))
+
+        self._run_sans_io(client, client.closeAsync(),
+                          server, server.readAsync())
+
+        self.assertTrue(client.closed)
+        self.assertTrue(server.closed)
+
+    def test_anon_handshake_with_key_pool(self):
+        client = TLSConnection()
+        server = TLSConnection()
+        dh_g, dh_p = goodGroupParameters[2]
+        keyPool = EphemeralKeyPool(curves=[], dhGroups=[(dh_g, dh_p)],
+                                   poolSize=1, start=False)
+        keyPool.fill()
+
+        self._run_sans_io(client, client.handshakeClientAnonymous(async=True),
+                          server, server.handshakeServerAsync(
+                              anon=True, keyPool=keyPool))
+
+        self.assertEqual(client.session.masterSecret,
+                         server.session.masterSecret)
+        self.assertIsNone(keyPool.getDHKey(dh_g, dh_p))
+
+    def _anon_handshake(self, session=None, settings=None,
+                        ticketKeyManager=None, sessionCache=None):
+        """Return client and server connections after anonymous handshake"""
+        client = TLSConnection()
+        server = TLSConnection()
+        self._run_sans_io(client, client.handshakeClientAnonymous(
+                              session=session, settings=settings, async=True),
+                          server, server.handshakeServerAsync(
+                              anon=True, sessionCache=sessionCache,
+                              ticketKeyManager=ticketKeyManager))
+        self.assertEqual(client.session.masterSecret,
+                         server.session.masterSecret)
+        return client, server
+
+    def test_handshake_transcript_is_released(self):
+        client, server = self._anon_handshake()
+
+        self.assertIsNone(client._handshake_hash._transcript)
+        self.assertIsNone(server._handshake_hash._transcript)
+        self.assertEqual(len(client._handshake_hash._hashes), 1)
+
+    def test_resumption_with_session_ticket(self):
+        keys = TicketKeyManager()
+
+        client, server = self._anon_handshake(ticketKeyManager=keys)
+
+        session = client.session
+        self.assertFalse(client.resumed)
+        self.assertEqual(session.sessionID, bytearray(0))
+        self.assertTrue(session.ticket)
+        self.assertEqual(session.ticketLifetimeHint, keys.ticketLifetime)
+        self.assertTrue(session.valid())
+
+        client, server = self._anon_handshake(session=session,
+                                              ticketKeyManager=keys)
+
+        self.assertTrue(client.resumed)
+        self.assertTrue(server.resumed)
+        self.assertIs(client.session, session)
+        self.assertEqual(server.session.masterSecret, session.masterSecret)
+        self.assertEqual(len(server.session.sessionID), 32)
+
+    def test_resumption_with_session_ticket_and_extended_master_secret(self):
+        keys = TicketKeyManager()
+        settings = HandshakeSettings()
+        settings.requireExtendedMasterSecret = True
+
+        client, server = self._anon_handshake(settings=settings,
+                                              ticketKeyManager=keys)
+        self.assertTrue(server.session.extendedMasterSecret)
+
+        client, server = self._anon_handshake(session=client.session,
+                                              settings=settings,
+                                              ticketKeyManager=keys)
+
+        self.assertTrue(client.resumed)
+        self.assertTrue(server.session.extendedMasterSecret)
+
+    def test_session_ticket_renewed_after_key_rotation(self):
+        keys = TicketKeyManager(rotationInterval=3600, ticketLifetime=7200)
+
+        with mock.patch('tlslite.ticketkeymanager.time.time',
+                        return_value=36000):
+            client, _ = self._anon_handshake(ticketKeyManager=keys)
+        session = client.session
+
+        with mock.patch('tlslite.ticketkeymanager.time.time',
+                        return_value=36000 + 3600):
+            client, server = self._anon_handshake(session=session,
+                                                  ticketKeyManager=keys)
+
+        self.assertTrue(client.resumed)
+        self.assertIsNot(client.session, session)
+        self.assertTrue(client.session.ticket)
+        self.assertNotEqual(client.session.ticket, session.ticket)
+        self.assertEqual(client.session.masterSecret, session.masterSecret)
+
+    def test_full_handshake_with_unknown_session_ticket(self):
+        client, _ = self._anon_handshake(ticketKeyManager=TicketKeyManager())
+        session = client.session
+
+        keys = TicketKeyManager()
+        client, server = self._anon_handshake(session=session,
+                                              ticketKeyManager=keys)
+
+        self.assertFalse(client.resumed)
+        self.assertFalse(server.resumed)
+        self.assertNotEqual(client.session.masterSecret,
+                            session.masterSecret)
+        self.assertNotEqual(client.session.ticket, session.ticket)
+
+        client, _ = self._anon_handshake(session=client.session,
+                                         ticketKeyManager=keys)
+        self.assertTrue(client.resumed)
+
+    def test_session_ticket_with_session_cache(self):
+        keys = TicketKeyManager()
+        cache = SessionCache()
+
+        client, server = self._anon_handshake(ticketKeyManager=keys,
+                                              sessionCache=cache)
+        session = client.session
+        self.assertTrue(session.ticket)
+        self.assertEqual(len(session.sessionID), 32)
+        self.assertIs(cache[session.sessionID], server.session)
+
+        client, _ = self._anon_handshake(session=session,
+                                         ticketKeyManager=keys,
+                                         sessionCache=SessionCache())
+
+        self.assertTrue(client.resumed)
+
+    def test_no_session_ticket_without_ticket_key_manager(self):
+        client, _ = self._anon_handshake()
+
+        self.assertIsNone(client.session.ticket)
+        self.assertFalse(client.session.valid())
+
+    def test_no_session_ticket_when_disabled_in_client(self):
+        settings = HandshakeSettings()
+        settings.useSessionTickets = False
+
+        client, _ = self._anon_handshake(settings=settings,
+                                         ticketKeyManager=TicketKeyManager())
+
+        self.assertIsNone(client.session.ticket)
+
+    def test_resumption_with_sqlite_session_store(self):
+        store = SqliteSessionStore(":memory:")
+        self.addCleanup(store.close)
+
+        client, server = self._anon_handshake(sessionCache=store)
+        session = client.session
+        self.assertEqual(store[session.sessionID].masterSecret,
+                         server.session.masterSecret)
+
+        client, server = self._anon_handshake(session=session,
+                                              sessionCache=store)
+
+        self.assertTrue(client.resumed)
+        self.assertTrue(server.resumed)
+        self.assertEqual(client.session.masterSecret, session.masterSecret)
+
+    def test_fatal_alert_deletes_session_from_store(self):
+        store = SqliteSessionStore(":memory:")
+        self.addCleanup(store.close)
+        client, server = self._anon_handshake(sessionCache=store)
+        sessionID = server.session.sessionID
+
+        server.feed(bytearray(b'\x17\x03\x03\x00\x20') + bytearray(32))
+        with self.assertRaises(TLSLocalAlert):
+            for result in server.readAsync():
+                pass
+
+        self.assertIsNone(store.get(sessionID))
+        client, _ = self._anon_handshake(session=client.session,
+                                         sessionCache=store)
+        self.assertFalse(client.resumed)
+
+    def test_sans_io_with_abrupt_close(self):
+        conn = TLSConnection()
+
+        handshaker = conn.handshakeClientCert(async=True)
+        self.assertEqual(next(handshaker), 0)
+        self.assertNotEqual(conn.data_to_send(), bytearray(0))
+        self.assertEqual(conn.data_to_send(), bytearray(0))
+
+        conn.feed(b'')
+        with self.assertRaises(TLSAbruptCloseError):
+            next(handshaker)
+
+    def test_feed_with_socket(self):
+        conn = TLSConnection(MockSocket(bytearray(0)))
+
+        self.assertFalse(conn.sansIO)
+        with self.assertRaises(ValueError):
+            conn.feed(b'abc')
+        with self.assertRaises(ValueError):
+            conn.data_to_send()
+
+    def test_blocking_calls_in_sans_io_mode(self):
+        conn = TLSConnection()
+
+        with self.assertRaises(ValueError):
+            conn.handshakeClientCert()
+        with self.assertRaises(ValueError):
+            conn.handshakeClientAnonymous()
+        with self.assertRaises(ValueError):
+            conn.handshakeClientSRP("user", "password")
+        with self.assertRaises(ValueError):
+            conn.handshakeServer(anon=True)
+        self.assertEqual(conn.data_to_send(), bytearray(0))
+
+    def test_read_write_in_sans_io_mode(self):
+        client, server = self._anon_handshake()
+
+        with self.assertRaises(ValueError):
+            client.write(b'hello')
+        with self.assertRaises(ValueError):
+            server.read()
+        with self.assertRaises(ValueError):
+            client.close()
+        self.assertFalse(client.closed)
+        self.assertFalse(server.closed)
+
+    def test_fatal_alert_deletes_session_from_shared_cache(self):
+        cache = SharedSessionCache(maxEntries=8)
+        client = TLSConnection()
+        server = TLSConnection()
+        self._run_sans_io(client, client.handshakeClientAnonymous(async=True),
+                          server, server.handshakeServerAsync(
+                              anon=True, sessionCache=cache))
+        sessionID = server.session.sessionID
+        self.assertIsNotNone(cache[sessionID])
+
+        server.feed(bytearray(b'\x17\x03\x03\x00\x20') + bytearray(32))
+        with self.assertRaises(TLSLocalAlert):
+            for result in server.readAsync():
+                pass
+
+        with self.assertRaises(KeyError):
+            cache[sessionID]
+
 if __name__ == '__main__':
     unittest.main()
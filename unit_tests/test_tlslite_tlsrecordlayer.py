@@ -64,6 +64,60 @@ class TestTLSRecordLayer(unittest.TestCase):
         self.assertEqual(header.version, (3, 3))
         self.assertEqual(header.length, 0)
 
+    def test__getNextRecord_with_recvInto(self):
+        mockSock = MockSocket(bytearray(
+            b'\x16' +           # type - handshake
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x04' +       # length
+            b'\x00'*4
+            ))
+        sock = TLSRecordLayer(mockSock)
+        sock.version = (3,3)
+        self.assertFalse(sock.recvInto)
+        sock.recvInto = True
+
+        # XXX using private method!
+        for result in sock._getNextRecord():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            else: break
+
+        header, data = result
+        data = data.bytes
+
+        self.assertEqual(data, bytearray(4))
+        self.assertEqual(header.type, ContentType.handshake)
+        self.assertEqual(header.version, (3, 3))
+        self.assertEqual(header.length, 0)
+
+    def test__getNextRecord_with_readAhead(self):
+        mockSock = MockSocket(bytearray(
+            b'\x17' +           # type - application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x01' +       # length
+            b'\x01' +
+            b'\x17' +           # type - application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x01' +       # length
+            b'\x02'
+            ))
+        mockSock.recv = mock.Mock(wraps=mockSock.recv)
+        sock = TLSRecordLayer(mockSock)
+        sock.version = (3, 3)
+        self.assertEqual(0, sock.readAhead)
+        sock.readAhead = 1024
+
+        results = []
+        for result in sock._getNextRecord():
+            if result in (0, 1):
+                self.assertTrue(False, "blocking socket")
+            results.append(result[1].bytes)
+            if len(results) == 2:
+                break
+
+        self.assertEqual([bytearray(b'\x01'), bytearray(b'\x02')], results)
+        self.assertEqual(1, mockSock.recv.call_count)
+
     def test__getNextRecord_with_trickling_socket(self):
         mockSock = MockSocket(bytearray(
             b'\x16' +           # type - handshake
@@ -349,6 +403,7 @@ class TestTLSRecordLayer(unittest.TestCase):
     def test__sendMsg_with_errored_out_socket(self):
         mockSock = mock.MagicMock()
         mockSock.send.side_effect = socket.error(errno.ETIMEDOUT)
+        mockSock.sendmsg.side_effect = socket.error(errno.ETIMEDOUT)
 
         sock = TLSRecordLayer(mockSock)
 
@@ -382,6 +437,134 @@ class TestTLSRecordLayer(unittest.TestCase):
         for msg in mock_sock.sent:
             self.assertTrue(len(msg) <= 2**14 + 5)
 
+    def test__sendMsg_with_large_application_data(self):
+        mock_sock = MockSocket(bytearray(0))
+        mock_sock.sendmsg = mock.Mock(wraps=mock_sock.sendmsg)
+
+        record_layer = TLSRecordLayer(mock_sock)
+        record_layer.version = (3, 3)
+
+        msg = Message(ContentType.application_data, bytearray(2**16 + 1))
+
+        for result in record_layer._sendMsg(msg):
+            if result in (0, 1):
+                self.assertTrue(False, "blocking")
+            else:
+                break
+
+        # all 5 records passed to socket in single call
+        mock_sock.sendmsg.assert_called_once()
+        self.assertEqual(len(mock_sock.sent), 1)
+        self.assertEqual(len(mock_sock.sent[0]), 2**16 + 1 + 5 * 5)
+
+    def test__sendMsg_with_application_data_over_write_limit(self):
+        mock_sock = MockSocket(bytearray(0))
+        mock_sock.sendmsg = mock.Mock(wraps=mock_sock.sendmsg)
+
+        record_layer = TLSRecordLayer(mock_sock)
+        record_layer.version = (3, 3)
+        record_layer.recordSize = 16
+        record_layer._maxRecordsPerWrite = 4
+
+        msg = Message(ContentType.application_data, bytearray(16 * 10))
+
+        for result in record_layer._sendMsg(msg):
+            if result in (0, 1):
+                self.assertTrue(False, "blocking")
+            else:
+                break
+
+        self.assertEqual(3, mock_sock.sendmsg.call_count)
+        self.assertEqual(sum(len(i) for i in mock_sock.sent),
+                         16 * 10 + 10 * 5)
+
+    def test_read_with_multiple_records(self):
+        mock_sock = MockSocket(bytearray(
+            b'\x17' +           # application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x03' +       # length
+            b'abc' +
+            b'\x17' +           # application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x04' +       # length
+            b'defg'))
+        record_layer = TLSRecordLayer(mock_sock)
+        record_layer.version = (3, 3)
+        record_layer.closed = False
+
+        self.assertEqual(b'ab', record_layer.read(max=2, min=2))
+        self.assertEqual(b'cde', record_layer.read(max=3, min=3))
+        self.assertEqual(b'fg', record_layer.read())
+
+    def test_read_returns_bytes(self):
+        mock_sock = MockSocket(bytearray(
+            b'\x17' +           # application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x03' +       # length
+            b'abc' +
+            b'\x17' +           # application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x03' +       # length
+            b'def'))
+        record_layer = TLSRecordLayer(mock_sock)
+        record_layer.version = (3, 3)
+        record_layer.closed = False
+
+        ret = record_layer.read(max=3, min=3)
+        self.assertIs(type(ret), bytes)
+        self.assertEqual(b'abc', ret)
+        record_layer.unread(bytearray(b'x'))
+        ret = record_layer.read(max=4, min=4)
+        self.assertIs(type(ret), bytes)
+        self.assertEqual(b'xdef', ret)
+
+    def test_read_with_unread(self):
+        mock_sock = MockSocket(bytearray(
+            b'\x17' +           # application data
+            b'\x03\x03' +       # TLSv1.2
+            b'\x00\x04' +       # length
+            b'abcd'))
+        record_layer = TLSRecordLayer(mock_sock)
+        record_layer.version = (3, 3)
+        record_layer.closed = False
+
+        self.assertEqual(b'a', record_layer.read(max=1))
+        record_layer.unread(b'xy')
+
+        self.assertEqual(b'xybcd', record_layer.read())
+
+    def test_read_with_large_amount_of_records(self):
+        data = bytearray()
+        for i in range(256):
+            data += bytearray(b'\x17\x03\x03\x01\x00') + bytearray([i]) * 256
+        mock_sock = MockSocket(data)
+        record_layer = TLSRecordLayer(mock_sock)
+        record_layer.version = (3, 3)
+        record_layer.closed = False
+
+        ret = record_layer.read(min=2**16, max=2**16)
+
+        self.assertEqual(bytearray().join(bytearray([i]) * 256
+                                          for i in range(256)),
+                         ret)
+
+    def test__sendMsg_with_empty_application_data(self):
+        mock_sock = MockSocket(bytearray(0))
+
+        record_layer = TLSRecordLayer(mock_sock)
+        record_layer.version = (3, 3)
+
+        msg = Message(ContentType.application_data, bytearray(0))
+
+        for result in record_layer._sendMsg(msg):
+            if result in (0, 1):
+                self.assertTrue(False, "blocking")
+            else:
+                break
+
+        self.assertEqual([bytearray(b'\x17\x03\x03\x00\x00')],
+                         mock_sock.sent)
+
     def test_write_with_BEAST_record_splitting(self):
         mock_sock = MockSocket(bytearray(0))
         record_layer = TLSRecordLayer(mock_sock)
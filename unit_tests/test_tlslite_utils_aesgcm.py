@@ -9,8 +9,19 @@ try:
 except ImportError:
         import unittest
 
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import sys
+
 from tlslite.utils.rijndael import rijndael
-from tlslite.utils.aesgcm import AESGCM
+from tlslite.utils.aesgcm import AESGCM, _reduction
+from tlslite.utils import cryptomath
+from tlslite.utils import python_aesgcm
+if cryptomath.m2cryptoLoaded:
+    from tlslite.utils import openssl_aesgcm
 
 class TestAESGCM(unittest.TestCase):
     def test___init__(self):
@@ -40,6 +51,24 @@ class TestAESGCM(unittest.TestCase):
             b'\'\x81h\x17\xe6Z)\\\xf2\x8emF\xcb\x91\x0eu'
             b'z1:\xf6}\xa7\\@\xba\x11\xd8r\xdf#K\xd4'), encData)
 
+    def test_sealToBuffer(self):
+        key = bytearray(b'\x01'*16)
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
+
+        nonce = bytearray(b'\x02'*12)
+
+        plaintext = bytearray(b'text to encrypt.')
+        out = bytearray(b'\xff' * 40)
+
+        written = aesGCM.sealToBuffer(nonce, plaintext, bytearray(0), out, 3)
+
+        self.assertEqual(written, 32)
+        self.assertEqual(bytearray(
+            b'\xff\xff\xff'
+            b'\'\x81h\x17\xe6Z)\\\xf2\x8emF\xcb\x91\x0eu'
+            b'z1:\xf6}\xa7\\@\xba\x11\xd8r\xdf#K\xd4'
+            b'\xff\xff\xff\xff\xff'), out)
+
     def test_seal_with_invalid_nonce(self):
         key = bytearray(b'\x01'*16)
         aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
@@ -66,6 +95,39 @@ class TestAESGCM(unittest.TestCase):
 
         self.assertEqual(plaintext, bytearray(b'text to encrypt.'))
 
+    @unittest.skipIf(sys.version_info < (2, 7), "requires memoryview")
+    def test_open_with_memoryview(self):
+        key = bytearray(b'\x01'*16)
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
+
+        nonce = bytearray(b'\x02'*12)
+
+        record = bytearray(
+            b'\x00\x00'
+            b'\'\x81h\x17\xe6Z)\\\xf2\x8emF\xcb\x91\x0eu'
+            b'z1:\xf6}\xa7\\@\xba\x11\xd8r\xdf#K\xd4')
+
+        plaintext = aesGCM.open(nonce, memoryview(record)[2:], bytearray(0))
+
+        self.assertEqual(plaintext, bytearray(b'text to encrypt.'))
+
+    def test_open_without_memoryview(self):
+        key = bytearray(b'\x01'*16)
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
+
+        nonce = bytearray(b'\x02'*12)
+
+        ciphertext = bytearray(
+            b'\'\x81h\x17\xe6Z)\\\xf2\x8emF\xcb\x91\x0eu'
+            b'z1:\xf6}\xa7\\@\xba\x11\xd8r\xdf#K\xd4')
+
+        # as on Python 2.6
+        with mock.patch('tlslite.utils.aesgcm.compatMemoryview',
+                        lambda data: data):
+            plaintext = aesGCM.open(nonce, ciphertext, bytearray(0))
+
+        self.assertEqual(plaintext, bytearray(b'text to encrypt.'))
+
     def test_open_with_incorrect_key(self):
         key = bytearray(b'\x01'*15 + b'\x00')
         aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
@@ -254,3 +316,193 @@ class TestAESGCM(unittest.TestCase):
             b'\xd0\xd1\xc8\xa7\x99\x99\x6b\xf0' +
             b'\x26\x5b\x98\xb5\xd4\x8a\xb9\x19'
             ), encData)
+
+class TestAESGCMWith8bitTables(unittest.TestCase):
+    def test___init___with_invalid_table_size(self):
+        key = bytearray(16)
+
+        with self.assertRaises(ValueError):
+            AESGCM(key, "python", rijndael(key, 16).encrypt, 16)
+
+    def test_reduction_table(self):
+        self.assertEqual([_reduction(i, 4) for i in range(16)],
+                         AESGCM._gcmReductionTable)
+        self.assertEqual(len(AESGCM._gcmReductionTable8), 256)
+        self.assertEqual(AESGCM._gcmReductionTable8[1],
+                         AESGCM._gcmReductionTable[1] >> 4)
+
+    def test_mul(self):
+        key = bytearray(b'\xfe\xff\xe9\x92\x86\x65\x73\x1c' +
+                        b'\x6d\x6a\x8f\x94\x67\x30\x83\x08')
+        aesGCM4 = AESGCM(key, "python", rijndael(key, 16).encrypt, 4)
+        aesGCM8 = AESGCM(key, "python", rijndael(key, 16).encrypt, 8)
+
+        for y in (0, 1, 2**127, 2**128 - 1, 0x0123456789abcdef << 60,
+                  0xfedcba9876543210fedcba9876543210):
+            self.assertEqual(aesGCM4._mul(y), aesGCM8._mul(y))
+
+    def test_seal_with_test_vector_4(self):
+        key = bytearray(b'\xfe\xff\xe9\x92\x86\x65\x73\x1c' +
+                        b'\x6d\x6a\x8f\x94\x67\x30\x83\x08')
+
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt, 8)
+
+        nonce = bytearray(b'\xca\xfe\xba\xbe\xfa\xce\xdb\xad\xde\xca\xf8\x88')
+
+        plaintext = bytearray(b'\xd9\x31\x32\x25\xf8\x84\x06\xe5' +
+                              b'\xa5\x59\x09\xc5\xaf\xf5\x26\x9a' +
+                              b'\x86\xa7\xa9\x53\x15\x34\xf7\xda' +
+                              b'\x2e\x4c\x30\x3d\x8a\x31\x8a\x72' +
+                              b'\x1c\x3c\x0c\x95\x95\x68\x09\x53' +
+                              b'\x2f\xcf\x0e\x24\x49\xa6\xb5\x25' +
+                              b'\xb1\x6a\xed\xf5\xaa\x0d\xe6\x57' +
+                              b'\xba\x63\x7b\x39')
+
+        data = bytearray(b'\xfe\xed\xfa\xce\xde\xad\xbe\xef' +
+                         b'\xfe\xed\xfa\xce\xde\xad\xbe\xef' +
+                         b'\xab\xad\xda\xd2')
+
+        encData = aesGCM.seal(nonce, plaintext, data)
+
+        self.assertEqual(bytearray(
+            b'\x42\x83\x1e\xc2\x21\x77\x74\x24' +
+            b'\x4b\x72\x21\xb7\x84\xd0\xd4\x9c' +
+            b'\xe3\xaa\x21\x2f\x2c\x02\xa4\xe0' +
+            b'\x35\xc1\x7e\x23\x29\xac\xa1\x2e' +
+            b'\x21\xd5\x14\xb2\x54\x66\x93\x1c' +
+            b'\x7d\x8f\x6a\x5a\xac\x84\xaa\x05' +
+            b'\x1b\xa3\x0b\x39\x6a\x0a\xac\x97' +
+            b'\x3d\x58\xe0\x91' +
+            b'\x5b\xc9\x4f\xbc\x32\x21\xa5\xdb' +
+            b'\x94\xfa\xe9\x5a\xe7\x12\x1a\x47'), encData)
+
+        self.assertEqual(plaintext, aesGCM.open(nonce, encData, data))
+
+    def test_seal_with_test_vector_14(self):
+        key = bytearray(32)
+
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt, 8)
+
+        nonce = bytearray(12)
+        plaintext = bytearray(16)
+        data = bytearray(0)
+
+        encData = aesGCM.seal(nonce, plaintext, data)
+
+        self.assertEqual(bytearray(
+            b'\xce\xa7\x40\x3d\x4d\x60\x6b\x6e' +
+            b'\x07\x4e\xc5\xd3\xba\xf3\x9d\x18' +
+            b'\xd0\xd1\xc8\xa7\x99\x99\x6b\xf0' +
+            b'\x26\x5b\x98\xb5\xd4\x8a\xb9\x19'
+            ), encData)
+
+
+class TestAESGCMCtr(unittest.TestCase):
+    @staticmethod
+    def _ctr_reference(rawAesEncrypt, counter, inp):
+        """Encrypt inp with AES-CTR one block at a time"""
+        counter = bytearray(counter)
+        out = bytearray(len(inp))
+        for i in range(0, len(out), 16):
+            mask = rawAesEncrypt(counter)
+            for j in range(i, min(len(out), i + 16)):
+                out[j] = inp[j] ^ mask[j-i]
+            for k in range(15, 11, -1):
+                counter[k] = (counter[k] + 1) % 256
+                if counter[k] != 0:
+                    break
+        return out
+
+    @staticmethod
+    def _multi_block(key):
+        cipher = rijndael(key, 16)
+
+        def encrypt(data):
+            return bytearray().join(cipher.encrypt(data[i:i+16])
+                                    for i in range(0, len(data), 16))
+        return encrypt
+
+    def test__rawAesCtrEncrypt(self):
+        key = bytearray(range(16))
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
+        counter = bytearray(b'\x01' * 12 + b'\x00\x00\x00\x02')
+        plaintext = bytearray(range(256)) * 2 + bytearray(b'\xff' * 7)
+
+        ciphertext = aesGCM._rawAesCtrEncrypt(bytearray(counter), plaintext)
+
+        self.assertEqual(ciphertext,
+                         self._ctr_reference(rijndael(key, 16).encrypt,
+                                             counter, plaintext))
+
+    def test__rawAesCtrEncrypt_with_counter_overflow(self):
+        key = bytearray(range(16))
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
+        counter = bytearray(b'\x01' * 12 + b'\xff\xff\xff\xfe')
+        plaintext = bytearray(b'\xab' * 64)
+
+        ciphertext = aesGCM._rawAesCtrEncrypt(counter, plaintext)
+
+        self.assertEqual(ciphertext,
+                         self._ctr_reference(rijndael(key, 16).encrypt,
+                                             bytearray(b'\x01' * 12 +
+                                                       b'\xff\xff\xff\xfe'),
+                                             plaintext))
+        self.assertEqual(counter, bytearray(b'\x01' * 12 + b'\x00\x00\x00\x02'))
+
+    def test__rawAesCtrEncrypt_with_empty_input(self):
+        key = bytearray(16)
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
+
+        self.assertEqual(bytearray(0),
+                         aesGCM._rawAesCtrEncrypt(bytearray(16), bytearray(0)))
+
+    def test_seal_with_multi_block_encryption(self):
+        key = bytearray(range(16))
+        aesGCM = AESGCM(key, "python", rijndael(key, 16).encrypt)
+        aesGCMMulti = AESGCM(key, "python", self._multi_block(key),
+                             multiBlock=True)
+        nonce = bytearray(b'\x02' * 12)
+        plaintext = bytearray(range(256)) * 4 + bytearray(b'\x01' * 5)
+        data = bytearray(b'\x17\x03\x03')
+
+        encData = aesGCMMulti.seal(nonce, plaintext, data)
+
+        self.assertEqual(aesGCM.seal(nonce, plaintext, data), encData)
+        self.assertEqual(plaintext, aesGCMMulti.open(nonce, encData, data))
+
+
+@unittest.skipUnless(cryptomath.m2cryptoLoaded, "requires M2Crypto")
+class TestOpenSSLAESGCM(unittest.TestCase):
+    def test___init__(self):
+        aesGCM = openssl_aesgcm.new(bytearray(32))
+
+        self.assertEqual(aesGCM.implementation, "openssl")
+        self.assertEqual(aesGCM.name, "aes256gcm")
+
+    def test_seal_with_test_vector_14(self):
+        aesGCM = openssl_aesgcm.new(bytearray(32))
+
+        encData = aesGCM.seal(bytearray(12), bytearray(16), bytearray(0))
+
+        self.assertEqual(bytearray(
+            b'\xce\xa7\x40\x3d\x4d\x60\x6b\x6e' +
+            b'\x07\x4e\xc5\xd3\xba\xf3\x9d\x18' +
+            b'\xd0\xd1\xc8\xa7\x99\x99\x6b\xf0' +
+            b'\x26\x5b\x98\xb5\xd4\x8a\xb9\x19'
+            ), encData)
+
+    def test_seal_and_open(self):
+        key = bytearray(range(16))
+        aesGCM = openssl_aesgcm.new(key)
+        reference = python_aesgcm.new(key)
+        nonce = bytearray(b'\x02' * 12)
+        data = bytearray(b'\x17\x03\x03')
+
+        for size in (0, 1, 16, 17, 1000):
+            plaintext = bytearray(range(256)) * 4
+            plaintext = plaintext[:size]
+
+            encData = aesGCM.seal(nonce, plaintext, data)
+
+            self.assertEqual(reference.seal(nonce, plaintext, data), encData)
+            self.assertEqual(plaintext, aesGCM.open(nonce, encData, data))
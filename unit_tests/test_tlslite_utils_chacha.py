@@ -10,6 +10,7 @@ try:
 except ImportError:
         import unittest
 
+from tlslite.utils import chacha as chacha_module
 from tlslite.utils.chacha import ChaCha
 from tlslite.utils.cryptomath import bytesToNumber
 
@@ -347,3 +348,41 @@ class TestChaCha(unittest.TestCase):
             b'\x04\xc6\xa8\xd1\xbc\xd1\xbf\x4d\x50\xd6\x15\x4b\x6d\xa7\x31\xb1'
             b'\x87\xb5\x8d\xfd\x72\x8a\xfa\x36\x75\x7a\x79\x7a\xc1\x88\xd1'
             ))
+
+    def test_chacha_blocks(self):
+        key = list(range(8))
+        nonce = [9, 0, 0x4a000000]
+
+        key_stream = ChaCha.chacha_blocks(key, 1, nonce, 20, 3)
+
+        self.assertEqual(len(key_stream), 3 * 64)
+        for i in range(3):
+            self.assertEqual(key_stream[i*64:(i+1)*64],
+                             ChaCha.word_to_bytearray(
+                                 ChaCha.chacha_block(key, 1 + i, nonce, 20)))
+
+    def test_chacha_blocks_with_counter_overflow(self):
+        key = list(range(8))
+        nonce = [9, 0, 0x4a000000]
+
+        key_stream = ChaCha.chacha_blocks(key, 0xffffffff, nonce, 20, 2)
+
+        self.assertEqual(key_stream[64:],
+                         ChaCha.word_to_bytearray(
+                             ChaCha.chacha_block(key, 0, nonce, 20)))
+
+    @unittest.skipUnless(chacha_module.numpyLoaded, "requires NumPy")
+    def test_chacha_blocks_numpy(self):
+        key = [0x03020100, 0x07060504, 0x0b0a0908, 0x0f0e0d0c,
+               0x13121110, 0x17161514, 0x1b1a1918, 0x1f1e1d1c]
+        nonce = [0x09000000, 0x4a000000, 0x00000000]
+
+        for counter in (0, 1, 0xfffffffe):
+            self.assertEqual(
+                ChaCha._chacha_blocks_numpy(key, counter, nonce, 20, 5),
+                ChaCha._chacha_blocks_python(key, counter, nonce, 20, 5))
+
+    def test_chacha_encrypt_empty_data(self):
+        chacha = ChaCha(bytearray(32), bytearray(12))
+
+        self.assertEqual(bytearray(0), chacha.encrypt(bytearray(0)))
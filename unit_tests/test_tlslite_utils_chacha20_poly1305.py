@@ -10,6 +10,13 @@ try:
 except ImportError:
         import unittest
 
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import sys
+
 from tlslite.utils.chacha20_poly1305 import CHACHA20_POLY1305
 
 class TestPoly1305(unittest.TestCase):
@@ -54,6 +61,20 @@ class TestPoly1305(unittest.TestCase):
             b'\x1a\xe1\x0b\x59\x4f\x09\xe2\x6a\x7e\x90\x2e\xcb\xd0\x60\x06\x91'
             ))
 
+    def test_sealToBuffer(self):
+        aead = CHACHA20_POLY1305(bytearray(range(32)), "python")
+        nonce = bytearray(b'\x07' * 12)
+        plaintext = bytearray(b'some text to encrypt')
+        aad = bytearray(b'\x01' * 13)
+        out = bytearray(4 + len(plaintext) + 16 + 2)
+
+        written = aead.sealToBuffer(nonce, plaintext, aad, out, 4)
+
+        self.assertEqual(written, len(plaintext) + 16)
+        self.assertEqual(out[:4], bytearray(4))
+        self.assertEqual(out[4:-2], aead.seal(nonce, plaintext, aad))
+        self.assertEqual(out[-2:], bytearray(2))
+
     def test_seal_with_invalid_nonce(self):
         aead = CHACHA20_POLY1305(bytearray(256//8), "python")
 
@@ -123,6 +144,28 @@ class TestPoly1305(unittest.TestCase):
 
         self.assertIsNone(plaintext)
 
+    @unittest.skipIf(sys.version_info < (2, 7), "requires memoryview")
+    def test_open_with_memoryview(self):
+        aead = CHACHA20_POLY1305(bytearray(range(32)), "python")
+        nonce = bytearray(b'\x07' * 12)
+        plaintext = bytearray(b'some text to encrypt')
+        record = bytearray(3) + aead.seal(nonce, plaintext, bytearray(0))
+
+        self.assertEqual(plaintext, aead.open(nonce, memoryview(record)[3:],
+                                              bytearray(0)))
+
+    def test_open_without_memoryview(self):
+        aead = CHACHA20_POLY1305(bytearray(range(32)), "python")
+        nonce = bytearray(b'\x07' * 12)
+        plaintext = bytearray(b'some text to encrypt')
+        ciphertext = aead.seal(nonce, plaintext, bytearray(0))
+
+        # as on Python 2.6
+        with mock.patch('tlslite.utils.chacha20_poly1305.compatMemoryview',
+                        lambda data: data):
+            self.assertEqual(plaintext, aead.open(nonce, ciphertext,
+                                                  bytearray(0)))
+
     def test_open_with_invalid_tag(self):
         aead = CHACHA20_POLY1305(bytearray(256//8), "python")
 
@@ -0,0 +1,76 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import sys
+
+from tlslite.utils.compat import bytes_to_int, int_to_bytes, byte_length
+
+
+class TestBytesToInt(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(0, bytes_to_int(bytearray()))
+
+    def test_big_endian(self):
+        self.assertEqual(0x0102, bytes_to_int(bytearray(b'\x00\x01\x02')))
+
+    def test_little_endian(self):
+        self.assertEqual(0x020100,
+                         bytes_to_int(bytearray(b'\x00\x01\x02'), "little"))
+
+    @unittest.skipIf(sys.version_info < (2, 7), "requires memoryview")
+    def test_memoryview(self):
+        data = memoryview(bytearray(b'\x00\x01\x02'))
+
+        self.assertEqual(0x0102, bytes_to_int(data[1:]))
+
+    def test_large_number(self):
+        self.assertEqual(2**128 - 1, bytes_to_int(bytearray(b'\xff' * 16)))
+
+
+class TestIntToBytes(unittest.TestCase):
+    def test_zero(self):
+        self.assertEqual(bytearray(), int_to_bytes(0))
+
+    def test_with_length(self):
+        self.assertEqual(bytearray(b'\x00\x00\x01\x02'),
+                         int_to_bytes(0x0102, 4))
+
+    def test_without_length(self):
+        self.assertEqual(bytearray(b'\x01\x02'), int_to_bytes(0x0102))
+
+    def test_little_endian(self):
+        self.assertEqual(bytearray(b'\x02\x01\x00\x00'),
+                         int_to_bytes(0x0102, 4, "little"))
+
+    def test_too_large_number(self):
+        with self.assertRaises(OverflowError):
+            int_to_bytes(0x010203, 2)
+
+    def test_byte_length(self):
+        self.assertEqual(0, byte_length(0))
+        self.assertEqual(1, byte_length(255))
+        self.assertEqual(2, byte_length(256))
+        self.assertEqual(16, byte_length(2**128 - 1))
+
+    def test_byte_length_without_bit_length(self):
+        with mock.patch.object(sys, 'version_info', (2, 6, 9, 'final', 0)):
+            self.assertEqual(0, byte_length(0))
+            self.assertEqual(1, byte_length(255))
+            self.assertEqual(2, byte_length(256))
+            self.assertEqual(16, byte_length(2**128 - 1))
+            self.assertEqual(bytearray(b'\x01\x00'), int_to_bytes(256))
+
+
+if __name__ == '__main__':
+    unittest.main()
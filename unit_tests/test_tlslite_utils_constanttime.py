@@ -399,6 +399,64 @@ class TestContanttimeCBCCheck(unittest.TestCase):
         self.assertTrue(ct_check_cbc_mac_and_pad(data, h, seqnum_bytes,
                                                  content_type, version))
 
+    def test_with_invalid_hash_and_minimum_pad(self):
+        key = compatHMAC(bytearray(20))
+        seqnum_bytes = bytearray(16)
+        content_type = 0x14
+        version = (3, 1)
+        application_data = bytearray(b'\x01'*32)
+        mac = hashlib.sha1
+
+        data = self.data_prepare(application_data, seqnum_bytes, content_type,
+                                 version, mac, key)
+        data[-1] ^= 0xff
+
+        padding = bytearray(b'\x00')
+        data += padding
+
+        h = hmac.new(key, digestmod=mac)
+        h.block_size = mac().block_size # python2 workaround
+        self.assertFalse(ct_check_cbc_mac_and_pad(data, h, seqnum_bytes,
+                                                  content_type, version))
+
+    def test_with_pad_overlapping_mac(self):
+        key = compatHMAC(bytearray(20))
+        seqnum_bytes = bytearray(16)
+        content_type = 0x14
+        version = (3, 1)
+        mac = hashlib.sha1
+
+        # looks like valid padding, but there's no space left for MAC
+        data = bytearray(b'\x14' * 21)
+
+        h = hmac.new(key, digestmod=mac)
+        h.block_size = mac().block_size # python2 workaround
+        self.assertFalse(ct_check_cbc_mac_and_pad(data, h, seqnum_bytes,
+                                                  content_type, version))
+
+    @given(data_len=st.integers(0, 300), pad_len=st.integers(0, 255),
+           version=st.sampled_from([(3, 0), (3, 1), (3, 3)]))
+    def test_with_random_lengths(self, data_len, pad_len, version):
+        key = compatHMAC(bytearray(20))
+        seqnum_bytes = bytearray(8)
+        content_type = 0x17
+        mac = hashlib.sha1
+
+        data = self.data_prepare(bytearray(b'\x01'*data_len), seqnum_bytes,
+                                 content_type, version, mac, key)
+        data += bytearray([pad_len] * (pad_len + 1))
+
+        h = hmac.new(key, digestmod=mac)
+        h.block_size = mac().block_size # python2 workaround
+        self.assertTrue(ct_check_cbc_mac_and_pad(data, h, seqnum_bytes,
+                                                 content_type, version))
+
+        # modify the last byte of MAC
+        data[-pad_len - 2] ^= 0x01
+
+        self.assertFalse(ct_check_cbc_mac_and_pad(data, h, seqnum_bytes,
+                                                  content_type, version))
+
 class TestCompareDigest(unittest.TestCase):
     def test_with_equal_length(self):
         self.assertTrue(ct_compare_digest(bytearray(10), bytearray(10)))
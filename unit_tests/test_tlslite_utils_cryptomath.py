@@ -13,7 +13,10 @@ from hypothesis.strategies import integers
 import math
 
 from tlslite.utils.cryptomath import isPrime, numBits, numBytes, \
-        numberToByteArray, MD5, SHA1, secureHash
+        numberToByteArray, MD5, SHA1, secureHash, FixedBasePowMod, \
+        fixedBasePowMod, powMod
+from tlslite.utils import cryptomath
+from tlslite.mathtls import goodGroupParameters
 
 class TestIsPrime(unittest.TestCase):
     def test_with_small_primes(self):
@@ -184,3 +187,50 @@ class TestHashMethods(unittest.TestCase):
                                    b'\x64\x3C\xE8\x0E'
                                    b'\x2A\x9A\xC9\x4F'
                                    b'\xA5\x4C\xA4\x9F'))
+
+class TestFixedBasePowMod(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.g, cls.p = goodGroupParameters[2]
+        cls.powMod = FixedBasePowMod(cls.g, cls.p, maxBits=64)
+
+    @given(integers(min_value=0, max_value=2**64-1))
+    @example(0)
+    @example(1)
+    @example(2**64-1)
+    def test_covered_exponents(self, power):
+        self.assertEqual(self.powMod(power), pow(self.g, power, self.p))
+
+    @given(integers(min_value=2**64, max_value=2**320))
+    @example(2**64)
+    def test_exponents_above_tables(self, power):
+        self.assertEqual(self.powMod(power), pow(self.g, power, self.p))
+
+    def test_negative_exponent(self):
+        self.assertEqual(self.powMod(-5), powMod(self.g, -5, self.p))
+
+    def test_base_larger_than_modulus(self):
+        powMod = FixedBasePowMod(1000, 997, maxBits=16, windowBits=3)
+
+        for i in range(100):
+            self.assertEqual(powMod(i), pow(1000, i, 997))
+
+    def test_fixedBasePowMod_reuses_tables(self):
+        g, p = goodGroupParameters[0]
+
+        self.assertEqual(fixedBasePowMod(g, 12345, p), pow(g, 12345, p))
+        tables = cryptomath._fixedBasePowMods[(g, p)]
+        self.assertEqual(fixedBasePowMod(g, 54321, p), pow(g, 54321, p))
+        self.assertIs(cryptomath._fixedBasePowMods[(g, p)], tables)
+
+    def test_fixedBasePowMod_with_full_cache(self):
+        old = cryptomath._fixedBasePowMods
+        cryptomath._fixedBasePowMods = dict((i, None) for i in
+                                            range(cryptomath.
+                                                  _FIXED_BASE_CACHE_SIZE))
+        try:
+            self.assertEqual(fixedBasePowMod(3, 100, 1009),
+                             pow(3, 100, 1009))
+            self.assertNotIn((3, 1009), cryptomath._fixedBasePowMods)
+        finally:
+            cryptomath._fixedBasePowMods = old
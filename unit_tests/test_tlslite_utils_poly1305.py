@@ -10,6 +10,13 @@ try:
 except ImportError:
         import unittest
 
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+import sys
+
 from tlslite.utils.poly1305 import Poly1305
 
 class TestPoly1305(unittest.TestCase):
@@ -208,3 +215,75 @@ class TestPoly1305(unittest.TestCase):
         tag = poly.create_tag(message)
 
         self.assertEqual(tag, bytearray(b'\x13' + b'\x00'*15))
+
+    vector3_key = bytearray(
+        b'\x36\xe5\xf6\xb5\xc5\xe0\x60\x70\xf0\xef\xca\x96\x22\x7a\x86\x3e'
+        ) + bytearray(16)
+
+    vector3_tag = bytearray(
+        b'\xf3\x47\x7e\x7c\xd9\x54\x17\xaf\x89\xa6\xb8\x79\x4c\x31\x0c\xf0')
+
+    def test_update_in_parts(self):
+        for split in (1, 7, 15, 16, 17, 63, 64, 65, 200):
+            poly = Poly1305(self.vector3_key)
+
+            poly.update(self.ietf_text[:split])
+            poly.update(self.ietf_text[split:])
+
+            self.assertEqual(poly.finalize(), self.vector3_tag,
+                             "Failed for split at {0}".format(split))
+
+    def test_update_byte_by_byte(self):
+        poly = Poly1305(self.vector3_key)
+
+        for i in range(len(self.ietf_text)):
+            poly.update(self.ietf_text[i:i+1])
+
+        self.assertEqual(poly.finalize(), self.vector3_tag)
+
+    @unittest.skipIf(sys.version_info < (2, 7), "requires memoryview")
+    def test_update_with_memoryview(self):
+        poly = Poly1305(self.vector3_key)
+
+        poly.update(memoryview(self.ietf_text)[:100])
+        poly.update(memoryview(self.ietf_text)[100:])
+
+        self.assertEqual(poly.finalize(), self.vector3_tag)
+
+    def test_update_without_memoryview(self):
+        poly = Poly1305(self.vector3_key)
+
+        # as on Python 2.6
+        with mock.patch('tlslite.utils.poly1305.compatMemoryview',
+                        lambda data: data):
+            poly.update(self.ietf_text[:100])
+            poly.update(self.ietf_text[100:])
+
+        self.assertEqual(poly.finalize(), self.vector3_tag)
+
+    def test_update_with_empty_data(self):
+        poly = Poly1305(self.vector3_key)
+
+        poly.update(bytearray(0))
+        poly.update(self.ietf_text)
+        poly.update(bytearray(0))
+
+        self.assertEqual(poly.finalize(), self.vector3_tag)
+
+    def test_multi_block_against_reference(self):
+        # compare with straightforward, one block at a time, calculation
+        key = bytearray(range(32))
+        r = Poly1305.le_bytes_to_num(key[0:16]) & \
+                0x0ffffffc0ffffffc0ffffffc0fffffff
+        s = Poly1305.le_bytes_to_num(key[16:32])
+        for length in (0, 16, 48, 64, 80, 127, 128, 129, 1000):
+            message = bytearray((i * 7 + 3) % 256 for i in range(length))
+            acc = 0
+            for i in range(0, length, 16):
+                block = message[i:i+16] + bytearray(b'\x01')
+                acc = ((acc + Poly1305.le_bytes_to_num(block)) * r) % \
+                        Poly1305.P
+            expected = Poly1305.num_to_16_le_bytes(acc + s)
+
+            self.assertEqual(Poly1305(key).create_tag(message), expected,
+                             "Failed for length {0}".format(length))
@@ -0,0 +1,111 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+
+from tlslite.utils.python_rsakey import Python_RSAKey
+from tlslite.utils.processpool_rsakey import processPoolLoaded
+from tlslite.utils.keyfactory import parsePEMKey
+from tlslite.utils.cryptomath import numberToByteArray
+from unit_tests.test_tlslite_keyexchange import srv_raw_key
+
+if processPoolLoaded:
+    from concurrent.futures import ThreadPoolExecutor
+    from tlslite.utils.processpool_rsakey import ProcessPool_RSAKey
+
+
+@unittest.skipIf(not processPoolLoaded, "requires concurrent.futures")
+class TestProcessPool_RSAKey(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pythonKey = parsePEMKey(srv_raw_key, private=True,
+                                    implementations=["python"])
+
+    def setUp(self):
+        # threads are much faster to start, the worker function is the same
+        self.executor = ThreadPoolExecutor(2)
+        self.addCleanup(self.executor.shutdown)
+        self.key = ProcessPool_RSAKey(self.pythonKey, self.executor)
+
+    def test___init__(self):
+        self.assertEqual(self.key.n, self.pythonKey.n)
+        self.assertEqual(self.key.e, self.pythonKey.e)
+        self.assertTrue(self.key.hasPrivateKey())
+        self.assertEqual(len(self.key), 1024)
+        self.assertIs(self.key.executor, self.executor)
+
+    def test___init___with_public_key(self):
+        with self.assertRaises(ValueError):
+            ProcessPool_RSAKey(Python_RSAKey(self.pythonKey.n,
+                                             self.pythonKey.e),
+                               self.executor)
+
+    def test_sign(self):
+        sig = self.key.hashAndSign(bytearray(b'text to sign'))
+
+        self.assertEqual(sig,
+                         self.pythonKey.hashAndSign(bytearray(b'text to sign')))
+        self.assertTrue(self.key.hashAndVerify(sig,
+                                               bytearray(b'text to sign')))
+
+    def test_signAsync(self):
+        data = self.key.addPKCS1SHA1Prefix(bytearray(20))
+
+        future = self.key.signAsync(data)
+
+        self.assertEqual(future.result(), self.pythonKey.sign(data))
+
+    def test_decrypt(self):
+        ciphertext = self.pythonKey.encrypt(bytearray(b'secret'))
+
+        self.assertEqual(self.key.decrypt(ciphertext), bytearray(b'secret'))
+
+    def test_decryptAsync(self):
+        ciphertext = self.pythonKey.encrypt(bytearray(b'secret'))
+
+        future = self.key.decryptAsync(ciphertext)
+
+        self.assertEqual(future.result(), bytearray(b'secret'))
+
+    def test_decryptAsync_with_wrong_size(self):
+        future = self.key.decryptAsync(bytearray(127))
+
+        self.assertIsNone(future.result())
+
+    def test_decryptAsync_with_too_big_value(self):
+        future = self.key.decryptAsync(bytearray(b'\xff' * 128))
+
+        self.assertIsNone(future.result())
+
+    def test_decryptAsync_with_bad_padding(self):
+        # plaintext block without the 0x00 0x02 prefix
+        ciphertext = numberToByteArray(self.pythonKey._rawPublicKeyOp(12345),
+                                       128)
+
+        future = self.key.decryptAsync(ciphertext)
+
+        self.assertIsNone(future.result())
+
+    def test_close_with_own_executor(self):
+        key = ProcessPool_RSAKey(self.pythonKey, maxWorkers=1)
+        ciphertext = self.pythonKey.encrypt(bytearray(b'secret'))
+
+        self.assertEqual(key.decrypt(ciphertext), bytearray(b'secret'))
+
+        key.close()
+        with self.assertRaises(RuntimeError):
+            key.decrypt(ciphertext)
+
+    def test_close_with_external_executor(self):
+        self.key.close()
+
+        ciphertext = self.pythonKey.encrypt(bytearray(b'secret'))
+        self.assertEqual(self.key.decrypt(ciphertext), bytearray(b'secret'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+# See the LICENSE file for legal information regarding use of this file.
+
+# compatibility with Python 2.6, for that we need unittest2 package,
+# which is not available on 3.3 or 3.4
+try:
+    import unittest2 as unittest
+except ImportError:
+    import unittest
+try:
+    import mock
+except ImportError:
+    import unittest.mock as mock
+
+from tlslite.utils import python_aes
+from tlslite.utils.rijndael import rijndael
+from tlslite.utils.compat import a2b_hex
+
+# NIST SP 800-38A, F.2 CBC example vectors
+plaintext = a2b_hex(
+    '6bc1bee22e409f96e93d7e117393172a'
+    'ae2d8a571e03ac9c9eb76fac45af8e51'
+    '30c81c46a35ce411e5fbc1191a0a52ef'
+    'f69f2445df4f9b17ad2b417be66c3710')
+iv = a2b_hex('000102030405060708090a0b0c0d0e0f')
+aes128key = a2b_hex('2b7e151628aed2a6abf7158809cf4f3c')
+aes128ciphertext = a2b_hex(
+    '7649abac8119b246cee98e9b12e9197d'
+    '5086cb9b507219ee95db113a917678b2'
+    '73bed6b8e3c1743b7116e69e22229516'
+    '3ff1caa1681fac09120eca307586e1a7')
+aes256key = a2b_hex('603deb1015ca71be2b73aef0857d7781'
+                    '1f352c073b6108d72d9810a30914dff4')
+aes256ciphertext = a2b_hex(
+    'f58c4c04d6e5f1ba779eabfb5f7bfbd6'
+    '9cfc4e967edb808d679f777bc6702c7d'
+    '39f23369a9d9bacfa530e26304231461'
+    'b2eb05e2c39be9fcda6c19078c6a9d1b')
+
+
+class TestPython_AES(unittest.TestCase):
+    def test_encrypt_aes128(self):
+        aes = python_aes.new(aes128key, 2, iv)
+
+        self.assertEqual(aes.encrypt(plaintext), aes128ciphertext)
+
+    def test_decrypt_aes128(self):
+        aes = python_aes.new(aes128key, 2, iv)
+
+        self.assertEqual(aes.decrypt(aes128ciphertext), plaintext)
+
+    def test_encrypt_aes256(self):
+        aes = python_aes.new(aes256key, 2, iv)
+
+        self.assertEqual(aes.encrypt(plaintext), aes256ciphertext)
+
+    def test_decrypt_aes256(self):
+        aes = python_aes.new(aes256key, 2, iv)
+
+        self.assertEqual(aes.decrypt(aes256ciphertext), plaintext)
+
+    def test_encrypt_chains_between_calls(self):
+        aes = python_aes.new(aes128key, 2, iv)
+
+        ciphertext = aes.encrypt(plaintext[:16])
+        ciphertext += aes.encrypt(plaintext[16:48])
+        ciphertext += aes.encrypt(plaintext[48:])
+
+        self.assertEqual(ciphertext, aes128ciphertext)
+        self.assertEqual(aes.IV, aes128ciphertext[-16:])
+
+    def test_decrypt_chains_between_calls(self):
+        aes = python_aes.new(aes128key, 2, iv)
+
+        decrypted = aes.decrypt(aes128ciphertext[:32])
+        decrypted += aes.decrypt(aes128ciphertext[32:])
+
+        self.assertEqual(decrypted, plaintext)
+        self.assertEqual(aes.IV, aes128ciphertext[-16:])
+
+    def test_encrypt_empty(self):
+        aes = python_aes.new(aes128key, 2, iv)
+
+        self.assertEqual(aes.encrypt(bytearray(0)), bytearray(0))
+        self.assertEqual(aes.IV, iv)
+
+    def test_encrypt_with_unaligned_data(self):
+        aes = python_aes.new(aes128key, 2, iv)
+
+        with self.assertRaises(AssertionError):
+            aes.encrypt(bytearray(15))
+
+    def test_struct_gets_strings(self):
+        # Python 2.6 struct.unpack() accepts only str, emulate that
+        with mock.patch('tlslite.utils.python_aes.compat26Str',
+                        side_effect=bytes) as conv:
+            aes = python_aes.new(aes128key, 2, iv)
+            ciphertext = aes.encrypt(plaintext)
+            aes = python_aes.new(aes128key, 2, iv)
+            decrypted = aes.decrypt(ciphertext)
+
+        self.assertEqual(ciphertext, aes128ciphertext)
+        self.assertEqual(decrypted, plaintext)
+        self.assertEqual(conv.call_count, 4)
+
+
+class TestRijndael(unittest.TestCase):
+    def test_encryptWords(self):
+        # FIPS-197 Appendix C.1
+        cipher = rijndael(a2b_hex('000102030405060708090a0b0c0d0e0f'), 16)
+
+        self.assertEqual(cipher.encryptWords(0x00112233, 0x44556677,
+                                             0x8899aabb, 0xccddeeff),
+                         (0x69c4e0d8, 0x6a7b0430, 0xd8cdb780, 0x70b4c55a))
+
+    def test_decryptWords(self):
+        cipher = rijndael(a2b_hex('000102030405060708090a0b0c0d0e0f'), 16)
+
+        self.assertEqual(cipher.decryptWords(0x69c4e0d8, 0x6a7b0430,
+                                             0xd8cdb780, 0x70b4c55a),
+                         (0x00112233, 0x44556677, 0x8899aabb, 0xccddeeff))
+
+    def test_encrypt_with_aes192(self):
+        # FIPS-197 Appendix C.2
+        cipher = rijndael(a2b_hex('000102030405060708090a0b0c0d0e0f'
+                                  '1011121314151617'), 16)
+        block = a2b_hex('00112233445566778899aabbccddeeff')
+
+        self.assertEqual(cipher.encrypt(block),
+                         a2b_hex('dda97ca4864cdfe06eaf70a0ec0d7191'))
+        self.assertEqual(cipher.decrypt(cipher.encrypt(block)), block)
+
+    def test_struct_gets_strings(self):
+        cipher = rijndael(a2b_hex('000102030405060708090a0b0c0d0e0f'), 16)
+        block = a2b_hex('00112233445566778899aabbccddeeff')
+
+        with mock.patch('tlslite.utils.rijndael.compat26Str',
+                        side_effect=bytes) as conv:
+            encrypted = cipher.encrypt(block)
+            decrypted = cipher.decrypt(encrypted)
+
+        self.assertEqual(encrypted,
+                         a2b_hex('69c4e0d86a7b0430d8cdb78070b4c55a'))
+        self.assertEqual(decrypted, block)
+        self.assertEqual(conv.call_count, 2)
+
+    def test_encrypt_with_larger_block(self):
+        cipher = rijndael(bytearray(16), 32)
+        block = bytearray(range(32))
+
+        self.assertEqual(cipher.decrypt(cipher.encrypt(block)), block)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -110,6 +110,31 @@ class TestRSAKey(unittest.TestCase):
             b'0!0\t\x06\x05+\x0e\x03\x02\x1a\x05\x00\x04\x14' + 
             b' sha-1 hash of data '))
 
+    def test_encrypt_and_decrypt(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        encBytes = rsa.encrypt(bytearray(b'premaster secret'))
+
+        self.assertEqual(rsa.decrypt(encBytes), bytearray(b'premaster secret'))
+
+    def test_decrypt_with_wrong_length(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        self.assertIsNone(rsa.decrypt(bytearray(10)))
+
+    def test__removePKCS1Padding(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        m = rsa._signaturePaddedNumber(bytearray(b'data'))
+
+        # signature padding is not accepted as encryption padding
+        self.assertIsNone(rsa._removePKCS1Padding(m))
+        self.assertEqual(rsa._removePKCS1Padding(m + (1 << 496)),
+                         bytearray(b'data'))
+
     def test_addPKCS1SHA1Prefix_without_NULL(self):
         data = bytearray(b' sha-1 hash of data ')
 
@@ -117,9 +142,59 @@ class TestRSAKey(unittest.TestCase):
             b'0\x1f0\x07\x06\x05+\x0e\x03\x02\x1a\x04\x14' +
             b' sha-1 hash of data '))
 
+    def test_encrypt_and_decrypt(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        encBytes = rsa.encrypt(bytearray(b'premaster secret'))
+
+        self.assertEqual(rsa.decrypt(encBytes), bytearray(b'premaster secret'))
+
+    def test_decrypt_with_wrong_length(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        self.assertIsNone(rsa.decrypt(bytearray(10)))
+
+    def test__removePKCS1Padding(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        m = rsa._signaturePaddedNumber(bytearray(b'data'))
+
+        # signature padding is not accepted as encryption padding
+        self.assertIsNone(rsa._removePKCS1Padding(m))
+        self.assertEqual(rsa._removePKCS1Padding(m + (1 << 496)),
+                         bytearray(b'data'))
+
     def test_addPKCS1Prefix(self):
         data = bytearray(b' sha-1 hash of data ')
 
         self.assertEqual(RSAKey.addPKCS1Prefix(data, 'sha1'), bytearray(
             b'0!0\t\x06\x05+\x0e\x03\x02\x1a\x05\x00\x04\x14' +
             b' sha-1 hash of data '))
+
+    def test_encrypt_and_decrypt(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        encBytes = rsa.encrypt(bytearray(b'premaster secret'))
+
+        self.assertEqual(rsa.decrypt(encBytes), bytearray(b'premaster secret'))
+
+    def test_decrypt_with_wrong_length(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        self.assertIsNone(rsa.decrypt(bytearray(10)))
+
+    def test__removePKCS1Padding(self):
+        rsa = Python_RSAKey(self.N, self.e, self.d, self.p, self.q, self.dP,
+                            self.dQ, self.qInv)
+
+        m = rsa._signaturePaddedNumber(bytearray(b'data'))
+
+        # signature padding is not accepted as encryption padding
+        self.assertIsNone(rsa._removePKCS1Padding(m))
+        self.assertEqual(rsa._removePKCS1Padding(m + (1 << 496)),
+                         bytearray(b'data'))